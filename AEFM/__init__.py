@@ -1,12 +1,40 @@
-from . import configs
-from . import data_collector
-from . import deployer
-from . import inf_generator
-from . import manager
-from . import models
-from . import utils
-from . import workload_generator
-from typing import Literal
+import importlib
+from typing import Literal, TYPE_CHECKING
+
+# Submodules are imported on first access (PEP 562), so ``import AEFM`` does not
+# pull in pandas, kubernetes or requests until they are really needed.
+_SUBMODULES = (
+    "configs",
+    "data_collector",
+    "deployer",
+    "inf_generator",
+    "manager",
+    "models",
+    "utils",
+    "workload_generator",
+)
+
+if TYPE_CHECKING:
+    from . import configs
+    from . import data_collector
+    from . import deployer
+    from . import inf_generator
+    from . import manager
+    from . import models
+    from . import utils
+    from . import workload_generator
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES))
 
 
 def set_log_level(level: Literal["debug", "info", "key", "warn", "error", "off"]):
@@ -16,4 +44,6 @@ def set_log_level(level: Literal["debug", "info", "key", "warn", "error", "off"]
 
 
 def set_config_file(file_path: str):
+    from . import configs
+
     configs.CONFIG_FILE_PATH = file_path
@@ -1,4 +1,4 @@
-import os, shutil, click, yaml, requests, pathlib
+import os, shutil, click, yaml, pathlib
 from .messages import *
 from .utils import update
 from ..utils.files import create_folder
@@ -119,6 +119,8 @@ def get_file():
     )
 
     def get_nginx_configs():
+        import requests
+
         url = (
             "https://github.com/Nick-LCY/AEFM/raw/main/DeathStarBench_Nginx_configs.zip"
         )
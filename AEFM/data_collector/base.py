@@ -4,11 +4,16 @@ from .wrk_throughput_collector import WrkThroughputCollector
 from dataclasses import dataclass
 from .models import TestCaseData
 from .interfaces import DataCollectorInterface
+from .profiling import CollectionProfiler
 from ..utils.logger import log
+from ..utils.metrics import metrics
+from ..utils.timeline import timeline
 from ..utils.files import append_csv_to_file, create_folder
 import traceback, multiprocessing
+from time import perf_counter, perf_counter_ns
 import pandas as pd
-from typing import Callable, Iterable
+from typing import Callable, Iterable, Optional
+from multiprocessing.pool import AsyncResult
 
 
 @dataclass
@@ -36,6 +41,7 @@ class BaseDataCollector(DataCollectorInterface):
         hardware_collector: PromHardwareCollector,
         throughput_collector: WrkThroughputCollector,
         max_processes: int = 10,
+        profiler: Optional[CollectionProfiler] = None,
     ) -> None:
         """A default data collector that collects data based on jaeger, promethe
         us and wrk.
@@ -49,6 +55,8 @@ class BaseDataCollector(DataCollectorInterface):
             ghput.
             max_processes (int): Maximum processes used when collecting data und
             er async mode. Defaults to 10.
+            profiler (CollectionProfiler, optional): Profile every collection,
+            reports are aggregated by ``wait()``. Defaults to None.
         """
         self.data_path = data_path
         create_folder(data_path)
@@ -56,6 +64,7 @@ class BaseDataCollector(DataCollectorInterface):
         self.hardware_collector = hardware_collector
         self.throughput_collector = throughput_collector
         self.max_processes = max_processes
+        self.profiler = profiler
         self.proc_pool = None
         self.to_be_collected: list[Collection] = []
         # Init default collections
@@ -64,6 +73,21 @@ class BaseDataCollector(DataCollectorInterface):
             f"{self.data_path}/throughput_data.csv",
             self.collect_throughput,
         )
+        client_latency_collection = Collection(
+            "client latency collection",
+            f"{self.data_path}/client_latency_data.csv",
+            self.collect_client_latency,
+        )
+        client_health_collection = Collection(
+            "client health collection",
+            f"{self.data_path}/client_health_data.csv",
+            self.collect_client_health,
+        )
+        throughput_timeseries_collection = Collection(
+            "throughput time series collection",
+            f"{self.data_path}/throughput_timeseries_data.csv",
+            self.collect_throughput_timeseries,
+        )
         raw_data_collection = Collection(
             "raw data collection",
             f"{self.data_path}/raw_data.csv",
@@ -87,6 +111,9 @@ class BaseDataCollector(DataCollectorInterface):
         self.add_new_collections(
             [
                 throughput_collection,
+                client_latency_collection,
+                client_health_collection,
+                throughput_timeseries_collection,
                 raw_data_collection,
                 statistical_data_collection,
                 end_to_end_data_collection,
@@ -94,16 +121,46 @@ class BaseDataCollector(DataCollectorInterface):
             ]
         )
 
-    def collect_async(self, test_case_data: TestCaseData) -> None:
+    def collect_async(self, test_case_data: TestCaseData) -> AsyncResult:
         """Collect throughput asynchronously, traces and hardware resource usage
         data and save them into files.
 
         Args:
             test_case_data (TestCaseData): _description_
+
+        Returns:
+            AsyncResult: Collection in the process pool, ``wait`` blocks until i
+            t finishes.
         """
         if self.proc_pool is None:
             self.proc_pool = multiprocessing.Pool(self.max_processes)
-        self.proc_pool.apply_async(self.collect, (test_case_data,))
+        metrics.add(
+            "aefm_collection_queue_depth", 1, "Data collections not finished yet"
+        )
+        return self.proc_pool.apply_async(
+            self._collect_in_worker,
+            (test_case_data,),
+            callback=self._collected,
+            error_callback=self._collected,
+        )
+
+    def _collect_in_worker(self, test_case_data: TestCaseData) -> tuple:
+        # perf_counter is a system wide monotonic clock, so the span is comparab
+        # le with spans of the main process
+        start = perf_counter_ns()
+        self.collect(test_case_data)
+        end = perf_counter_ns()
+        # Metrics and the span recorded in the worker, merged by the main process
+        return metrics.drain(), (test_case_data.name, start, end)
+
+    def _collected(self, result) -> None:
+        metrics.add("aefm_collection_queue_depth", -1)
+        if not isinstance(result, tuple):
+            # Error of the worker
+            return
+        deltas, (name, start, end) = result
+        metrics.merge(deltas)
+        timeline.record("data_collection", "collection", start, end, test_case=name)
 
     def collect_throughput(self) -> pd.DataFrame:
         """
@@ -116,10 +173,41 @@ class BaseDataCollector(DataCollectorInterface):
         throughput_data = pd.DataFrame([{"real_throughput": throughput_data}])
         return throughput_data
 
+    def collect_client_latency(self) -> pd.DataFrame:
+        """
+        Collects client-side latency percentiles and errors for a given test cas
+        e.
+
+        Returns:
+            pd.DataFrame: A DataFrame containing the client-side latency data.
+        """
+        return self.throughput_collector.collect_latency(self.test_case_data.name)
+
+    def collect_client_health(self) -> pd.DataFrame:
+        """
+        Collects health verdict of load clients for a given test case, unhealthy
+        test cases have non-empty reasons, app_saturated marks a throughput short
+        fall of the application.
+
+        Returns:
+            pd.DataFrame: A DataFrame containing the client health verdict.
+        """
+        return self.throughput_collector.collect_health(self.test_case_data.name)
+
+    def collect_throughput_timeseries(self) -> pd.DataFrame:
+        """
+        Collects per-second throughput of a given test case, empty if wrk does n
+        ot run in streaming mode.
+
+        Returns:
+            pd.DataFrame: A DataFrame containing the throughput time series.
+        """
+        return self.throughput_collector.collect_timeseries(self.test_case_data.name)
+
     def collect_raw_data(self) -> pd.DataFrame:
         trace_data = self.trace_collector.collect_trace(
-            self.test_case_data.start_time,
-            self.test_case_data.end_time,
+            self.test_case_data.steady_start_time,
+            self.test_case_data.steady_end_time,
             self.test_case_data.operation,
         )
         raw_data = self.trace_collector.to_raw_data(trace_data)
@@ -142,7 +230,7 @@ class BaseDataCollector(DataCollectorInterface):
         Collects CPU usage data for each microservice within a given time frame.
 
         Args:
-            test_case_data (TestCaseData): The test case data containing the start and end time.
+            test_case_data (TestCaseData): The test case data containing the steady state start and end time.
             statistical_data (pd.DataFrame): The statistical data containing the microservices.
 
         Returns:
@@ -151,7 +239,9 @@ class BaseDataCollector(DataCollectorInterface):
         microservices = statistical_data["microservice"].dropna().unique().tolist()
         cpu_data = (
             self.hardware_collector.collect_cpu_usage(
-                microservices, test_case_data.start_time, test_case_data.end_time
+                microservices,
+                test_case_data.steady_start_time,
+                test_case_data.steady_end_time,
             )
             .to_pandas()
             .rename(columns={"usage": "cpu_usage"})
@@ -165,7 +255,7 @@ class BaseDataCollector(DataCollectorInterface):
         Collects memory usage data for a given test case and statistical data.
 
         Args:
-            test_case_data (TestCaseData): The test case data containing the start and end times.
+            test_case_data (TestCaseData): The test case data containing the steady state start and end times.
             statistical_data (pd.DataFrame): The statistical data containing the microservices.
 
         Returns:
@@ -174,7 +264,9 @@ class BaseDataCollector(DataCollectorInterface):
         microservices = statistical_data["microservice"].dropna().unique().tolist()
         mem_data = (
             self.hardware_collector.collect_mem_usage(
-                microservices, test_case_data.start_time, test_case_data.end_time
+                microservices,
+                test_case_data.steady_start_time,
+                test_case_data.steady_end_time,
             )
             .to_pandas()
             .rename(columns={"usage": "mem_usage"})
@@ -226,22 +318,51 @@ class BaseDataCollector(DataCollectorInterface):
             args = collection.args
             if args is None:
                 args = []
+            start = perf_counter()
             try:
-                data = collection.method(*args)
+                if self.profiler is not None:
+                    data = self.profiler.run(
+                        collection.name, test_case_data.name, collection.method, *args
+                    )
+                else:
+                    data = collection.method(*args)
             except:
                 message = f"{test_case_data.name} {collection.name} failed!"
                 log.error(message, to_file=True)
                 traceback.print_exc()
+                metrics.inc(
+                    "aefm_collection_failures_total",
+                    help="Failed data collections",
+                    collection=collection.name,
+                )
                 continue
+            finally:
+                metrics.observe(
+                    "aefm_collection_duration_seconds",
+                    perf_counter() - start,
+                    "Duration of data collections",
+                    collection=collection.name,
+                )
             data_list.append(ToBeSavedData(data, collection.saved_path))
         try:
-            self.append_additional_and_save(
-                data_list, test_case_data.additional_columns
-            )
+            if self.profiler is not None:
+                self.profiler.run(
+                    "save data",
+                    test_case_data.name,
+                    self.append_additional_and_save,
+                    data_list,
+                    test_case_data.additional_columns,
+                )
+            else:
+                self.append_additional_and_save(
+                    data_list, test_case_data.additional_columns
+                )
         except:
             message = f"{test_case_data.name} save data failed!"
             log.error(message, to_file=True)
             traceback.print_exc()
+        # Pool workers may be terminated without running exit handlers
+        log.flush()
 
     def wait(self) -> None:
         """Wait until all async data collection processes done."""
@@ -249,6 +370,10 @@ class BaseDataCollector(DataCollectorInterface):
             self.proc_pool.close()
             self.proc_pool.join()
         self.proc_pool = multiprocessing.Pool(self.max_processes)
+        if self.profiler is not None:
+            summary_path = self.profiler.write_summary()
+            if summary_path is not None:
+                log.info(f"Profile of data collections is saved in {summary_path}")
 
     def __getstate__(self):
         self_dict = self.__dict__.copy()
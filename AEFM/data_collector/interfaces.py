@@ -1,6 +1,10 @@
 from abc import ABC, abstractmethod
 from .models import CpuUsage, MemUsage, TestCaseData
-import pandas as pd
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from multiprocessing.pool import AsyncResult
+    import pandas as pd
 
 
 class HardwareCollectorInterface(ABC):
@@ -40,13 +44,13 @@ class TraceCollectorInterface(ABC):
         end_time: float,
         operation: str = None,
         limit: int = 1000,
-    ) -> pd.DataFrame:
+    ) -> "pd.DataFrame":
         """Collect trace data. And parse them into Dataframe object."""
 
     @abstractmethod
     def process_trace(
-        self, collected_data: pd.DataFrame
-    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        self, collected_data: "pd.DataFrame"
+    ) -> tuple["pd.DataFrame", "pd.DataFrame"]:
         """Process collected data, return statistical and original data in a tup
         le. The first item of tuple is statistical data, and the second one is r
         aw data.
@@ -62,8 +66,9 @@ class DataCollectorInterface(ABC):
         """Collect data and saved them to files."""
 
     @abstractmethod
-    def collect_async(self, test_case_data: TestCaseData) -> None:
-        """Using multiprocess to speed up data collection."""
+    def collect_async(self, test_case_data: TestCaseData) -> "AsyncResult":
+        """Using multiprocess to speed up data collection, the returned result
+        waits until the collection finishes."""
 
     @abstractmethod
     def wait(self) -> None:
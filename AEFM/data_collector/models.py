@@ -1,5 +1,7 @@
-import pandas as pd
-from typing import Any
+from typing import Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class TestCaseData:
@@ -12,6 +14,8 @@ class TestCaseData:
         name: str,
         additional_columns: dict[str, Any] = None,
         operation: str = None,
+        warmup: float = 0,
+        cooldown: float = 0,
     ) -> None:
         """A data structure that used to staore test case information.
 
@@ -22,12 +26,69 @@ class TestCaseData:
             additional_columns (dict[str, Any], optional): Additional columns th
             at needs to be saved in output data of collector. Defaults to None.
             operation (str, optional): Jaeger operation. Defaults to None.
+            warmup (float, optional): Seconds after ``start_time`` that are excl
+            uded from trace and hardware collection. Defaults to 0.
+            cooldown (float, optional): Seconds before ``end_time`` that are exc
+            luded from trace and hardware collection. Defaults to 0.
         """
         self.start_time = start_time
         self.end_time = end_time
         self.operation = operation
         self.name = name
         self.additional_columns = additional_columns
+        self.warmup = warmup
+        self.cooldown = cooldown
+
+    @property
+    def steady_start_time(self) -> float:
+        """Start time of steady state, i.e. ``start_time`` plus warm-up. Falls b
+        ack to ``start_time`` if the trimmed window would be empty."""
+        if self._trimmed_duration() <= 0:
+            return self.start_time
+        return self.start_time + self.warmup
+
+    @property
+    def steady_end_time(self) -> float:
+        """End time of steady state, i.e. ``end_time`` minus cool-down. Falls ba
+        ck to ``end_time`` if the trimmed window would be empty."""
+        if self._trimmed_duration() <= 0:
+            return self.end_time
+        return self.end_time - self.cooldown
+
+    def _trimmed_duration(self) -> float:
+        return self.end_time - self.start_time - self.warmup - self.cooldown
+
+    def trim_by_timeseries(
+        self,
+        timeseries,
+        tolerance: float = 0.1,
+        warmup: bool = True,
+        cooldown: bool = True,
+    ) -> bool:
+        """Set warm-up and/or cool-down by the steady state detected from a thro
+        ughput time series, check ``ThroughputTimeSeries.steady_window``.
+
+        Args:
+            timeseries (ThroughputTimeSeries): Per-second responses of the test
+            case.
+            tolerance (float, optional): Allowed relative deviation below the me
+            dian throughput. Defaults to 0.1.
+            warmup (bool, optional): Detect warm-up. Defaults to True.
+            cooldown (bool, optional): Detect cool-down. Defaults to True.
+
+        Returns:
+            bool: Whether steady state is detected. Warm-up and cool-down are un
+            changed if not.
+        """
+        window = timeseries.steady_window(tolerance) if timeseries else None
+        if window is None:
+            return False
+        steady_start, steady_end = window
+        if warmup:
+            self.warmup = max(0.0, steady_start - self.start_time)
+        if cooldown:
+            self.cooldown = max(0.0, self.end_time - steady_end)
+        return True
 
 
 class UsageRecords:
@@ -67,13 +128,15 @@ class UsageRecords:
             return
         return self.records[microservice][pod]
 
-    def to_pandas(self) -> pd.DataFrame:
+    def to_pandas(self) -> "pd.DataFrame":
         """Return pandas object of records.
 
         Returns:
             pd.DataFrame: columns: microservice, pod, usage; data type: str, str
             , int.
         """
+        import pandas as pd
+
         records = []
         for microservice in self.records:
             ms_records = self.records[microservice]
@@ -0,0 +1,188 @@
+import cProfile, glob, io, json, os, pstats, re, time, tracemalloc
+from typing import Any, Callable, Optional
+from ..utils.files import create_folder
+
+PROFILES_FILE = "profiles.jsonl"
+SUMMARY_FILE = "summary.csv"
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^0-9a-zA-Z]+", "_", name).strip("_")
+
+
+def _rows(data: Any) -> Optional[int]:
+    try:
+        return len(data)
+    except TypeError:
+        return None
+
+
+class CollectionProfiler:
+    """Opt-in profiler of data collections. Wall time, CPU time, peak memory all
+    ocated by Python (tracemalloc) and output rows of every collection of every
+    test case are appended to ``profiles.jsonl`` under ``report_path``. With ``
+    use_cprofile``, function level statistics of every collection are saved as
+    well. ``write_summary`` aggregates them.
+    """
+
+    def __init__(
+        self,
+        report_path: str,
+        use_cprofile: bool = False,
+        trace_memory: bool = True,
+        top: int = 30,
+    ) -> None:
+        """Opt-in profiler of data collections.
+
+        Args:
+            report_path (str): Folder of profiling reports.
+            use_cprofile (bool, optional): Profile collections with cProfile, it
+            slows them down noticeably. Defaults to False.
+            trace_memory (bool, optional): Measure peak memory with tracemalloc.
+            Defaults to True.
+            top (int, optional): Functions listed per collection in cProfile rep
+            orts. Defaults to 30.
+        """
+        self.report_path = report_path
+        self.use_cprofile = use_cprofile
+        self.trace_memory = trace_memory
+        self.top = top
+        create_folder(report_path)
+        # Collection name -> profile of this process, accumulated over test cases
+        self._profiles: dict[str, cProfile.Profile] = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_profiles"] = {}
+        return state
+
+    def run(
+        self, name: str, test_case: str, method: Callable, *args
+    ) -> Any:
+        """Run ``method`` and record its profile, exceptions are recorded and re
+        -raised.
+
+        Args:
+            name (str): Collection name.
+            test_case (str): Test case name.
+            method (Callable): Collection method.
+            *args: Arguments of ``method``.
+
+        Returns:
+            Any: Return value of ``method``.
+        """
+        profile = None
+        if self.use_cprofile:
+            profile = self._profiles.setdefault(name, cProfile.Profile())
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        result, error = None, None
+        try:
+            if profile is not None:
+                result = profile.runcall(method, *args)
+            else:
+                result = method(*args)
+            return result
+        except BaseException as e:
+            error = repr(e)
+            raise
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            peak_memory = None
+            if self.trace_memory:
+                peak_memory = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+            self._append(
+                {
+                    "collection": name,
+                    "test_case": test_case,
+                    "pid": os.getpid(),
+                    "time": time.time(),
+                    "wall_time": wall,
+                    "cpu_time": cpu,
+                    "peak_memory": peak_memory,
+                    "rows": _rows(result),
+                    "error": error,
+                }
+            )
+            if profile is not None:
+                profile.dump_stats(
+                    os.path.join(
+                        self.report_path, f"{_slug(name)}.{os.getpid()}.prof"
+                    )
+                )
+
+    def _append(self, record: dict[str, Any]) -> None:
+        line = (json.dumps(record) + "\n").encode()
+        # A single O_APPEND write, records of pool workers don't interleave
+        fd = os.open(
+            os.path.join(self.report_path, PROFILES_FILE),
+            os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+            0o644,
+        )
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def load(self) -> list[dict[str, Any]]:
+        """Records of all profiled collections."""
+        path = os.path.join(self.report_path, PROFILES_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path) as file:
+            return [json.loads(x) for x in file if x.strip()]
+
+    def write_summary(self) -> Optional[str]:
+        """Aggregate records per collection into ``summary.csv``, ordered by tot
+        al wall time, and merge cProfile statistics of all processes into one te
+        xt report per collection.
+
+        Returns:
+            Optional[str]: Path of the summary, None if nothing is profiled.
+        """
+        import pandas as pd
+
+        records = self.load()
+        if len(records) == 0:
+            return None
+        data = pd.DataFrame(records)
+        data["failed"] = data["error"].notna()
+        summary = (
+            data.groupby("collection")
+            .agg(
+                count=("wall_time", "size"),
+                failed=("failed", "sum"),
+                wall_total=("wall_time", "sum"),
+                wall_mean=("wall_time", "mean"),
+                wall_max=("wall_time", "max"),
+                cpu_total=("cpu_time", "sum"),
+                cpu_mean=("cpu_time", "mean"),
+                peak_memory_max=("peak_memory", "max"),
+                rows_mean=("rows", "mean"),
+            )
+            .sort_values("wall_total", ascending=False)
+        )
+        summary["wall_share"] = summary["wall_total"] / summary["wall_total"].sum()
+        path = os.path.join(self.report_path, SUMMARY_FILE)
+        summary.to_csv(path)
+        for name in summary.index:
+            self._write_cprofile_report(name)
+        return path
+
+    def _write_cprofile_report(self, name: str) -> None:
+        files = glob.glob(os.path.join(self.report_path, f"{_slug(name)}.*.prof"))
+        if len(files) == 0:
+            return
+        output = io.StringIO()
+        stats = pstats.Stats(*files, stream=output)
+        stats.sort_stats("cumulative").print_stats(self.top)
+        with open(os.path.join(self.report_path, f"{_slug(name)}.txt"), "w") as file:
+            file.write(output.getvalue())
@@ -1,6 +1,12 @@
+import json
+from typing import TYPE_CHECKING, Optional
 from ..utils.logger import log
+from ..workload_generator.store import ResultsStore
 from .interfaces import ThroughputCollectorInterface
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 class WrkFetcher:
     """Middleware to collect throughput from wrk."""
@@ -12,7 +18,11 @@ class WrkFetcher:
             output_path (str): Out put path that defined in wrk workload generat
             or.
         """
+        self.store = ResultsStore(output_path)
+        # Files written by older versions, used if the store has no record
         self.throughput_path = f"{output_path}/throughput"
+        self.result_path = f"{output_path}/result"
+        self.wrk_output_path = f"{output_path}/wrk_output"
 
     def fetch(self, test_case_name: str) -> float:
         """Read wrk output file and get throughput.
@@ -24,10 +34,49 @@ class WrkFetcher:
         Returns:
             float: Throughput, unit: requests/second.
         """
+        result = self.store.get(test_case_name)
+        if result is not None:
+            return float(result["throughput"])
         with open(f"{self.throughput_path}/{test_case_name}", "r") as file:
             throughput = float(file.readline())
         return throughput
 
+    def fetch_result(self, test_case_name: str) -> dict:
+        """Read structured result of wrk programs, check ``LoadResult.to_dict``
+        for its format.
+
+        Args:
+            test_case_name (str): Current test case name, used to identify wrk f
+            ile.
+
+        Returns:
+            dict: Structured result, latencies are in milliseconds.
+        """
+        result = self.store.get(test_case_name)
+        if result is not None:
+            return result
+        with open(f"{self.result_path}/{test_case_name}", "r") as file:
+            return json.load(file)
+
+    def fetch_raw(self, test_case_name: str) -> Optional[bytes]:
+        """Read raw output of wrk programs.
+
+        Args:
+            test_case_name (str): Current test case name, used to identify wrk f
+            ile.
+
+        Returns:
+            Optional[bytes]: Raw output, None if it is not found.
+        """
+        raw = self.store.raw(test_case_name)
+        if raw is not None:
+            return raw
+        try:
+            with open(f"{self.wrk_output_path}/{test_case_name}", "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
 
 class WrkThroughputCollector(ThroughputCollectorInterface):
     """Throughput collector that based on wrk."""
@@ -53,3 +102,83 @@ class WrkThroughputCollector(ThroughputCollectorInterface):
         throughput = self.fetcher.fetch(test_case_name)
         log.debug(f"{__file__}: Real throughput: {throughput}")
         return throughput
+
+    def collect_latency(self, test_case_name: str) -> "pd.DataFrame":
+        """Collect client-side latency percentiles and errors of wrk programs.
+
+        Args:
+            test_case_name (str): Current test case name, used to identify wrk f
+            ile.
+
+        Returns:
+            pd.DataFrame: A single row, columns: requests, mean, p50, p75, p90,
+            p95, p99, p99.9, p99.99, p100 (unit: millisecond), connect_errors, r
+            ead_errors, write_errors, timeout_errors, non_2xx_3xx_errors.
+        """
+        import pandas as pd
+
+        result = self.fetcher.fetch_result(test_case_name)
+        row = {"requests": result["requests"]}
+        row.update(result["latency"])
+        row.update({f"{k}_errors": v for k, v in result["errors"].items()})
+        return pd.DataFrame([row])
+
+    def collect_timeseries(self, test_case_name: str) -> "pd.DataFrame":
+        """Collect per-second responses of wrk programs, only available when wrk
+        runs in streaming mode (``WrkConfig(timeseries=True)``).
+
+        Args:
+            test_case_name (str): Current test case name, used to identify wrk f
+            ile.
+
+        Returns:
+            pd.DataFrame: One row per second, columns: timestamp, second (since
+            the start of load), requests, errors. Empty if there is no time seri
+            es.
+        """
+        import pandas as pd
+        from ..workload_generator.results import ThroughputTimeSeries
+
+        columns = ["timestamp", "second", "requests", "errors"]
+        result = self.fetcher.fetch_result(test_case_name)
+        if result.get("timeseries") is None:
+            return pd.DataFrame(columns=columns)
+        timeseries = ThroughputTimeSeries.load_from_dict(result["timeseries"])
+        rows = timeseries.to_rows(result.get("start_time"))
+        return pd.DataFrame(rows, columns=columns)
+
+    def collect_health(self, test_case_name: str) -> "pd.DataFrame":
+        """Collect health verdict of load clients, tells whether the offered loa
+        d fell short, check ``workload_generator.health.ClientHealth``.
+
+        Args:
+            test_case_name (str): Current test case name, used to identify wrk f
+            ile.
+
+        Returns:
+            pd.DataFrame: A single row, columns: healthy, attempts, requested, o
+            ffered, achieved, achieved_ratio, max_client_cpu, socket_errors, rea
+            sons, app_saturated, notes. Empty if there is no verdict.
+        """
+        import pandas as pd
+
+        columns = [
+            "healthy",
+            "attempts",
+            "requested",
+            "offered",
+            "achieved",
+            "achieved_ratio",
+            "max_client_cpu",
+            "socket_errors",
+            "reasons",
+            "app_saturated",
+            "notes",
+        ]
+        health = self.fetcher.fetch_result(test_case_name).get("health")
+        if health is None:
+            return pd.DataFrame(columns=columns)
+        row = dict(health)
+        row["reasons"] = "; ".join(row.get("reasons", []))
+        row["notes"] = "; ".join(row.get("notes", []))
+        return pd.DataFrame([row], columns=columns)
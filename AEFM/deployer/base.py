@@ -1,7 +1,12 @@
 from ..models import PodSpec, Node
 from typing import Optional
 from ..utils.kubernetes_YAMLs import KubernetesYAMLs
-from ..utils.kubernetes import delete_by_yaml, deploy_by_yaml
+from ..utils.kubernetes import (
+    delete_by_yaml,
+    deploy_by_yaml,
+    delete_by_objects,
+    deploy_by_objects,
+)
 from ..utils.files import delete_path, create_folder
 from .intrefaces import DeployerInterface
 import pathlib
@@ -27,6 +32,7 @@ class BaseDeployer(DeployerInterface):
         testbed_nodes: list[Node],
         yaml_repo: str,
         app_img: Optional[str] = None,
+        save_yamls: bool = False,
     ):
         """BaseDeployer constructor
 
@@ -40,6 +46,9 @@ class BaseDeployer(DeployerInterface):
             yaml_repo (str): Path to the YAML files folder.
             app_img (str, optional): Docker image of application, set
             to none to keep not change of original ones. Defaults to None.
+            save_yamls (bool, optional): Prepared YAMLs are applied from memory,
+            set to True to also write them under ``tmp/`` for debugging. Defaul
+            ts to False.
         """
         self.namespace: str = namespace
         self.pod_spec: PodSpec = pod_spec
@@ -49,6 +58,9 @@ class BaseDeployer(DeployerInterface):
         self.tmp_under_test_path = f"tmp/under_test_{namespace}"
         self.tmp_infra_path = f"tmp/infra_{self.namespace}"
         self.app_img: Optional[str] = app_img
+        self.save_yamls: bool = save_yamls
+        self.infra_yamls: Optional[KubernetesYAMLs] = None
+        self.under_test_yamls: Optional[KubernetesYAMLs] = None
 
     def prepare_infra_yaml(self) -> "BaseDeployer":
         """Prepare YAMLs for infra microservices.
@@ -56,18 +68,19 @@ class BaseDeployer(DeployerInterface):
         Returns:
             BaseDeployer: Return self for chaining.
         """
-        # Clear YAML files generated previously
-        delete_path(self.tmp_infra_path)
-        create_folder(self.tmp_infra_path)
-        # Edit infra YAMLs, save them to tmp folder
+        # Edit infra YAMLs, keep them in memory
         infra_yamls = KubernetesYAMLs(f"{self.yaml_repo}/infra")
         infra_yamls.update(
             "metadata.namespace", self.namespace, target_kind=None
         ).assign_affinity(self.infra_nodes).update(
             "spec.template.spec.containers[0].imagePullPolicy", "IfNotPresent"
-        ).save(
-            self.tmp_infra_path
         )
+        self.infra_yamls = infra_yamls
+        if self.save_yamls:
+            # Clear YAML files generated previously, save new ones to tmp folder
+            delete_path(self.tmp_infra_path)
+            create_folder(self.tmp_infra_path)
+            infra_yamls.save(self.tmp_infra_path)
         return self
 
     def deploy_infra_yaml(self) -> "BaseDeployer":
@@ -76,8 +89,13 @@ class BaseDeployer(DeployerInterface):
         Returns:
             BaseDeployer: Return self for chaining.
         """
-        delete_by_yaml(self.tmp_infra_path, wait=True, namespace=self.namespace)
-        deploy_by_yaml(self.tmp_infra_path, wait=True, namespace=self.namespace)
+        if self.infra_yamls is None:
+            delete_by_yaml(self.tmp_infra_path, wait=True, namespace=self.namespace)
+            deploy_by_yaml(self.tmp_infra_path, wait=True, namespace=self.namespace)
+            return self
+        objs = self.infra_yamls.yamls
+        delete_by_objects(objs, wait=True, namespace=self.namespace)
+        deploy_by_objects(objs, wait=True, namespace=self.namespace)
         return self
 
     def prepare_under_test_yaml(
@@ -93,18 +111,19 @@ class BaseDeployer(DeployerInterface):
             BaseDeployer: Return self for chaining.
         """
         replicas = replicas if replicas is not None else {}
-        # Clear YAML files generated previously
-        delete_path(self.tmp_under_test_path)
-        create_folder(self.tmp_under_test_path)
-        # Edit under_test YAMLs, save them to tmp folder
+        # Edit under_test YAMLs, keep them in memory
         under_test = KubernetesYAMLs(f"{self.yaml_repo}/under_test")
         under_test.base_yaml_preparation(
             self.namespace, self.pod_spec, self.app_img
         ).assign_affinity(self.testbed_nodes).assign_containers(replicas).update(
             "spec.template.spec.containers[0].imagePullPolicy", "IfNotPresent"
-        ).save(
-            self.tmp_under_test_path
         )
+        self.under_test_yamls = under_test
+        if self.save_yamls:
+            # Clear YAML files generated previously, save new ones to tmp folder
+            delete_path(self.tmp_under_test_path)
+            create_folder(self.tmp_under_test_path)
+            under_test.save(self.tmp_under_test_path)
         return self
 
     def deploy_under_test_yaml(self) -> "BaseDeployer":
@@ -113,8 +132,13 @@ class BaseDeployer(DeployerInterface):
         Returns:
             BaseDeployer: Return self for chaining.
         """
-        delete_by_yaml(self.tmp_under_test_path)
-        deploy_by_yaml(self.tmp_under_test_path, True, self.namespace)
+        if self.under_test_yamls is None:
+            delete_by_yaml(self.tmp_under_test_path)
+            deploy_by_yaml(self.tmp_under_test_path, True, self.namespace)
+            return self
+        objs = self.under_test_yamls.yamls
+        delete_by_objects(objs)
+        deploy_by_objects(objs, True, self.namespace)
         return self
 
     def restart(self, application: str, port: int):
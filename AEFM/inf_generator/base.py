@@ -1,25 +1,16 @@
 from .interfaces import InfGeneratorInterface
-import os, pathlib, yaml
+import os, pathlib
 from ..utils.kubernetes import (
-    deploy_by_yaml,
+    deploy_by_objects,
     delete_deployment,
     delete_config_map,
     delete_daemon_set,
 )
 from ..utils.files import delete_path
 from ..models import Node
-from ..utils.kubernetes_YAMLs import KubernetesYAMLs
+from ..utils.kubernetes_YAMLs import KubernetesYAMLs, build_node_affinity
 from typing import Literal
 
-_AFFINITY_TEMPLATE = (
-    "nodeAffinity:\n"
-    "  requiredDuringSchedulingIgnoredDuringExecution:\n"
-    "    nodeSelectorTerms:\n"
-    "    - matchExpressions:\n"
-    "      - key: kubernetes.io/hostname\n"
-    "        operator: In\n"
-    "        values: %%%\n"
-)
 TEMPLATE_FOLDER = pathlib.Path(__file__).parent.resolve().joinpath("templates")
 
 
@@ -32,6 +23,7 @@ class BaseInfGenerator(InfGeneratorInterface):
         configs: dict,
         namespace: str = "interference",
         duration: int = 86400,
+        save_yamls: bool = False,
     ):
         """Initialize a interference generator with certain type.
 
@@ -43,6 +35,9 @@ class BaseInfGenerator(InfGeneratorInterface):
             size", "cpu_size" and "throughput".
             namespace (str): Namespace used to deploy interference.
             duration (int): Duration of interference pods.
+            save_yamls (bool): Generated YAMLs are applied from memory, set to
+            True to also write them under ``tmp/`` for debugging. Defaults to
+            False.
         """
         self.resource_limits = {
             "requests": {"memory": configs["mem_size"], "cpu": configs["cpu_size"]},
@@ -50,6 +45,7 @@ class BaseInfGenerator(InfGeneratorInterface):
         }
         self.inf_type = inf_type
         self.namespace = namespace
+        self.save_yamls = save_yamls
         self.command = {
             "cpu": "/ibench/src/cpu",
             "mem_capacity": "/ibench/src/memCap",
@@ -78,16 +74,17 @@ class BaseInfGenerator(InfGeneratorInterface):
             wait (bool, optional): Wait until generation finished? Defaults to True.
         """
         self.deployed_nodes = nodes
-        delete_path("tmp/net-interference")
-        delete_path("tmp/interference")
+        if self.save_yamls:
+            delete_path("tmp/net-interference")
+            delete_path("tmp/interference")
         self.clear(wait=False)
         if self.inf_type == "network":
-            self._generate_network_inf(nodes, count)
-            deploy_by_yaml("tmp/net-interference", wait, self.namespace)
+            objs = self._generate_network_inf(nodes, count)
         else:
+            objs = []
             for node, name in zip(nodes, self._get_inf_names()):
-                self._generate_single_interference(node, name, count)
-            deploy_by_yaml("tmp/interference", wait, self.namespace)
+                objs.extend(self._generate_single_interference(node, name, count))
+        deploy_by_objects(objs, wait, self.namespace)
 
     def _get_inf_names(self):
         if self.inf_type == "network":
@@ -115,15 +112,11 @@ class BaseInfGenerator(InfGeneratorInterface):
         for name in self._get_inf_names():
             delete_deployment(name, self.namespace, wait)
 
-    def _generate_network_inf(self, nodes: list[Node], count: int):
-        nodes_str = [str(x) for x in nodes]
+    def _generate_network_inf(self, nodes: list[Node], count: int) -> list[dict]:
         cm_name, ds_name = self._get_inf_names()
 
         k8s_yaml = KubernetesYAMLs(TEMPLATE_FOLDER.joinpath("net-inf.yaml"))
-        affinity = yaml.load(
-            _AFFINITY_TEMPLATE.replace("%%%", f"[{','.join(nodes_str)}]"),
-            Loader=yaml.CLoader,
-        )
+        affinity = build_node_affinity(nodes)
         ds_pairs = [
             ("metadata.namespace", self.namespace),
             ("metadata.name", ds_name),
@@ -136,8 +129,7 @@ class BaseInfGenerator(InfGeneratorInterface):
             ("spec.template.spec.volumes[0].configMap.name", cm_name),
         ]
 
-        for pair in ds_pairs:
-            k8s_yaml.update(pair[0], pair[1], target_kind="DaemonSet")
+        k8s_yaml.batch_update(ds_pairs, target_kind="DaemonSet")
 
         cm_pairs = [
             ("metadata.namespace", self.namespace),
@@ -145,17 +137,17 @@ class BaseInfGenerator(InfGeneratorInterface):
             ("data.data", "\n".join([x.ip for x in nodes] + [nodes[0].ip])),
         ]
 
-        for pair in cm_pairs:
-            k8s_yaml.update(pair[0], pair[1], target_kind="ConfigMap")
+        k8s_yaml.batch_update(cm_pairs, target_kind="ConfigMap")
 
-        k8s_yaml.save("tmp/net-interference")
+        if self.save_yamls:
+            k8s_yaml.save("tmp/net-interference")
+        return k8s_yaml.yamls
 
-    def _generate_single_interference(self, node: Node, name: str, count: int):
+    def _generate_single_interference(
+        self, node: Node, name: str, count: int
+    ) -> list[dict]:
         k8s_yaml = KubernetesYAMLs(TEMPLATE_FOLDER.joinpath("interference.yaml"))
-        affinity = yaml.load(
-            _AFFINITY_TEMPLATE.replace("%%%", f"[{node}]"),
-            Loader=yaml.CLoader,
-        )
+        affinity = build_node_affinity([node])
         pairs = [
             ("metadata.name", name),
             ("metadata.namespace", self.namespace),
@@ -165,6 +157,7 @@ class BaseInfGenerator(InfGeneratorInterface):
             ("spec.template.spec.containers[0].args", self.args),
             ("spec.template.spec.affinity", affinity),
         ]
-        for pair in pairs:
-            k8s_yaml.update(pair[0], pair[1])
-        k8s_yaml.save(f"tmp/interference/{name}.yaml")
+        k8s_yaml.batch_update(pairs)
+        if self.save_yamls:
+            k8s_yaml.save(f"tmp/interference/{name}.yaml")
+        return k8s_yaml.yamls
@@ -1,3 +1,3 @@
 from .events import register
-from .interfaces import ManagerInterface
+from .interfaces import ManagerInterface, EventPayload
 from .base import manager
\ No newline at end of file
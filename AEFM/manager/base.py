@@ -1,7 +1,12 @@
+import os
 from ..models import TestCases
 from .interfaces import ManagerInterface, _Events, _Components, _Data
+from .pipeline import Pipeline
+from .dry_run import DryRun
 from ..utils.logger import log
-from ..utils.timer import timer
+from ..utils.eta import PhaseEstimator
+from ..utils.timeline import timeline
+from ..utils.metrics import metrics
 
 
 class BaseManager(ManagerInterface):
@@ -19,23 +24,80 @@ class BaseManager(ManagerInterface):
         self.components = _Components()
         self.data = _Data()
 
-    def run(self):
+    def run(
+        self,
+        pipelined: bool = False,
+        parallel_markers: bool = False,
+        dry_run: bool = False,
+    ):
         """A built-in experiment process. You can customize your own experiment
         process by trigger different events with ``manager.events.trigger``.
+
+        Args:
+            pipelined (bool, optional): Collect data of a test case in backgroun
+            d while the environment of the next one is prepared, check ``pipelin
+            e.Pipeline``. Defaults to False.
+            parallel_markers (bool, optional): Trigger ``start_<marker>`` events
+            of a test case concurrently, e.g. when several interferences change
+            at once. Template handlers of interferences all wait for every pod
+            of the same namespace, so each of them returns only when the slowe
+            st generator is ready. Defaults to False.
+            dry_run (bool, optional): Only simulate the experiment against stub
+            components and return its projection, check ``dry_run.DryRun``. Co
+            sts are taken from the status or timeline file of a previous run if
+            there is one. ``start_experiment`` still runs to build the componen
+            ts, with ``manager.data.get("dry_run")`` set to True and no timelin
+            e span. Constructors of components may create their output folders,
+            template handlers neither start the metrics server nor log to file.
+            Defaults to False.
         """
         trigger = self.events.trigger
+        timeline.reset()
+        self.data.set("dry_run", dry_run)
+        if dry_run:
+            # Spans would be written to the timeline file read as history
+            with timeline.paused():
+                trigger("start_experiment")
+            history = [self.data.get("status_file_path"), timeline.file_path]
+            return DryRun(self, history).run(self.data.get("test_cases"))
         trigger("start_experiment")
         trigger("init_environment")
         test_cases = self.data.get("test_cases")
         assert isinstance(test_cases, TestCases)
+        # Progress and remaining time are reported after every load
+        estimator = PhaseEstimator(
+            test_cases.generate(),
+            status_file_path=self.data.get("status_file_path"),
+        )
+        timeline.add_listener(estimator.observe)
+        timeline.add_listener(metrics.observe_span)
+        metrics.set("aefm_test_cases_total", len(test_cases), "Test cases to run")
+        try:
+            if pipelined:
+                log.info(f"Total test cases: {len(test_cases)}, pipelined")
+                Pipeline(self, parallel_markers=parallel_markers).run(test_cases)
+            else:
+
+                def test_case_workflow():
+                    trigger("start_single_test_case")
+                    trigger("start_data_collection")
 
-        @timer(name="single test case", total_count=len(test_cases), level="key")
-        def test_case_workflow():
-            trigger("start_single_test_case")
-            trigger("start_data_collection")
-        log.info(f"Total test cases: {len(test_cases)}")
-        test_cases.iter(test_case_workflow)
+                log.info(f"Total test cases: {len(test_cases)}")
+                test_cases.iter(test_case_workflow, parallel_markers)
+        finally:
+            timeline.remove_listener(estimator.observe)
+            timeline.remove_listener(metrics.observe_span)
         trigger("end_experiment")
+        self._summarize()
+
+    def _summarize(self):
+        """Print where the time of the experiment went, and save the timeline i
+        n Chrome trace format next to the timeline file."""
+        timeline.log_summary()
+        if timeline.file_path is not None:
+            trace_path = os.path.splitext(timeline.file_path)[0] + ".trace.json"
+            timeline.export_chrome_trace(trace_path)
+            log.info(f"Timeline is saved in {timeline.file_path} and {trace_path}.")
 
 
 manager = BaseManager()
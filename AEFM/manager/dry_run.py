@@ -0,0 +1,267 @@
+import json, os
+from collections import Counter
+from time import perf_counter, time
+from typing import Any, Optional
+from ..models import TestCases
+from .interfaces import ManagerInterface, EventPayload
+from ..utils.logger import log
+from ..utils.timeline import COLLECT_EVENT, LOAD_EVENT, timeline
+from ..utils.timer import parser
+
+# Rough cost of component calls, used for events without history, unit: second
+DEFAULT_CALL_COSTS = {
+    "restart": 600.0,
+    "reload": 120.0,
+    "generate": 30.0,
+    "clear": 10.0,
+}
+# Time of a test case besides its load (collection lag, waits), used without
+# history, unit: second
+DEFAULT_CASE_OVERHEAD = 5.0
+
+
+def _stub(component: Any, name: str, calls: Counter, state: dict) -> Any:
+    """Instance of a subclass of the class of ``component`` whose public methods
+    only count calls, so ``isinstance`` checks of handlers still pass. Attribut
+    es are shared with ``component``, dicts of components are stubbed item by i
+    tem and other values are kept."""
+    if isinstance(component, dict):
+        return {
+            key: _stub(value, f"{name}.{key}", calls, state)
+            for key, value in component.items()
+        }
+    cls = type(component)
+    if cls.__module__ == "builtins":
+        return component
+
+    def recorder(method: str):
+        def record(self, *args, **kwargs):
+            calls[(state["event"], name, method)] += 1
+
+        return record
+
+    methods = {
+        x: recorder(x)
+        for x in dir(cls)
+        if not x.startswith("_") and callable(getattr(cls, x, None))
+    }
+    stub = object.__new__(type(f"DryRun{cls.__name__}", (cls,), methods))
+    stub.__dict__.update(getattr(component, "__dict__", {}))
+    return stub
+
+
+def load_history(path: str) -> tuple[dict[str, float], Optional[int]]:
+    """Per-phase costs recorded by a previous run.
+
+    Args:
+        path (str): A status file written by ``PhaseEstimator`` (``.json``), or
+        a timeline file (``.jsonl``).
+
+    Returns:
+        tuple[dict[str, float], Optional[int]]: Cost of every event and of a te
+        st case ("case"), unit: second, and finished test cases if known.
+    """
+    if path.endswith(".json"):
+        with open(path) as file:
+            status = json.load(file)
+        return dict(status.get("costs", {})), status.get("done")
+    durations: dict[str, list[int]] = {}
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("category") == "event":
+                durations.setdefault(record["name"], []).append(record["duration_ns"])
+    costs = {x: sum(y) / len(y) / 1e9 for x, y in durations.items()}
+    if LOAD_EVENT in costs:
+        costs["case"] = costs[LOAD_EVENT] + costs.get(COLLECT_EVENT, 0.0)
+    return costs, len(durations.get(LOAD_EVENT, [])) or None
+
+
+def _folder_size(path: str) -> int:
+    size = 0
+    for root, _, files in os.walk(path):
+        for file in files:
+            try:
+                size += os.path.getsize(os.path.join(root, file))
+            except OSError:
+                pass
+    return size
+
+
+class DryRun:
+    """Simulate an experiment without touching the cluster. Components are repl
+    aced by stubs that count method calls, ``init_environment``, every ``start_<
+    marker>`` event and ``end_experiment`` are fired with their real handlers, lo
+    ad and data collection are skipped. Counted calls (restarts, reloads, interf
+    erence changes) and per-phase costs of a previous run (or defaults) give the
+    projected wall time of the experiment and its data volume.
+    """
+
+    def __init__(
+        self,
+        manager: ManagerInterface,
+        history: Optional[list[str]] = None,
+        costs: Optional[dict[str, float]] = None,
+    ) -> None:
+        """Simulate an experiment without touching the cluster.
+
+        Args:
+            manager (ManagerInterface): Manager whose events, components and dat
+            a are used.
+            history (list[str], optional): Status or timeline files of previous
+            runs, the first one with a finished test case is used. Defaults to
+            None.
+            costs (dict[str, float], optional): Cost of events and of a test cas
+            e ("case"), override history, unit: second. Defaults to None.
+        """
+        self.manager = manager
+        self.history: Optional[str] = None
+        self.costs: dict[str, float] = {}
+        self.done: Optional[int] = None
+        for path in history or []:
+            if path is None or not os.path.exists(path):
+                continue
+            recorded, done = load_history(path)
+            # A file without any finished test case is not a history
+            if "case" in recorded:
+                self.history, self.costs, self.done = path, recorded, done
+                break
+        self.costs.update(costs or {})
+        # (event, component, method) -> calls
+        self.calls: Counter = Counter()
+        self.events: Counter = Counter()
+
+    def _fire(self, event: str, payload: EventPayload, state: dict) -> None:
+        state["event"] = event
+        self.events[event] += 1
+        # Markers without handlers are counted silently, once per test case
+        if hasattr(self.manager.events, event):
+            self.manager.events.trigger(event, payload)
+
+    def _event_cost(self, event: str) -> float:
+        if event in self.costs:
+            return self.costs[event]
+        calls = sum(
+            count * DEFAULT_CALL_COSTS.get(method, 0.0)
+            for (x, _, method), count in self.calls.items()
+            if x == event
+        )
+        return calls / self.events[event] if self.events[event] else 0.0
+
+    def _case_cost(self) -> float:
+        if "case" in self.costs:
+            return self.costs["case"]
+        configs = self.manager.data.get("configs")
+        return getattr(configs, "duration", 0) + DEFAULT_CASE_OVERHEAD
+
+    def run(self, test_cases: TestCases) -> dict[str, Any]:
+        """Walk all test cases and project the experiment.
+
+        Args:
+            test_cases (TestCases): Test cases of the experiment.
+
+        Returns:
+            dict[str, Any]: Projection, check ``report``.
+        """
+        started = perf_counter()
+        components = vars(self.manager.components)
+        data_collector = components.get("data_collector")
+        collections = len(getattr(data_collector, "to_be_collected", []))
+        data_path = getattr(data_collector, "data_path", None)
+        originals = dict(components)
+        state = {"event": None}
+        for name, component in originals.items():
+            components[name] = _stub(component, name, self.calls, state)
+        # Countdowns are answered at once, like when nobody interrupts them, and
+        # simulated events are kept out of the timeline, which may be a history
+        try:
+            with log.answer_countdowns(), timeline.paused():
+                self._fire("init_environment", EventPayload("init_environment"), state)
+                cases = test_cases.generate()
+                for test_case in cases:
+                    if not test_case.markers:
+                        continue
+                    self.manager.data.set("current_test_case", test_case)
+                    for marker in test_case.markers:
+                        event = f"start_{marker}"
+                        self._fire(event, EventPayload(event, test_case), state)
+                self._fire("end_experiment", EventPayload("end_experiment"), state)
+        finally:
+            components.update(originals)
+        bytes_per_case = None
+        if self.done and data_path is not None and os.path.exists(data_path):
+            bytes_per_case = _folder_size(data_path) / self.done
+        return self.report(len(cases), collections, bytes_per_case, started)
+
+    def report(
+        self,
+        test_cases: int,
+        collections: int,
+        bytes_per_case: Optional[float],
+        started: float,
+    ) -> dict[str, Any]:
+        """Summarize the simulation and log it.
+
+        Returns:
+            dict[str, Any]: Keys: test_cases, events (fired times), calls (per c
+            omponent method), restarts, reloads, transitions (interference genera
+            tions), costs (used per event, unit: second), cost_source, projected
+            (seconds of init, cases, transitions, end and total), finish_at, co
+            llections, bytes and elapsed (seconds taken by the dry run).
+        """
+        calls: Counter = Counter()
+        for (_, component, method), count in self.calls.items():
+            calls[f"{component}.{method}"] += count
+        by_method: Counter = Counter()
+        for (_, _, method), count in self.calls.items():
+            by_method[method] += count
+        costs = {x: self._event_cost(x) for x in self.events}
+        costs["case"] = self._case_cost()
+        init = costs["init_environment"]
+        end = costs["end_experiment"]
+        transitions = sum(
+            count * costs[event]
+            for event, count in self.events.items()
+            if event not in ["init_environment", "end_experiment"]
+        )
+        cases = test_cases * costs["case"]
+        total = init + cases + transitions + end
+        result = {
+            "test_cases": test_cases,
+            "events": dict(self.events),
+            "calls": dict(calls),
+            "restarts": by_method["restart"],
+            "reloads": by_method["reload"],
+            "transitions": by_method["generate"],
+            "costs": costs,
+            "cost_source": self.history or "defaults",
+            "projected": {
+                "init": init,
+                "cases": cases,
+                "transitions": transitions,
+                "end": end,
+                "total": total,
+            },
+            "finish_at": time() + total,
+            "collections": test_cases * collections,
+            "bytes": bytes_per_case * test_cases if bytes_per_case else None,
+            "elapsed": perf_counter() - started,
+        }
+        log.key(
+            f"Dry run: {test_cases} test cases, projected {parser(int(total))} "
+            f"(init {parser(int(init))}, cases {parser(int(cases))}, transitions "
+            f"{parser(int(transitions))}), costs from {result['cost_source']}"
+        )
+        log.key(
+            f"Dry run: {result['restarts']} restarts, {result['reloads']} reloads, "
+            f"{result['transitions']} interference transitions, "
+            f"{result['collections']} data collections"
+            + (
+                f", about {result['bytes'] / 2**20:.1f} MiB of data"
+                if result["bytes"]
+                else ""
+            )
+        )
+        return result
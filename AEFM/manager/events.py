@@ -1,5 +1,5 @@
 from .base import manager
-from typing import Literal
+from typing import Literal, Optional
 
 
 def register(
@@ -11,6 +11,7 @@ def register(
         "end_experiment",
     ],
     method: Literal["insert", "replace", "append"] = "replace",
+    after: Optional[list[str]] = None,
 ):
     """Decorator that used to register a method to handle a event. Besides defau
     lt events, you can also register your customized events.
@@ -20,10 +21,16 @@ def register(
         method (str): How to register this handler, append to the end of all han
         lers / insert into the begin of all handlers / discard all other handler
         s and use this one only.
+        after (list[str], optional): Names of handlers of the same event that
+        must finish before this one, only used by ``trigger_async``. Defaults t
+        o None.
+
+    Handlers can be coroutine functions, and a handler with a positional parame
+    ter without default value receives an ``EventPayload``.
     """
 
     def inner(func):
-        manager.events.register(event, func, method)
+        manager.events.register(event, func, method, after)
         return func
 
     return inner
@@ -1,15 +1,112 @@
+import contextvars, inspect
 from abc import abstractmethod, ABC
-from typing import Any, Literal
+from contextlib import contextmanager
+from typing import Any, Literal, Optional
 from collections.abc import Callable
 from ..utils.logger import log
+from ..utils.timeline import timeline
+
+
+class EventPayload:
+    """Passed to handlers with a positional parameter without default value, so
+    they don't need to read shared ``manager.data`` to know what triggered them
+    ."""
+
+    def __init__(
+        self, event: str, test_case: Any = None, data: Optional[dict] = None
+    ) -> None:
+        """Passed to handlers with a positional parameter without default value.
+
+        Args:
+            event (str): Name of the triggered event.
+            test_case (TestCase, optional): Current test case. Defaults to None.
+            data (dict, optional): Anything else given by the trigger. Defaults
+            to None.
+        """
+        self.event = event
+        self.test_case = test_case
+        self.data = data if data is not None else {}
+
+    def __repr__(self) -> str:
+        return f"EventPayload({self.event}, {self.test_case})"
+
+
+# Handler -> whether it accepts a payload, inspecting signatures is slow
+_accepts: dict[Callable, bool] = {}
+
+
+def _accepts_payload(handler: Callable) -> bool:
+    try:
+        return _accepts[handler]
+    except (KeyError, TypeError):
+        pass
+    try:
+        parameters = inspect.signature(handler).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    positional = [
+        inspect.Parameter.POSITIONAL_ONLY,
+        inspect.Parameter.POSITIONAL_OR_KEYWORD,
+    ]
+    # Parameters with defaults, e.g. ``def handler(wait=True)``, keep them
+    accepts = any(
+        x.kind == inspect.Parameter.VAR_POSITIONAL
+        or (x.kind in positional and x.default is inspect.Parameter.empty)
+        for x in parameters
+    )
+    try:
+        _accepts[handler] = accepts
+    except TypeError:
+        # Unhashable callable objects are inspected every time
+        pass
+    return accepts
+
+
+def _handler_name(handler: Callable) -> str:
+    return getattr(handler, "__qualname__", repr(handler))
 
 
 class _Events(object):
     def __new__(cls) -> "_Events":
         if not hasattr(cls, "instance"):
             cls.instance = super(_Events, cls).__new__(cls)
+            # Event -> handler -> names of handlers it must run after
+            cls.instance._after = {}
         return cls.instance
 
+    def _payload(self, event: str, payload: Optional[EventPayload]) -> EventPayload:
+        if payload is not None:
+            return payload
+        return EventPayload(event, _Data().get("current_test_case"))
+
+    def _call(self, handler: Callable, payload: EventPayload) -> Any:
+        if _accepts_payload(handler):
+            return handler(payload)
+        return handler()
+
+    def _tags(self, payload: EventPayload) -> dict[str, Any]:
+        test_case = payload.test_case
+        name = test_case.generate_name() if test_case is not None else None
+        return {"event": payload.event, "test_case": name}
+
+    def _timed_call(self, handler: Callable, payload: EventPayload) -> Any:
+        with timeline.span(_handler_name(handler), "handler", **self._tags(payload)):
+            if inspect.iscoroutinefunction(handler):
+                import asyncio
+
+                return asyncio.run(self._call(handler, payload))
+            return self._call(handler, payload)
+
+    async def _timed_call_async(self, handler: Callable, payload: EventPayload) -> Any:
+        import asyncio
+
+        with timeline.span(_handler_name(handler), "handler", **self._tags(payload)):
+            if inspect.iscoroutinefunction(handler):
+                return await self._call(handler, payload)
+            # Context is copied into the thread, so data bound by
+            # ``_Data.bind`` is still visible
+            return await asyncio.to_thread(self._call, handler, payload)
+
     def trigger(
         self,
         event: Literal[
@@ -20,15 +117,145 @@ class _Events(object):
             "update_environment",
             "end_experiment",
         ],
-    ) -> Any:
+        payload: Optional[EventPayload] = None,
+    ) -> list:
+        """Run handlers of ``event`` one by one, in an order that satisfies thei
+        r ``after``.
+
+        Args:
+            event (str): Event to trigger.
+            payload (EventPayload, optional): Passed to handlers that take it. D
+            efaults to None, the current test case is used.
+
+        Returns:
+            list: Return values of handlers, in the order they ran.
+        """
         if not hasattr(self, event):
             log.warn(f'Event: "{event}" doesn\'t have a handler.')
-            return
-        handler_names = [x.__qualname__ for x in self.__getattribute__(event)]
+            return []
+        handlers = [x for x, _ in self._ordered(event)]
+        handler_names = [_handler_name(x) for x in handlers]
         log.debug(f'Event: "{event}" has triggered, handlers: {handler_names}')
-        for handler in self.__getattribute__(event):
-            log.debug(f"{handler.__qualname__} involved.")
-            handler()
+        payload = self._payload(event, payload)
+        results = []
+        with timeline.span(event, "event", **self._tags(payload)):
+            for handler in handlers:
+                log.debug(f"{_handler_name(handler)} involved.")
+                results.append(self._timed_call(handler, payload))
+        return results
+
+    def _ordered(self, event: str) -> list[tuple[Callable, list[Callable]]]:
+        """Handlers of ``event`` in an order that satisfies their ``after``, wit
+        h the handlers each of them waits for."""
+        handlers = self.__getattribute__(event)
+        after = self._after.get(event, {})
+        by_name = {}
+        for handler in handlers:
+            by_name[handler.__name__] = handler
+            by_name[_handler_name(handler)] = handler
+        dependencies = {}
+        for handler in handlers:
+            dependencies[handler] = []
+            for name in after.get(handler, []):
+                if name not in by_name:
+                    raise ValueError(
+                        f'{_handler_name(handler)} runs after "{name}", which d'
+                        f'oesn\'t handle event "{event}".'
+                    )
+                dependencies[handler].append(by_name[name])
+        ordered, visiting, done = [], set(), set()
+
+        def visit(handler: Callable):
+            if handler in done:
+                return
+            if handler in visiting:
+                raise ValueError(f'Circular ordering of handlers of "{event}".')
+            visiting.add(handler)
+            for dependency in dependencies[handler]:
+                visit(dependency)
+            visiting.discard(handler)
+            done.add(handler)
+            ordered.append((handler, dependencies[handler]))
+
+        for handler in handlers:
+            visit(handler)
+        return ordered
+
+    async def trigger_async(
+        self, event: str, payload: Optional[EventPayload] = None
+    ) -> None:
+        """Run all handlers of ``event`` concurrently. Coroutine handlers run in
+        the current event loop, the others in threads. A handler registered wit
+        h ``after`` starts only when those handlers are finished, and errors of a
+        ny handler are raised after all handlers are done.
+
+        Args:
+            event (str): Event name.
+            payload (EventPayload, optional): Passed to handlers that accept a p
+            arameter. Defaults to None, i.e. event name and current test case.
+        """
+        import asyncio
+
+        if not hasattr(self, event):
+            log.warn(f'Event: "{event}" doesn\'t have a handler.')
+            return
+        ordered = self._ordered(event)
+        log.debug(
+            f'Event: "{event}" has triggered asynchronously, handlers: '
+            f"{[_handler_name(x) for x, _ in ordered]}"
+        )
+        payload = self._payload(event, payload)
+        tasks: dict[Callable, asyncio.Task] = {}
+
+        async def run(handler: Callable, dependencies: list[Callable]):
+            if dependencies:
+                await asyncio.gather(*[tasks[x] for x in dependencies])
+            log.debug(f"{_handler_name(handler)} involved.")
+            return await self._timed_call_async(handler, payload)
+
+        with timeline.span(event, "event", **self._tags(payload)):
+            for handler, dependencies in ordered:
+                tasks[handler] = asyncio.ensure_future(run(handler, dependencies))
+            results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def trigger_many_async(
+        self, events: list[str], payload: Optional[EventPayload] = None
+    ) -> None:
+        """Trigger several independent events concurrently, e.g. ``start_<marker
+        >`` events of all dimensions that change at once.
+
+        Args:
+            events (list[str]): Event names.
+            payload (EventPayload, optional): Passed to handlers that accept a p
+            arameter. Defaults to None, i.e. a payload per event.
+        """
+        import asyncio
+
+        results = await asyncio.gather(
+            *[self.trigger_async(x, payload) for x in events],
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    def trigger_many(
+        self, events: list[str], payload: Optional[EventPayload] = None
+    ) -> None:
+        """Blocking version of ``trigger_many_async``, it must not be called fro
+        m a running event loop.
+
+        Args:
+            events (list[str]): Event names.
+            payload (EventPayload, optional): Passed to handlers that accept a p
+            arameter. Defaults to None, i.e. a payload per event.
+        """
+        import asyncio
+
+        asyncio.run(self.trigger_many_async(events, payload))
 
     def register(
         self,
@@ -43,7 +270,10 @@ class _Events(object):
         ],
         handler: Callable,
         method: Literal["insert", "replace", "append"] = "replace",
+        after: Optional[list[str]] = None,
     ) -> None:
+        if after:
+            self._after.setdefault(event, {})[handler] = list(after)
         if method == "replace" or not hasattr(self, event):
             self.__setattr__(event, [handler])
             return
@@ -77,6 +307,13 @@ class _Components(object):
         return self.__getattribute__(name)
 
 
+# Data bound by ``_Data.bind``, a context variable so that it follows handlers
+# run in threads by ``_Events.trigger_async``
+_bound: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "bound_data", default=None
+)
+
+
 class _Data(object):
     def __new__(cls) -> "_Data":
         if not hasattr(cls, "instance"):
@@ -84,14 +321,40 @@ class _Data(object):
         return cls.instance
 
     def set(self, name: str, value: Any) -> None:
+        bound = _bound.get()
+        if bound is not None:
+            bound[name] = value
+            return
         self.__setattr__(name, value)
 
     def get(self, name: str) -> Any:
+        bound = _bound.get()
+        if bound is not None and name in bound:
+            return bound[name]
         if not hasattr(self, name):
             log.debug(f"{name} is not stored in manager.data, None will be returned.")
             return
         return self.__getattribute__(name)
 
+    def snapshot(self) -> dict[str, Any]:
+        """Shallow copy of all data, used to bind it to another thread."""
+        return dict(vars(self))
+
+    @contextmanager
+    def bind(self, data: dict[str, Any]):
+        """Let ``get`` and ``set`` of the current context use ``data`` instead
+        of shared data, so handlers running in background still see data of th
+        eir own test case while the main thread moves on.
+
+        Args:
+            data (dict[str, Any]): Usually a ``snapshot()``.
+        """
+        token = _bound.set(data)
+        try:
+            yield data
+        finally:
+            _bound.reset(token)
+
 
 class ManagerInterface(ABC):
     """An experiment manager must have ``run()`` method. Which represents the wo
@@ -0,0 +1,78 @@
+from typing import Optional
+from ..models import TestCases
+from .interfaces import ManagerInterface
+from ..utils.logger import log
+
+# Stages of a test case, in order. Prepare runs ``start_<marker>`` events (e.g.
+# interference generation), load runs ``start_single_test_case`` and collect
+# runs ``start_data_collection``.
+STAGES = ["prepare", "load", "collect"]
+
+
+class Pipeline:
+    """Run test cases in three stages: prepare environment, generate load and c
+    ollect data. Collection of a test case runs in background while the environm
+    ent of the next one is prepared. Prepare and load always run one after anoth
+    er in the calling thread, so interference of a test case never starts before
+    the load window of the previous one ends. A ``start_data_collection`` handle
+    r that starts collection elsewhere, e.g. ``collect_async``, returns its resul
+    t, and the collect stage waits for it.
+    """
+
+    def __init__(
+        self,
+        manager: ManagerInterface,
+        isolate_load: bool = True,
+        parallel_markers: bool = False,
+    ) -> None:
+        """Run test cases in three stages, collection of a test case overlaps pr
+        eparation of the next one.
+
+        Args:
+            manager (ManagerInterface): Manager whose events and data are used.
+            isolate_load (bool, optional): Wait for collection of the previous t
+            est case before generating load, so queries of collectors don't disturb
+            the load window. Defaults to True.
+            parallel_markers (bool, optional): Trigger events of markers of a te
+            st case concurrently, check ``BaseManager.run``. Defaults to False.
+        """
+        self.manager = manager
+        self.isolate_load = isolate_load
+        self.parallel_markers = parallel_markers
+
+    def _collect(self, data: dict) -> None:
+        # Handlers read data of their own test case, even if the main thread has
+        # moved on to the next one
+        with self.manager.data.bind(data):
+            results = self.manager.events.trigger("start_data_collection")
+        for result in results:
+            # Asynchronous collections, e.g. ``AsyncResult`` of a process pool,
+            # failures are handled by the collector
+            if callable(getattr(result, "wait", None)):
+                result.wait()
+
+    def run(self, test_cases: TestCases) -> None:
+        """Run all test cases.
+
+        Args:
+            test_cases (TestCases): Test cases of the experiment.
+        """
+        from concurrent.futures import Future, ThreadPoolExecutor
+
+        trigger = self.manager.events.trigger
+        collecting: Optional[Future] = None
+        with ThreadPoolExecutor(1, thread_name_prefix="collect") as executor:
+            for test_case in test_cases.generate():
+                test_cases.prepare(test_case, self.parallel_markers)
+                if collecting is not None and self.isolate_load:
+                    collecting.result()
+                trigger("start_single_test_case")
+                if collecting is not None:
+                    # At most one collection in flight, errors are raised here
+                    collecting.result()
+                collecting = executor.submit(
+                    self._collect, self.manager.data.snapshot()
+                )
+            if collecting is not None:
+                collecting.result()
+        log.debug(f"{__file__}: all stages {STAGES} finished.")
@@ -1,6 +1,16 @@
 from copy import deepcopy
 from typing import Any
 
+_ATOMIC = {int, float, str, bool, type(None)}
+
+
+def _copy_dict(data: dict) -> dict:
+    """Deep copy of a dict, shallow if its values are immutable, which is much
+    faster for the many copies made by ``TestCases.generate``."""
+    if _ATOMIC.issuperset(map(type, data.values())):
+        return dict(data)
+    return deepcopy(data)
+
 
 class TestCase:
     """A single test case of an experiment."""
@@ -24,7 +34,7 @@ class TestCase:
             Returns:
                 TestCase.Workload: Copied object.
             """
-            return TestCase.Workload(self.throughput, deepcopy(self.configs))
+            return TestCase.Workload(self.throughput, _copy_dict(self.configs))
 
     class Interference:
         """Configs and amount of interferences."""
@@ -64,7 +74,7 @@ class TestCase:
                 TestCase.Interference: Copied object.
             """
             obj = TestCase.Interference()
-            obj.inf_count = deepcopy(self.inf_count)
+            obj.inf_count = _copy_dict(self.inf_count)
             return obj
 
     def __init__(self) -> None:
@@ -124,13 +134,13 @@ class TestCase:
         Returns:
             TestCase: Copied object.
         """
-        obj = TestCase()
-        if self.workload is not None:
-            obj.workload = self.workload.copy()
+        # Attributes are all set below, skip defaults made by __init__
+        obj = TestCase.__new__(TestCase)
+        obj.workload = self.workload.copy() if self.workload is not None else None
         obj.interferences = self.interferences.copy()
         obj.round = self.round
-        obj.markers = deepcopy(self.markers)
-        obj.additional = deepcopy(self.additional)
+        obj.markers = list(self.markers)
+        obj.additional = _copy_dict(self.additional)
         return obj
 
     def generate_name(self) -> str:
@@ -1,3 +1,4 @@
+import gc
 from typing import Union, Callable
 from .test_case import TestCase
 
@@ -172,6 +173,19 @@ class TestCases:
                 test_cases.extend(updated_test_cases)
             return test_cases
 
+        # Cyclic garbage collection would scan the growing list of test cases
+        # again and again, it finds nothing here
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            test_cases = self._generate(product)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        self.generated_test_cases = test_cases
+        return test_cases
+
+    def _generate(self, product: Callable) -> list[TestCase]:
         test_cases = []
         for order in self.orders:
             match order:
@@ -195,26 +209,44 @@ class TestCases:
                         test_cases = product(
                             order, test_cases, self.__getattribute__(order)
                         )
-        self.generated_test_cases = test_cases
         return test_cases
 
     def __len__(self) -> int:
         self.generate()
         return len(self.generated_test_cases)
 
-    def iter(self, workflow: Callable[[TestCase], None]):
+    def iter(self, workflow: Callable[[TestCase], None], parallel: bool = False):
         """Iterate all test cases.
 
         Args:
             workflow (Callable[[TestCase], None]): A method that contains the wo
             rkflow of a single test case. Current test case will be passed into
             it as a parameter.
+            parallel (bool, optional): Trigger events of markers concurrently, c
+            heck ``prepare``. Defaults to False.
         """
-        from ..manager import manager
-
         self.generate()
         for test_case in self.generated_test_cases:
-            manager.data.set("current_test_case", test_case)
-            for marker in test_case.markers:
-                manager.events.trigger(f"start_{marker}")
+            self.prepare(test_case, parallel)
             workflow()
+
+    def prepare(self, test_case: TestCase, parallel: bool = False) -> None:
+        """Set ``test_case`` as current test case and trigger events of its mark
+        ers, i.e. update environment for it.
+
+        Args:
+            test_case (TestCase): Test case that is going to start.
+            parallel (bool, optional): Trigger events of all markers concurrentl
+            y with ``trigger_many``, e.g. generate several kinds of interference
+            at once. Their handlers must not depend on each other. Defaults to F
+            alse.
+        """
+        from ..manager import manager, EventPayload
+
+        manager.data.set("current_test_case", test_case)
+        events = [f"start_{marker}" for marker in test_case.markers]
+        if parallel and len(events) > 1:
+            manager.events.trigger_many(events)
+            return
+        for event in events:
+            manager.events.trigger(event, EventPayload(event, test_case))
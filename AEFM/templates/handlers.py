@@ -1,5 +1,6 @@
 from AEFM.manager import register, manager
 from AEFM import configs
+import os
 from time import time
 from AEFM.deployer import DeployerInterface
 from AEFM.deployer.base import BaseDeployer
@@ -8,8 +9,11 @@ from AEFM.workload_generator.base import (
     BaseWorkloadGenerator,
     WorkloadGeneratorInterface,
 )
+from AEFM.workload_generator.distributed import DistributedWorkloadGenerator
+from AEFM.workload_generator.load_planner import LoadPlanner
 from AEFM.data_collector import DataCollectorInterface
 from AEFM.data_collector.base import BaseDataCollector
+from AEFM.data_collector.profiling import CollectionProfiler
 from AEFM.utils.jaeger_fetcher import JaegerFetcher
 from AEFM.data_collector.jaeger_trace_collector import JaegerTraceCollector
 from AEFM.data_collector.wrk_throughput_collector import WrkThroughputCollector, WrkFetcher
@@ -19,6 +23,8 @@ from AEFM.inf_generator import InfGeneratorInterface
 from AEFM.inf_generator.base import BaseInfGenerator
 from AEFM.models import TestCase
 from AEFM.utils.logger import log
+from AEFM.utils.timeline import timeline
+from AEFM.utils.metrics import metrics
 from AEFM.data_collector import TestCaseData
 
 
@@ -39,6 +45,19 @@ def start_experiment_handler():
     log.info("Generating deployer success, set to components.deployer")
     # Workload generator setup
     wrk_config = configs_obj.test_cases.workload.configs
+    # Nodes with "loadgen" role run wrk clients, otherwise run them locally
+    loadgen_nodes = configs_obj.nodes.get("loadgen", [])
+    # Size threads and connections of every wrk client by its rate
+    load_planner = None
+    if wrk_config.get("auto_scale", False):
+        if len(loadgen_nodes) > 0 and wrk_config.get("cores") is None:
+            log.warn("Cores of loadgen nodes are not configured, local cores are used.")
+        load_planner = LoadPlanner(
+            wrk_config["rate"],
+            cores=wrk_config.get("cores"),
+            expected_latency=wrk_config.get("expected_latency", 0.1),
+            nodes=len(loadgen_nodes),
+        )
     wrk_config = WrkConfig(
         "wrk",
         wrk_config["url"],
@@ -47,11 +66,30 @@ def start_experiment_handler():
         configs_obj.duration,
         wrk_config["script"],
         wrk_config["rate"],
+        # Per-second throughput is required to detect warm-up and cool-down
+        timeseries="auto" in [
+            getattr(configs_obj, "warmup", 0),
+            getattr(configs_obj, "cooldown", 0),
+        ],
     )
-    manager.components.set(
-        "workload_generator",
-        BaseWorkloadGenerator(wrk_config, configs_obj.file_paths["wrk_output_path"]),
-    )
+    # Test cases whose load clients are unhealthy are retried
+    max_retries = getattr(configs_obj, "max_retries", 0)
+    if len(loadgen_nodes) > 0:
+        workload_generator = DistributedWorkloadGenerator(
+            wrk_config,
+            configs_obj.file_paths["wrk_output_path"],
+            loadgen_nodes,
+            max_retries=max_retries,
+            load_planner=load_planner,
+        )
+    else:
+        workload_generator = BaseWorkloadGenerator(
+            wrk_config,
+            configs_obj.file_paths["wrk_output_path"],
+            max_retries=max_retries,
+            load_planner=load_planner,
+        )
+    manager.components.set("workload_generator", workload_generator)
     log.info(
         "Generating workload generator success, set to components.workload_generator"
     )
@@ -64,11 +102,20 @@ def start_experiment_handler():
     wrk_collector = WrkThroughputCollector(wrk_fetcher)
     prom_fetcher = PromFetcher(configs_obj["prometheus_host"], configs_obj.namespace)
     prom_collector = PromHardwareCollector(prom_fetcher)
+    # Profile every data collection, "cprofile" adds function level reports
+    profiler = None
+    profile_collection = getattr(configs_obj, "profile_collection", False)
+    if profile_collection:
+        profiler = CollectionProfiler(
+            f"{configs_obj.file_paths.collector_data}/profile",
+            use_cprofile=profile_collection == "cprofile",
+        )
     data_collector = BaseDataCollector(
         configs_obj.file_paths.collector_data,
         jaeger_collector,
         prom_collector,
         wrk_collector,
+        profiler=profiler,
     )
     manager.components.set("data_collector", data_collector)
     log.info("Generating data collector success, set to components.data_collector")
@@ -84,9 +131,26 @@ def start_experiment_handler():
     )
     # Generate testcases
     manager.data.set("test_cases", configs_obj.test_cases)
+    # A dry run leaves logs and servers of real runs alone
+    dry_run = manager.data.get("dry_run")
     # Set log file location
-    log.set_log_file_path(configs_obj.file_paths.log)
-    log.key(f"Log file will be saved in {configs_obj.file_paths.log}.")
+    if not dry_run:
+        log.set_log_file_path(configs_obj.file_paths.log)
+        log.key(f"Log file will be saved in {configs_obj.file_paths.log}.")
+    # Time spent by every handler and wait, next to the log by default
+    timeline_path = getattr(configs_obj.file_paths, "timeline", None)
+    if timeline_path is None:
+        timeline_path = os.path.splitext(configs_obj.file_paths.log)[0] + ".timeline.jsonl"
+    timeline.set_file_path(timeline_path)
+    # Progress and estimated remaining time, rewritten after every test case
+    status_path = getattr(configs_obj.file_paths, "status", None)
+    if status_path is None:
+        status_path = os.path.splitext(configs_obj.file_paths.log)[0] + ".status.json"
+    manager.data.set("status_file_path", status_path)
+    # Metrics of AEFM itself in Prometheus format, disabled by default
+    metrics_port = getattr(configs_obj, "metrics_port", None)
+    if metrics_port is not None and not dry_run:
+        metrics.serve(metrics_port, getattr(configs_obj, "metrics_host", "127.0.0.1"))
 
 
 @register(event="init_environment")
@@ -115,15 +179,34 @@ def start_single_test_case_handler():
     log.key(f"Current test case: {test_case}")
     workload_generator = manager.components.get("workload_generator")
     assert isinstance(workload_generator, WorkloadGeneratorInterface)
+    configs_obj = manager.data.get("configs")
     start_time = time()
-    workload_generator.run(test_case.workload.throughput, test_case.generate_name())
+    result = workload_generator.run(
+        test_case.workload.throughput, test_case.generate_name()
+    )
     end_time = time()
+    # Use the time of the last attempt if the run is retried
+    if getattr(result, "start_time", None) is not None:
+        start_time, end_time = result.start_time, result.end_time
+    # Warm-up and cool-down are either seconds or "auto"
+    warmup = getattr(configs_obj, "warmup", 0)
+    cooldown = getattr(configs_obj, "cooldown", 0)
     test_case_data = TestCaseData(
         start_time,
         end_time,
         test_case.generate_name(),
         additional_columns=test_case.to_dict(),
+        warmup=0 if warmup == "auto" else warmup,
+        cooldown=0 if cooldown == "auto" else cooldown,
     )
+    if "auto" in [warmup, cooldown]:
+        detected = test_case_data.trim_by_timeseries(
+            getattr(result, "timeseries", None),
+            warmup=warmup == "auto",
+            cooldown=cooldown == "auto",
+        )
+        if not detected:
+            log.warn("Steady state is not detected, full load window is used.")
     manager.data.set("test_case_data", test_case_data)
 
 
@@ -131,7 +214,8 @@ def start_single_test_case_handler():
 def start_data_collection_handler():
     data_collector = manager.components.get("data_collector")
     assert isinstance(data_collector, DataCollectorInterface)
-    data_collector.collect_async(manager.data.get("test_case_data"))
+    # Returned, so a pipelined run waits for the collection itself
+    return data_collector.collect_async(manager.data.get("test_case_data"))
 
 
 @register(event="end_experiment")
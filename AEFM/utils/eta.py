@@ -0,0 +1,171 @@
+import json, os, threading
+from collections import Counter
+from time import perf_counter, time
+from typing import Any, Optional
+from .logger import log
+from .metrics import metrics
+from .timeline import COLLECT_EVENT, LOAD_EVENT, Span
+from .timer import parser
+
+
+class PhaseEstimator:
+    """Estimate remaining time of an experiment from the cost of its phases inst
+    ead of a flat average. Every test case costs a base period (load, collection
+    lag and anything else between two loads), and every marker of it adds the c
+    ost of its transition (``start_<marker>`` event, e.g. interference regenera
+    tion). Costs are exponential moving averages of observed event spans, the r
+    emaining schedule is known from test cases, so every update is O(1). Transi
+    tions that run concurrently (``parallel_markers``) are measured by their wal
+    l time window, and the share of their summed costs it takes ("overlap") sca
+    les remaining transitions.
+    """
+
+    def __init__(
+        self,
+        test_cases: list,
+        alpha: float = 0.3,
+        load_duration: Optional[float] = None,
+        status_file_path: Optional[str] = None,
+        level: str = "key",
+    ) -> None:
+        """Estimate remaining time of an experiment from the cost of its phases.
+
+        Args:
+            test_cases (list[TestCase]): Generated test cases, in running order.
+            alpha (float, optional): Weight of the newest observation in moving
+            averages. Defaults to 0.3.
+            load_duration (float, optional): Expected duration of a load, used b
+            efore the first test case finishes, unit: second. Defaults to None.
+            status_file_path (str, optional): Write the estimate to this JSON fi
+            le after every test case. Defaults to None.
+            level (str, optional): Log level of progress messages. Defaults to "
+            key".
+        """
+        self.total = len(test_cases)
+        self.alpha = alpha
+        self.load_duration = load_duration
+        self.status_file_path = status_file_path
+        self.level = level
+        self.done = 0
+        # Transitions not started yet, counted once from the schedule
+        self.remaining_markers = Counter(
+            marker for test_case in test_cases for marker in test_case.markers
+        )
+        self.costs: dict[str, float] = {}
+        self._started = perf_counter()
+        self._last_load_end: Optional[float] = None
+        # Wall time window of transitions since the last load, concurrent ones
+        # (``parallel_markers``) overlap
+        self._transitions: Optional[tuple[float, float]] = None
+        self._transitions_sum = 0.0
+        # Collection of the pipeline is observed from another thread
+        self._lock = threading.Lock()
+
+    def _update(self, phase: str, seconds: float) -> None:
+        if phase not in self.costs:
+            self.costs[phase] = seconds
+        else:
+            self.costs[phase] += self.alpha * (seconds - self.costs[phase])
+
+    def observe(self, span: Span) -> None:
+        """Update costs with a finished span, used as a listener of ``timeline``
+        .
+
+        Args:
+            span (Span): Recorded span, only events are used.
+        """
+        if span.category != "event":
+            return
+        seconds = span.duration_ns / 1e9
+        start = span.start_ns / 1e9
+        end = start + seconds
+        event = span.name
+        with self._lock:
+            self._update(event, seconds)
+            if event.startswith("start_") and event[6:] in self.remaining_markers:
+                marker = event[6:]
+                if self.remaining_markers[marker] > 0:
+                    self.remaining_markers[marker] -= 1
+                self._transitions_sum += seconds
+                if self._transitions is None:
+                    self._transitions = (start, end)
+                else:
+                    first, last = self._transitions
+                    self._transitions = (min(first, start), max(last, end))
+                return
+            if event != LOAD_EVENT:
+                return
+            if self._last_load_end is not None:
+                transitions = 0.0
+                if self._transitions is not None:
+                    transitions = self._transitions[1] - self._transitions[0]
+                    if self._transitions_sum > 0:
+                        # Share of transition costs that is not overlapped
+                        self._update("overlap", transitions / self._transitions_sum)
+                # Period between two loads without transitions, it includes
+                # collection that is not overlapped
+                self._update(
+                    "case", max(0.0, end - self._last_load_end - transitions)
+                )
+            self._last_load_end = end
+            self._transitions = None
+            self._transitions_sum = 0.0
+            self.done += 1
+        self.report()
+
+    @property
+    def case_cost(self) -> float:
+        """Expected base cost of a test case, unit: second."""
+        if "case" in self.costs:
+            return self.costs["case"]
+        if LOAD_EVENT in self.costs:
+            return self.costs[LOAD_EVENT] + self.costs.get(COLLECT_EVENT, 0.0)
+        return self.load_duration or 0.0
+
+    def estimate(self) -> float:
+        """Remaining time of the experiment, unit: second."""
+        transitions = 0.0
+        for marker, count in self.remaining_markers.items():
+            transitions += count * self.costs.get(f"start_{marker}", 0.0)
+        return (self.total - self.done) * self.case_cost + transitions * self.costs.get(
+            "overlap", 1.0
+        )
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            elapsed = perf_counter() - self._started
+            remaining = self.estimate()
+            return {
+                "time": time(),
+                "done": self.done,
+                "total": self.total,
+                "elapsed": elapsed,
+                "remaining": remaining,
+                "finish_at": time() + remaining,
+                "costs": dict(self.costs),
+                "remaining_transitions": dict(self.remaining_markers),
+            }
+
+    def report(self) -> None:
+        """Log progress, export it as metrics and write the status file."""
+        status = self.status()
+        metrics.set("aefm_test_case_index", status["done"], "Current test case")
+        metrics.set(
+            "aefm_remaining_seconds", status["remaining"], "Estimated remaining time"
+        )
+        log.log(
+            f"Test case {status['done']}/{status['total']} - Elapsed: "
+            f"{parser(int(status['elapsed']))}; Estimated left: "
+            f"{parser(int(status['remaining']))}",
+            level=self.level,
+        )
+        if self.status_file_path is None:
+            return
+        folder = os.path.dirname(self.status_file_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        # Readers never see a half written file
+        temp_path = f"{self.status_file_path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(status, file)
+        os.replace(temp_path, self.status_file_path)
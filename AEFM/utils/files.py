@@ -1,5 +1,8 @@
 import os, shutil, pathlib
-import pandas as pd
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def create_folder(path: str, delete: bool = False) -> None:
@@ -41,7 +44,7 @@ def write_to_file(path: str, content: str, append: bool = False) -> None:
         file.write(content)
 
 
-def append_csv_to_file(path: str, csv: pd.DataFrame) -> None:
+def append_csv_to_file(path: str, csv: "pd.DataFrame") -> None:
     """Append pandas DataFrame to file.
 
     Args:
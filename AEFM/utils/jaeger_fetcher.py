@@ -1,5 +1,5 @@
-import requests
 from requests import Response
+from .metrics import timed_get
 
 
 class JaegerFetcher:
@@ -43,5 +43,5 @@ class JaegerFetcher:
         }
         if operation is not None:
             request_data["operation"] = operation
-        req = requests.get(self.url, params=request_data)
+        req = timed_get("jaeger", self.url, params=request_data)
         return req
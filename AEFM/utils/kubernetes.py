@@ -1,22 +1,103 @@
-import os, json
+import os, json, threading
 from time import sleep
+from typing import Optional
 from kubernetes import utils, config, client
 from .logger import log
+from .timeline import timeline
+from .metrics import metrics
 import yaml
 
-config.load_kube_config()
 
+class KubernetesClients:
+    """Kubernetes API clients shared by the whole process. Kubeconfig is loaded
+    when a client is requested for the first time, so importing AEFM does not r
+    equire a cluster. Clients are rebuilt after fork, as connections of the con
+    nection pool cannot be shared between processes.
+    """
 
-def deploy_by_yaml(
-    folder: str,
+    def __init__(self, pool_size: int = 16) -> None:
+        """Kubernetes API clients shared by the whole process.
+
+        Args:
+            pool_size (int, optional): Maximum connections kept by the connecti
+            on pool. Defaults to 16.
+        """
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._api_client: Optional[client.ApiClient] = None
+        self._apis: dict[type, object] = {}
+
+    def set_pool_size(self, pool_size: int) -> None:
+        """Change connection pool size, clients will be rebuilt on next use.
+
+        Args:
+            pool_size (int): Maximum connections kept by the connection pool.
+        """
+        with self._lock:
+            self.pool_size = pool_size
+            self._api_client = None
+            self._apis = {}
+
+    def api_client(self) -> client.ApiClient:
+        """Shared ``ApiClient``, load kubeconfig if it is the first call."""
+        if self._api_client is not None and self._pid == os.getpid():
+            return self._api_client
+        with self._lock:
+            if self._api_client is None or self._pid != os.getpid():
+                configuration = client.Configuration()
+                config.load_kube_config(client_configuration=configuration)
+                configuration.connection_pool_maxsize = self.pool_size
+                # Clients created by ``client.XxxApi()`` elsewhere use it as well
+                client.Configuration.set_default(configuration)
+                self._apis = {}
+                self._api_client = client.ApiClient(configuration)
+                self._pid = os.getpid()
+            return self._api_client
+
+    def _api(self, api_type: type):
+        api_client = self.api_client()
+        api = self._apis.get(api_type)
+        if api is None:
+            api = self._apis.setdefault(api_type, api_type(api_client))
+        return api
+
+    def core_v1(self) -> client.CoreV1Api:
+        """Shared ``CoreV1Api``."""
+        return self._api(client.CoreV1Api)
+
+    def apps_v1(self) -> client.AppsV1Api:
+        """Shared ``AppsV1Api``."""
+        return self._api(client.AppsV1Api)
+
+
+kube_clients = KubernetesClients()
+
+
+def _load_yaml_folder(folder: str) -> list[dict]:
+    objs = []
+    for file_name in [
+        x for x in os.listdir(folder) if x[-5:] == ".yaml" or x[-4:] == ".yml"
+    ]:
+        with open(f"{folder}/{file_name}", "r", encoding="utf-8") as file:
+            objs.extend(
+                x for x in yaml.load_all(file, Loader=yaml.CLoader) if x is not None
+            )
+    return objs
+
+
+def deploy_by_objects(
+    objs: list[dict],
     wait: bool = False,
     namespace: str = None,
     timeout: int = 300,
 ):
-    """Deploy all YAMLs under certain ``folder``.
+    """Deploy kubernetes components from already loaded YAML objects, no file I/
+    O or YAML parsing is involved.
 
     Args:
-        folder (str): Path to the Folder.
+        objs (list[dict]): Kubernetes YAML objects, e.g. ``KubernetesYAMLs.yaml
+        s``.
         wait (bool, optional): Should the program wait for deployment finished?
         Need to specify ``namespace`` if set to True. Defaults to False.
         namespace (str, optional): Where to monitor deployments, need to be spec
@@ -25,24 +106,55 @@ def deploy_by_yaml(
         300.
 
     Raises:
+        FailToCreateError: Raise after all objects are tried if some of them ca
+        n not be created, with errors of all of them.
         BaseException: Raise when ``namespace`` is not specified but ``wait`` is
         set to True.
     """
-    api_client = client.ApiClient()
-    for file in [
-        x for x in os.listdir(folder) if x[-5:] == ".yaml" or x[-4:] == ".yml"
-    ]:
-        utils.create_from_yaml(api_client, f"{folder}/{file}")
+    api_client = kube_clients.api_client()
+    # Keep creating other objects on failures, as create_from_yaml does
+    failures = []
+    for obj in objs:
+        try:
+            utils.create_from_dict(api_client, obj)
+        except utils.FailToCreateError as e:
+            failures.extend(e.api_exceptions)
+    if failures:
+        raise utils.FailToCreateError(failures)
     if wait:
         if namespace is None:
             raise BaseException("No namespace spcified")
         wait_deployment(namespace, timeout)
 
 
+def deploy_by_yaml(
+    folder: str,
+    wait: bool = False,
+    namespace: str = None,
+    timeout: int = 300,
+):
+    """Deploy all YAMLs under certain ``folder``.
+
+    Args:
+        folder (str): Path to the Folder.
+        wait (bool, optional): Should the program wait for deployment finished?
+        Need to specify ``namespace`` if set to True. Defaults to False.
+        namespace (str, optional): Where to monitor deployments, need to be spec
+        ified if ``wait`` is set to True. Defaults to None.
+        timeout (int, optional): Timeout of wait, units in seconds. Defaults to
+        300.
+
+    Raises:
+        BaseException: Raise when ``namespace`` is not specified but ``wait`` is
+        set to True.
+    """
+    deploy_by_objects(_load_yaml_folder(folder), wait, namespace, timeout)
+
+
 def delete_deployment(
     name: str, namespace: str, wait: bool = False, timeout: int = 300
 ):
-    api_client = client.AppsV1Api()
+    api_client = kube_clients.apps_v1()
     try:
         api_client.delete_namespaced_deployment(name, namespace)
     except client.ApiException as e:
@@ -52,16 +164,17 @@ def delete_deployment(
         wait_deletion(namespace, timeout)
 
 
-def delete_by_yaml(
-    folder: str,
+def delete_by_objects(
+    objs: list[dict],
     wait: bool = False,
     namespace: str = None,
     timeout: int = 300,
 ):
-    """Delete kubernetes components by YAMLs under certain ``folder``.
+    """Delete kubernetes components described by already loaded YAML objects.
 
     Args:
-        folder (str): Path to the Folder.
+        objs (list[dict]): Kubernetes YAML objects, e.g. ``KubernetesYAMLs.yaml
+        s``.
         wait (bool, optional): Should the program wait for deletion finished?
         Need to specify ``namespace`` if set to True. Defaults to False.
         namespace (str, optional): Where to monitor deployments, need to be spec
@@ -73,16 +186,11 @@ def delete_by_yaml(
         BaseException: Raise when ``namespace`` is not specified but ``wait`` is
         set to True.
     """
-    objs = []
-    for file_name in [x for x in os.listdir(folder) if ".yaml" in x or ".yml" in x]:
-        file = open(f"{folder}/{file_name}", "r", encoding="utf-8")
-        objs += yaml.load_all(file, Loader=yaml.CLoader)
-        file.close()
     # todo: Temporarily use code from pull requests, replace this after kubernetes
     # python api release a newer version contains this.
     from .delete_from import delete_from_yaml, FailToDeleteError
 
-    api_client = client.ApiClient()
+    api_client = kube_clients.api_client()
     try:
         delete_from_yaml(k8s_client=api_client, yaml_objects=objs)
     except FailToDeleteError as e:
@@ -95,8 +203,37 @@ def delete_by_yaml(
         wait_deletion(namespace, timeout)
 
 
+def delete_by_yaml(
+    folder: str,
+    wait: bool = False,
+    namespace: str = None,
+    timeout: int = 300,
+):
+    """Delete kubernetes components by YAMLs under certain ``folder``.
+
+    Args:
+        folder (str): Path to the Folder.
+        wait (bool, optional): Should the program wait for deletion finished?
+        Need to specify ``namespace`` if set to True. Defaults to False.
+        namespace (str, optional): Where to monitor deployments, need to be spec
+        ified if ``wait`` is set to True. Defaults to None.
+        timeout (int, optional): Timeout of wait, units in seconds. Defaults to
+        300.
+
+    Raises:
+        BaseException: Raise when ``namespace`` is not specified but ``wait`` is
+        set to True.
+    """
+    delete_by_objects(_load_yaml_folder(folder), wait, namespace, timeout)
+
+
 def _wait_core(namespace: str, timeout: int, wait_type: str, condition):
-    api = client.CoreV1Api()
+    with timeline.span(wait_type, "wait", namespace=namespace):
+        _wait_loop(namespace, timeout, wait_type, condition)
+
+
+def _wait_loop(namespace: str, timeout: int, wait_type: str, condition):
+    api = kube_clients.core_v1()
     used_time = 0
     finished_flag = False
     log.info(f"Waiting for {wait_type} finished...")
@@ -113,6 +250,9 @@ def _wait_core(namespace: str, timeout: int, wait_type: str, condition):
             log.info(f"Unfinished Pods: {', '.join(unfinished_pods)}", update=True)
         used_time += 5
     if not finished_flag:
+        metrics.inc(
+            "aefm_wait_timeouts_total", help="Timed out waits", wait_type=wait_type
+        )
         log.warn(f"{wait_type} waiting timeout!", to_file=True)
         log.debug(f"Unfinished Pods: {', '.join(unfinished_pods)}", to_file=True)
     else:
@@ -203,7 +343,7 @@ def wait_all(namespace: str, timeout: int):
 def delete_config_map(
     name: str, namespace: str, wait: bool = False, timeout: int = 300
 ):
-    api_client = client.CoreV1Api()
+    api_client = kube_clients.core_v1()
     try:
         api_client.delete_namespaced_config_map(name, namespace)
     except client.ApiException as e:
@@ -216,7 +356,7 @@ def delete_config_map(
 def delete_daemon_set(
     name: str, namespace: str, wait: bool = False, timeout: int = 300
 ):
-    api_client = client.AppsV1Api()
+    api_client = kube_clients.apps_v1()
     try:
         api_client.delete_namespaced_daemon_set(name, namespace)
     except client.ApiException as e:
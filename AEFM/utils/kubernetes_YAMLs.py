@@ -1,25 +1,80 @@
 import os, yaml, re
-from typing import Any, Optional
-from collections.abc import Callable
+from typing import Any, Optional, Union
+from collections.abc import Callable, Iterable
+from functools import lru_cache
 from ..models import PodSpec, Node
 from .files import delete_path, create_folder
 from copy import deepcopy
 
+_BRACKETS = re.compile(r"(.*)\[(\d+)\]")
+_SCALARS = (str, int, float, bool, type(None))
 
-_AFFINITY_TEMPLATE = """
-nodeAffinity:
-  requiredDuringSchedulingIgnoredDuringExecution:
-    nodeSelectorTerms:
-    - matchExpressions:
-      - key: kubernetes.io/hostname
-        operator: In
-        values: %%%
-"""
+
+# Parsed YAML files shared by the whole process, path -> ((mtime, size), objects)
+_TEMPLATE_CACHE: dict[str, tuple[tuple[int, int], tuple[dict, ...]]] = {}
+
+
+def _load_yaml_file(path: str) -> tuple[dict, ...]:
+    """Load all YAML documents of a file. Parsed documents are cached by path a
+    nd reparsed only if modification time or size of the file changed. Returned
+    objects are shared, never edit them in place.
+    """
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _TEMPLATE_CACHE.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with open(path, "r") as file:
+        objs = tuple(
+            x for x in yaml.load_all(file, Loader=yaml.CLoader) if x is not None
+        )
+    _TEMPLATE_CACHE[path] = (version, objs)
+    return objs
+
+
+def build_node_affinity(nodes: list[Node]) -> dict:
+    """Build the ``affinity`` section that limits pods to ``nodes``.
+
+    Args:
+        nodes (list[Node]): List of available nodes.
+
+    Returns:
+        dict: Node affinity, can be set to ``spec.template.spec.affinity``.
+    """
+    return {
+        "nodeAffinity": {
+            "requiredDuringSchedulingIgnoredDuringExecution": {
+                "nodeSelectorTerms": [
+                    {
+                        "matchExpressions": [
+                            {
+                                "key": "kubernetes.io/hostname",
+                                "operator": "In",
+                                "values": [str(x) for x in nodes],
+                            }
+                        ]
+                    }
+                ]
+            }
+        }
+    }
+
+
+class _NoAliasDumper(yaml.CDumper):
+    """libyaml based dumper. YAML may dump reference instead of object when the
+    same object appears twice, which kubernetes cannot understand.
+    Ref: https://stackoverflow.com/questions/51272814/python-yaml-dumping-pointer-references
+    """
+
+    def ignore_aliases(self, data):
+        return True
 
 
 class KubernetesYAMLs:
     """KubernetesYAMLs load kubernetes componetns from YAML files and provide me
-    thods to edit them quickly.
+    thods to edit them quickly. Parsed files are cached for the whole process,
+    an object is only copied when it is edited for the first time, so objects in
+    ``yamls`` should be edited by ``update`` or ``batch_update`` only.
     """
 
     def __init__(self, path: str) -> None:
@@ -28,23 +83,73 @@ class KubernetesYAMLs:
         Args:
             path (str): A folder with YAML files or a single YAML file.
         """
+        path = os.path.abspath(path)
         if os.path.isfile(path):
-            with open(path, "r") as file:
-                self.yamls: list[dict] = [
-                    x for x in yaml.load_all(file, Loader=yaml.CLoader) if x is not None
-                ]
+            self.yamls: list[dict] = list(_load_yaml_file(path))
         elif os.path.isdir(path):
             yaml_files = [
                 x for x in os.listdir(path) if x[-5:] == ".yaml" or x[-4:] == ".yml"
             ]
             yaml_list = []
             for file_name in yaml_files:
-                with open(f"{path}/{file_name}", "r") as file:
-                    yaml_objs = yaml.load_all(file, Loader=yaml.CLoader)
-                    yaml_list.extend([x for x in yaml_objs if x is not None])
+                yaml_list.extend(_load_yaml_file(f"{path}/{file_name}"))
             self.yamls: list[dict] = yaml_list
         else:
             raise FileNotFoundError(f"{path} not found")
+        # Objects still shared with the template cache
+        self._shared: list[bool] = [True] * len(self.yamls)
+
+    def _own(self, position: int) -> dict:
+        """Copy the object at ``position`` if it is still shared with the templat
+        e cache, and return the object that can be edited."""
+        if position < len(self._shared) and self._shared[position]:
+            self.yamls[position] = _clone(self.yamls[position])
+            self._shared[position] = False
+        return self.yamls[position]
+
+    def _build_index(self) -> None:
+        self._kind_index: dict[str, list[int]] = {}
+        self._name_index: dict[tuple[str, str], int] = {}
+        for i, yaml_obj in enumerate(self.yamls):
+            kind = yaml_obj.get("kind")
+            self._kind_index.setdefault(kind, []).append(i)
+            metadata = yaml_obj.get("metadata")
+            if isinstance(metadata, dict) and "name" in metadata:
+                self._name_index[(kind, metadata["name"])] = i
+        self._indexed_count = len(self.yamls)
+
+    def _targets(self, target_kind: Optional[str]) -> Iterable[int]:
+        """Positions in ``self.yamls`` of objects with kind ``target_kind``, all
+        positions if ``target_kind`` is None."""
+        if target_kind is None:
+            return range(len(self.yamls))
+        if not hasattr(self, "_kind_index") or self._indexed_count != len(self.yamls):
+            self._build_index()
+        return self._kind_index.get(target_kind, [])
+
+    def _invalidate_index(self, segments_list: Iterable[tuple]) -> None:
+        for segments in segments_list:
+            if segments[0] == ("kind", None) or segments[:2] == (
+                ("metadata", None),
+                ("name", None),
+            ):
+                if hasattr(self, "_kind_index"):
+                    del self._kind_index
+                return
+
+    def get(self, kind: str, name: str) -> Optional[dict]:
+        """Get a YAML object by its ``kind`` and ``metadata.name``.
+
+        Args:
+            kind (str): Kubernetes kind, e.g. "Deployment".
+            name (str): Value of ``metadata.name``.
+
+        Returns:
+            Optional[dict]: Found YAML object, None if not exists.
+        """
+        self._targets(kind)
+        position = self._name_index.get((kind, name))
+        return self.yamls[position] if position is not None else None
 
     def update(
         self,
@@ -70,18 +175,42 @@ class KubernetesYAMLs:
         Returns:
             KubernetesYAMLs: Return self for chaining.
         """
-        edited_yaml: list[dict] = []
-        for yaml_obj in self.yamls:
-            if target_kind is not None:
-                target_success, target, _ = search_path(yaml_obj, "kind")
-                if target != target_kind or not target_success:
-                    edited_yaml.append(yaml_obj)
-                    continue
-            if key_path is not None:
-                edited_yaml.append(_mapping_edit(yaml_obj, path, value, key_path))
-            else:
-                edited_yaml.append(_edit(yaml_obj, path, value))
-        self.yamls = edited_yaml
+        if key_path is None:
+            return self.batch_update([(path, value)], target_kind)
+        segments = _compile_path(path)
+        key_segments = _compile_path(key_path)
+        for i in self._targets(target_kind):
+            success, key = _get(self.yamls[i], key_segments)
+            if success and key in value:
+                _edit_compiled(self._own(i), segments, _clone(value[key]))
+        self._invalidate_index([segments])
+        return self
+
+    def batch_update(
+        self,
+        updates: Union[dict[str, Any], list[tuple[str, Any]]],
+        target_kind: Optional[str] = "Deployment",
+    ) -> "KubernetesYAMLs":
+        """Apply many path/value pairs in a single traversal of the YAML objects,
+        pairs are applied in the given order.
+
+        Args:
+            updates (Union[dict[str, Any], list[tuple[str, Any]]]): Path and val
+            ue pairs, paths are in the same format as ``update``.
+            target_kind (str, optional): Which kind of kubernetes YAML is needed
+            to be edit. Defaults to "Deployment".
+
+        Returns:
+            KubernetesYAMLs: Return self for chaining.
+        """
+        if isinstance(updates, dict):
+            updates = updates.items()
+        compiled = [(_compile_path(path), value) for path, value in updates]
+        for i in self._targets(target_kind):
+            yaml_obj = self._own(i)
+            for segments, value in compiled:
+                _edit_compiled(yaml_obj, segments, _clone(value))
+        self._invalidate_index([segments for segments, _ in compiled])
         return self
 
     def save(self, path: str) -> None:
@@ -94,13 +223,10 @@ class KubernetesYAMLs:
         delete_path(path)
 
         def save_file(yaml_obj, file_path):
-            # YAML may dump reference instead of object,
-            # following code help to avoid this kind of case.
-            # Totally have no idea why this can work
-            # Ref: https://stackoverflow.com/questions/51272814/python-yaml-dumping-pointer-references
-            yaml.Dumper.ignore_aliases = lambda *_: True
             with open(file_path, "w") as file:
-                yaml.dump(yaml_obj, file, default_flow_style=False)
+                yaml.dump(
+                    yaml_obj, file, Dumper=_NoAliasDumper, default_flow_style=False
+                )
 
         if len(self.yamls) == 1:
             create_folder(path)
@@ -171,17 +297,53 @@ class KubernetesYAMLs:
         Returns:
             KubernetesYAMLs: Return self for chaining.
         """
-        node_strs = [str(x) for x in nodes]
-        node_affinity = yaml.load(
-            _AFFINITY_TEMPLATE.replace("%%%", f'[{", ".join(node_strs)}]'),
-            yaml.CLoader,
-        )
         path = "spec.template.spec.affinity"
-        value = node_affinity
+        value = build_node_affinity(nodes)
         self.update(path, value)
         return self
 
 
+@lru_cache(maxsize=None)
+def _compile_path(path: str) -> tuple[tuple[str, Optional[int]], ...]:
+    """Parse a Python format like path into segments, e.g. "spec.containers[0].
+    image" becomes ``(("spec", None), ("containers", 0), ("image", None))``. Re
+    sults are cached, so every distinct path is only parsed once.
+
+    Args:
+        path (str): Python format like path indictor.
+
+    Returns:
+        tuple[tuple[str, Optional[int]], ...]: Key and list index (None if the
+        segment is not a list item) of each segment.
+    """
+    segments = []
+    for prop in path.split("."):
+        brackets = _BRACKETS.search(prop)
+        if brackets:
+            segments.append((str(brackets.group(1)), int(brackets.group(2))))
+        else:
+            segments.append((prop, None))
+    return tuple(segments)
+
+
+def _segment_str(key: str, index: Optional[int]) -> str:
+    return key if index is None else f"{key}[{index}]"
+
+
+def _clone(value: Any) -> Any:
+    """Copy nested dicts and lists. Much cheaper than ``deepcopy`` for parsed YA
+    ML data, which only contains dicts, lists and immutable scalars.
+    """
+    value_type = type(value)
+    if value_type is dict:
+        return {k: _clone(v) for k, v in value.items()}
+    if value_type is list:
+        return [_clone(v) for v in value]
+    if value_type in _SCALARS:
+        return value
+    return deepcopy(value)
+
+
 def search_path(
     obj: dict,
     path: str,
@@ -211,14 +373,10 @@ def search_path(
         Tuple[bool, dict, str]: is success, last object, last searched path.
     """
     partial_obj = obj
-    path_list = path.split(".")
     searched_path = []
-    for prop in path_list:
+    for prop, list_index in _compile_path(path):
         # Check if prop is trying to find an item from a list
-        brackets = re.search(r"(.*)\[(\d+)\]", prop)
-        if brackets:
-            prop = str(brackets.group(1))
-            list_index = int(brackets.group(2))
+        if list_index is not None:
             if prop not in partial_obj:
                 if list_index == 0:
                     # User is trying to create a new list with a single item
@@ -262,75 +420,89 @@ def search_path(
             else:
                 partial_obj = partial_obj[prop]
         searched_path.append(prop)
-    return True, partial_obj, ".".join(path_list)
-
-
-def _edit(yaml_obj: dict, path: str, value: Any):
-    invalid_index_err = lambda x: IndexError(
-        f"{x} is an invalid index! The list will have empty entry after insertion"
+    return True, partial_obj, path
+
+
+def _get(yaml_obj: dict, segments: tuple[tuple[str, Optional[int]], ...]):
+    """Read-only lookup of compiled ``segments``, returns (is success, value)."""
+    obj = yaml_obj
+    for key, index in segments:
+        if not isinstance(obj, dict) or key not in obj:
+            return False, None
+        obj = obj[key]
+        if index is not None:
+            if type(obj) is not list or index >= len(obj):
+                return False, None
+            obj = obj[index]
+    return True, obj
+
+
+def _invalid_index_err(key: str, index: int) -> IndexError:
+    return IndexError(
+        f"{key}[{index}] is an invalid index! The list will have empty entry aft"
+        "er insertion"
     )
-    value = deepcopy(value)
 
-    def key_not_found(prop, obj):
-        brackets = re.search(r"(.*)\[(\d+)\]", prop)
-        new_obj = {}
-        if brackets:
-            prop = str(brackets.group(1))
-            obj[prop] = [new_obj]
+
+def _edit_compiled(
+    yaml_obj: dict, segments: tuple[tuple[str, Optional[int]], ...], value: Any
+) -> dict:
+    """Set ``value`` at compiled ``segments``, missing dicts and lists on the wa
+    y are created. ``value`` is stored as is, callers take care of copying.
+    """
+    obj = yaml_obj
+    searched_path = []
+    for key, index in segments[:-1]:
+        if index is None:
+            if key not in obj:
+                obj[key] = {}
+            obj = obj[key]
         else:
-            obj[prop] = new_obj
-        return True, new_obj
-
-    def need_append(prop, obj):
-        new_obj = {}
-        brackets = re.search(r"(.*)\[(\d+)\]", prop)
-        prop = str(brackets.group(1))
-        obj[prop].append(new_obj)
-        return True, new_obj
-
-    def index_invalid(prop, _):
-        raise invalid_index_err(prop)
-
-    path = path.split(".")
-    if len(path) == 1:
-        success, obj = True, yaml_obj
+            if key not in obj:
+                if index != 0:
+                    raise _invalid_index_err(key, index)
+                obj[key] = []
+            items = obj[key]
+            if type(items) is not list:
+                raise TypeError(f"{'.'.join(searched_path)}.{key} should be a list")
+            if index == len(items):
+                items.append({})
+            elif index > len(items):
+                raise _invalid_index_err(key, index)
+            obj = items[index]
+        searched_path.append(_segment_str(key, index))
+
+    key, index = segments[-1]
+    if index is None:
+        obj[key] = value
+    elif key not in obj:
+        if index != 0:
+            raise _invalid_index_err(key, index)
+        obj[key] = [value]
     else:
-        before_the_last = ".".join(path[:-1])
-        success, obj, _ = search_path(
-            yaml_obj, before_the_last, key_not_found, need_append, index_invalid
-        )
-
-    if success:
-        prop = path[-1]
-        brackets = re.search(r"(.*)\[(\d+)\]", prop)
-        if brackets:
-            prop = str(brackets.group(1))
-            list_index = str(brackets.group(2))
-            if prop in obj:
-                if list_index < len(obj[prop]):
-                    obj[prop][list_index] = value
-                elif list_index == len(obj[prop]):
-                    obj[prop].append(value)
-                else:
-                    raise invalid_index_err(f"{prop}[{list_index}]")
-            elif int(list_index) == 0:
-                obj[prop] = [value]
-            else:
-                raise invalid_index_err(f"{prop}[{list_index}]")
+        items = obj[key]
+        if index < len(items):
+            items[index] = value
+        elif index == len(items):
+            items.append(value)
         else:
-            obj[path[-1]] = value
+            raise _invalid_index_err(key, index)
     return yaml_obj
 
 
+def _edit(yaml_obj: dict, path: str, value: Any):
+    return _edit_compiled(yaml_obj, _compile_path(path), _clone(value))
+
+
 def _conditional_edit(yaml_obj: dict, path: str, value, decide_path: str, condition):
-    success, result, _ = search_path(yaml_obj, decide_path)
+    success, result = _get(yaml_obj, _compile_path(decide_path))
     if (success and result == condition) or (not success and condition is None):
         yaml_obj = _edit(yaml_obj, path, value)
     return yaml_obj
 
 
 def _mapping_edit(yaml_obj: dict, path: str, value: dict, key_path: str):
-    success, key, _ = search_path(yaml_obj, key_path)
+    success, key = _get(yaml_obj, _compile_path(key_path))
     if success and key in value:
         yaml_obj = _edit(yaml_obj, path, value[key])
     return yaml_obj
@@ -1,9 +1,93 @@
-import atexit, itertools, time, sys, shutil, os, inspect
+import atexit, contextvars, itertools, time, sys, shutil, os, threading
+from collections import deque
 from contextlib import contextmanager
 from termcolor import colored
 from .files import create_folder, write_to_file
 from datetime import datetime
 
+# Lines are written in chunks up to this size, so a chunk is appended by a
+# single write(2) and lines of different processes never interleave
+_CHUNK_SIZE = 64 * 1024
+# Set by ``Logger.answer_countdowns``, a context variable so that only the code
+# running in it (and threads started from it by asyncio) is affected
+_answer_countdowns: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "answer_countdowns", default=False
+)
+
+
+class _FileSink(object):
+    """Buffered log file writer. Lines are queued in memory and appended by a ba
+    ckground thread every ``interval`` seconds, instead of opening the file for
+    every message. Every process has its own buffer and thread (they are reset
+    after fork), and pending lines are flushed at exit, including exits of mult
+    iprocessing workers.
+    """
+
+    def __init__(self, interval: float = 0.2, max_pending: int = 1000) -> None:
+        self.interval = interval
+        self.max_pending = max_pending
+        self._reset()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        # Lines of the parent process are written by the parent
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def write(self, path: str, line: str) -> None:
+        if self._pid != os.getpid():
+            self._reset()
+        self._pending.append((path, line))
+        if self._thread is None:
+            self._start()
+        if len(self._pending) >= self.max_pending:
+            self._wake.set()
+
+    def _start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="log-flusher", daemon=True
+        )
+        self._thread.start()
+        # Imported here, it is slow to import and only needed by writers
+        import multiprocessing.util
+
+        if multiprocessing.parent_process() is not None:
+            # atexit is not run by multiprocessing workers, finalizers are
+            multiprocessing.util.Finalize(None, self.flush, exitpriority=100)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all pending lines."""
+        with self._lock:
+            files: dict[str, list[str]] = {}
+            while self._pending:
+                path, line = self._pending.popleft()
+                files.setdefault(path, []).append(line)
+            for path, lines in files.items():
+                fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    chunk, size = [], 0
+                    for line in lines:
+                        data = line.encode()
+                        if size + len(data) > _CHUNK_SIZE and chunk:
+                            os.write(fd, b"".join(chunk))
+                            chunk, size = [], 0
+                        chunk.append(data)
+                        size += len(data)
+                    if chunk:
+                        os.write(fd, b"".join(chunk))
+                finally:
+                    os.close(fd)
+
 
 class Logger(object):
     _levels = {
@@ -43,6 +127,7 @@ class Logger(object):
         self._last_use_spinner = True
         self._last_level = self.level
         self._once = []
+        self._sink = _FileSink()
 
     @property
     def width(self):
@@ -127,8 +212,8 @@ class Logger(object):
         return self.colored(text, "error")
 
     def _frame_info(self):
-        # facepalm
-        frame = inspect.currentframe().f_back.f_back.f_back.f_back
+        # Caller of debug/info/... -> log -> _header -> _frame_info
+        frame = sys._getframe(4)
         file_name = frame.f_code.co_filename
         file_name = os.path.split(file_name)[1]
         file_name = os.path.splitext(file_name)[0]
@@ -227,6 +312,8 @@ class Logger(object):
         sys.exit(-1)
 
     def countdown(self, text, secs, level="info"):
+        if _answer_countdowns.get():
+            return True
         try:
             for i in range(secs):
                 msg = "{} in {} seconds... (Abort: ctrl+c)"
@@ -238,20 +325,49 @@ class Logger(object):
             log.debug("We give up.")
             return False
 
+    @contextmanager
+    def answer_countdowns(self):
+        """Countdowns in the ``with`` statement return True at once, like when
+        nobody interrupts them, e.g. during a dry run. Other threads are not af
+        fected.
+        """
+        token = _answer_countdowns.set(True)
+        try:
+            yield
+        finally:
+            _answer_countdowns.reset(token)
+
     def exit(self):
+        self.flush()
         # emit an empty line, as last log has no carriage return
         if self._last_is_update:
             print(flush=True)
 
-    def set_log_file_path(self, path: str):
+    def set_log_file_path(self, path: str, buffered: bool = True):
+        """Set where ``to_file`` messages are saved.
+
+        Args:
+            path (str): Log file path.
+            buffered (bool, optional): Append messages in batches by a backgrou
+            nd thread, call ``flush()`` to write them immediately. Defaults to T
+            rue.
+        """
         folder, _ = os.path.split(path)
         create_folder(folder)
         self.log_file_path = path
+        self.buffered = buffered
 
     def log_to_file(self, text: str, level: str):
         date = datetime.now().strftime("<%Y%b%d|%X>")
         content = f"{'<' + level + '>': >8} {date} {text}\n"
-        write_to_file(self.log_file_path, content, append=True)
+        if getattr(self, "buffered", False):
+            self._sink.write(self.log_file_path, content)
+        else:
+            write_to_file(self.log_file_path, content, append=True)
+
+    def flush(self):
+        """Write buffered messages to the log file."""
+        self._sink.flush()
 
 
 log = Logger()
@@ -0,0 +1,231 @@
+import os, threading
+from time import perf_counter
+from typing import Any, Optional
+from .logger import log
+from .timeline import LOAD_EVENT, Span
+
+# Operation sent from worker processes: (kind, name, labels, value, help)
+Delta = tuple[str, str, tuple[tuple[str, str], ...], float, str]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry(object):
+    """Metrics of AEFM itself (progress, phase durations, fetch latencies, fail
+    ures), exported in Prometheus text format by ``serve``. Metrics recorded in
+    worker processes (e.g. data collection) are kept as deltas, return ``drain()
+    `` to the main process and ``merge`` them there.
+    """
+
+    def __new__(cls) -> "MetricsRegistry":
+        if not hasattr(cls, "instance"):
+            cls.instance = super(MetricsRegistry, cls).__new__(cls)
+            cls.instance._values = {}
+            cls.instance._types = {}
+            cls.instance._helps = {}
+            cls.instance._deltas = []
+            cls.instance._lock = threading.Lock()
+            cls.instance._pid = os.getpid()
+            cls.instance.server = None
+        return cls.instance
+
+    def _apply(
+        self, kind: str, name: str, labels: tuple, value: float, help: str
+    ) -> None:
+        if os.getpid() != self._pid:
+            # In a worker process, values are sent back by ``drain``
+            self._deltas.append((kind, name, labels, value, help))
+            return
+        with self._lock:
+            if help and name not in self._helps:
+                self._helps[name] = help
+            match kind:
+                case "set":
+                    self._types.setdefault(name, "gauge")
+                    self._values[(name, labels)] = value
+                case "add":
+                    self._types.setdefault(name, "gauge")
+                    self._values[(name, labels)] = (
+                        self._values.get((name, labels), 0) + value
+                    )
+                case "inc":
+                    self._types.setdefault(name, "counter")
+                    self._values[(name, labels)] = (
+                        self._values.get((name, labels), 0) + value
+                    )
+                case "observe":
+                    self._types.setdefault(name, "summary")
+                    count, total = self._values.get((name, labels), (0, 0.0))
+                    self._values[(name, labels)] = (count + 1, total + value)
+
+    def _record(
+        self, kind: str, name: str, value: float, help: str, labels: dict
+    ) -> None:
+        self._apply(kind, name, tuple(sorted(labels.items())), value, help)
+
+    def set(self, name: str, value: float, help: str = "", **labels) -> None:
+        """Set a gauge.
+
+        Args:
+            name (str): Metric name, e.g. aefm_test_cases_total.
+            value (float): New value.
+            help (str, optional): Description of the metric. Defaults to "".
+            **labels: Labels of the metric.
+        """
+        self._record("set", name, value, help, labels)
+
+    def add(self, name: str, value: float, help: str = "", **labels) -> None:
+        """Add ``value`` (may be negative) to a gauge."""
+        self._record("add", name, value, help, labels)
+
+    def inc(self, name: str, value: float = 1, help: str = "", **labels) -> None:
+        """Increase a counter, whose name should end with _total."""
+        self._record("inc", name, value, help, labels)
+
+    def observe(self, name: str, value: float, help: str = "", **labels) -> None:
+        """Observe a value of a summary, e.g. a duration in seconds, it is expor
+        ted as ``<name>_count`` and ``<name>_sum``."""
+        self._record("observe", name, value, help, labels)
+
+    def drain(self) -> list[Delta]:
+        """Take operations recorded in a worker process, so they can be returned
+        to the main process."""
+        deltas, self._deltas = self._deltas, []
+        return deltas
+
+    def merge(self, deltas: Optional[list[Delta]]) -> None:
+        """Apply operations drained from a worker process.
+
+        Args:
+            deltas (list[Delta]): Result of ``drain()``.
+        """
+        for delta in deltas or []:
+            self._apply(*delta)
+
+    def observe_span(self, span: Span) -> None:
+        """Export timeline spans, used as a listener of ``timeline``.
+
+        Args:
+            span (Span): Recorded span.
+        """
+        seconds = span.duration_ns / 1e9
+        if span.category == "event":
+            self.observe(
+                "aefm_event_duration_seconds",
+                seconds,
+                "Duration of triggered events",
+                event=span.name,
+            )
+            if span.name == LOAD_EVENT:
+                self.inc("aefm_test_cases_done_total", help="Finished test cases")
+        elif span.category == "wait":
+            self.observe(
+                "aefm_wait_duration_seconds",
+                seconds,
+                "Duration of waits for Kubernetes pods",
+                wait_type=span.name,
+            )
+
+    def render(self) -> str:
+        """Metrics in Prometheus text exposition format."""
+        with self._lock:
+            values = dict(self._values)
+            types = dict(self._types)
+            helps = dict(self._helps)
+        lines = []
+        for name in sorted(types):
+            if name in helps:
+                lines.append(f"# HELP {name} {_escape(helps[name])}")
+            lines.append(f"# TYPE {name} {types[name]}")
+            for (metric, labels), value in values.items():
+                if metric != name:
+                    continue
+                label_text = ",".join(f'{x}="{_escape(y)}"' for x, y in labels)
+                label_text = "{" + label_text + "}" if label_text else ""
+                if types[name] == "summary":
+                    count, total = value
+                    lines.append(f"{name}_count{label_text} {count}")
+                    lines.append(f"{name}_sum{label_text} {total}")
+                else:
+                    lines.append(f"{name}{label_text} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> None:
+        """Serve metrics on ``http://<host>:<port>/metrics`` in a daemon thread
+        , it does nothing if the server is already running.
+
+        Args:
+            port (int): Port to listen on.
+            host (str, optional): Address to listen on, the endpoint has no auth
+            entication. Defaults to "127.0.0.1", i.e. this machine only.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        if self.server is not None:
+            return
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ["/", "/metrics"]:
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        thread = threading.Thread(
+            target=self.server.serve_forever, name="metrics", daemon=True
+        )
+        thread.start()
+        log.info(f"Metrics are served on http://{host}:{port}/metrics")
+
+    def shutdown(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+metrics = MetricsRegistry()
+
+
+def timed_get(source: str, url: str, **kwargs):
+    """``requests.get`` that records its latency and failures.
+
+    Args:
+        source (str): Label of the data source, e.g. "jaeger".
+        url (str): Requested url.
+        **kwargs: Passed to ``requests.get``.
+
+    Returns:
+        Response: Response of the request.
+    """
+    import requests
+
+    start = perf_counter()
+    try:
+        response = requests.get(url, **kwargs)
+    except requests.RequestException:
+        metrics.inc("aefm_fetch_failures_total", help="Failed fetches", source=source)
+        raise
+    finally:
+        metrics.observe(
+            "aefm_fetch_duration_seconds",
+            perf_counter() - start,
+            "Latency of fetches from data sources",
+            source=source,
+        )
+    if not response.ok:
+        metrics.inc("aefm_fetch_failures_total", help="Failed fetches", source=source)
+    return response
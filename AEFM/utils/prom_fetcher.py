@@ -1,6 +1,6 @@
 from time import time
-import requests
 from requests import Response
+from .metrics import timed_get
 from typing import Literal
 
 
@@ -55,7 +55,9 @@ class PromFetcher:
         elif query_type == "point":
             request_data["time"] = time
         url_suffix = {"range": "query_range", "point": "query"}[query_type]
-        res = requests.get(f"{self.host}/api/v1/{url_suffix}", params=request_data)
+        res = timed_get(
+            "prometheus", f"{self.host}/api/v1/{url_suffix}", params=request_data
+        )
         return res
 
     def fetch_cpu_usage(
@@ -0,0 +1,233 @@
+import contextvars, json, os, threading
+from contextlib import contextmanager
+from time import perf_counter_ns, time_ns
+from typing import Any, Callable, Optional
+from .logger import log
+
+# Events whose spans drive progress, estimates and metrics
+LOAD_EVENT = "start_single_test_case"
+COLLECT_EVENT = "start_data_collection"
+# Set by ``Timeline.paused``, spans recorded in its context are not kept
+_paused: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "timeline_paused", default=False
+)
+
+
+class Span:
+    """A timed piece of work, e.g. a handler invocation or a wait."""
+
+    __slots__ = ("name", "category", "start_ns", "duration_ns", "thread", "tags")
+
+    def __init__(
+        self,
+        name: str,
+        category: str,
+        start_ns: int,
+        duration_ns: int,
+        thread: int,
+        tags: dict[str, Any],
+    ) -> None:
+        self.name = name
+        self.category = category
+        self.start_ns = start_ns
+        self.duration_ns = duration_ns
+        self.thread = thread
+        self.tags = tags
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "category": self.category,
+            "start_ns": self.start_ns,
+            "duration_ns": self.duration_ns,
+            "thread": self.thread,
+            **self.tags,
+        }
+
+
+class Timeline(object):
+    """Records how long handlers, waits and other work take, with nanosecond res
+    olution of a monotonic clock. Spans are appended to a JSON lines file if ``f
+    ile_path`` is set, and can be exported in Chrome trace format (open with ch
+    rome://tracing or https://ui.perfetto.dev).
+    """
+
+    def __new__(cls) -> "Timeline":
+        if not hasattr(cls, "instance"):
+            cls.instance = super(Timeline, cls).__new__(cls)
+            cls.instance.spans = []
+            cls.instance.file_path = None
+            cls.instance.listeners = []
+            cls.instance._lock = threading.Lock()
+            cls.instance._started_ns = perf_counter_ns()
+            # Monotonic clock has no epoch, keep the offset to wall clock
+            cls.instance._epoch_ns = time_ns() - cls.instance._started_ns
+        return cls.instance
+
+    def set_file_path(self, path: str) -> None:
+        """Append spans recorded from now on to ``path`` as JSON lines.
+
+        Args:
+            path (str): Path of the timeline file.
+        """
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.file_path = path
+
+    def add_listener(self, listener: Callable[[Span], None]) -> None:
+        """Call ``listener`` with every recorded span, it should be cheap.
+
+        Args:
+            listener (Callable[[Span], None]): Receives the span.
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Span], None]) -> None:
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    @contextmanager
+    def paused(self):
+        """Spans recorded in the ``with`` statement are neither kept, written n
+        or passed to listeners, e.g. during a dry run. Other threads are not af
+        fected.
+        """
+        token = _paused.set(True)
+        try:
+            yield
+        finally:
+            _paused.reset(token)
+
+    def reset(self) -> None:
+        """Drop recorded spans and restart the wall clock of the summary."""
+        with self._lock:
+            self.spans = []
+            self._started_ns = perf_counter_ns()
+
+    def record(
+        self, name: str, category: str, start_ns: int, end_ns: int, **tags
+    ) -> Span:
+        """Record a finished span.
+
+        Args:
+            name (str): What is timed, e.g. a handler name.
+            category (str): Kind of the span, e.g. "event", "handler" or "wait".
+            start_ns (int): ``perf_counter_ns()`` when it started.
+            end_ns (int): ``perf_counter_ns()`` when it ended.
+            **tags: Extra fields, e.g. ``event`` and ``test_case``.
+
+        Returns:
+            Span: Recorded span.
+        """
+        span = Span(
+            name, category, start_ns, end_ns - start_ns, threading.get_ident(), tags
+        )
+        if _paused.get():
+            return span
+        with self._lock:
+            self.spans.append(span)
+            if self.file_path is not None:
+                record = span.to_dict()
+                record["time"] = (self._epoch_ns + start_ns) / 1e9
+                with open(self.file_path, "a") as file:
+                    file.write(json.dumps(record, default=str) + "\n")
+        for listener in self.listeners:
+            listener(span)
+        return span
+
+    @contextmanager
+    def span(self, name: str, category: str = "span", **tags):
+        """Time the body of a ``with`` statement, it is recorded even if the bod
+        y raises.
+
+        Args:
+            name (str): What is timed.
+            category (str, optional): Kind of the span. Defaults to "span".
+            **tags: Extra fields of the span.
+        """
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, category, start, perf_counter_ns(), **tags)
+
+    def export_chrome_trace(self, path: str) -> None:
+        """Save recorded spans in Chrome trace format.
+
+        Args:
+            path (str): Path of the JSON file.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        events = []
+        for span in spans:
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": (self._epoch_ns + span.start_ns) / 1000,
+                    "dur": span.duration_ns / 1000,
+                    "pid": os.getpid(),
+                    "tid": span.thread,
+                    "args": {x: str(y) for x, y in span.tags.items()},
+                }
+            )
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+    def summary(self) -> list[dict[str, Any]]:
+        """Total time of every category and name, e.g. of every event and of eve
+        ry handler.
+
+        Returns:
+            list[dict[str, Any]]: Rows with category, name, count, total, mean a
+            nd max (unit: second), ordered by total time.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        groups: dict[tuple[str, str], list[int]] = {}
+        for span in spans:
+            groups.setdefault((span.category, span.name), []).append(span.duration_ns)
+        rows = []
+        for (category, name), durations in groups.items():
+            rows.append(
+                {
+                    "category": category,
+                    "name": name,
+                    "count": len(durations),
+                    "total": sum(durations) / 1e9,
+                    "mean": sum(durations) / len(durations) / 1e9,
+                    "max": max(durations) / 1e9,
+                }
+            )
+        rows.sort(key=lambda x: x["total"], reverse=True)
+        return rows
+
+    def log_summary(self, level: str = "key", top: Optional[int] = None) -> None:
+        """Print where the wall time went, spans of different categories may ove
+        rlap (e.g. a wait happens inside a handler).
+
+        Args:
+            level (str, optional): Log level. Defaults to "key".
+            top (int, optional): Only print the longest ``top`` rows. Defaults t
+            o None (all rows).
+        """
+        wall = (perf_counter_ns() - self._started_ns) / 1e9
+        rows = self.summary()[:top]
+        log.log(f"Time summary, wall time: {wall:.1f}s", level=level)
+        for row in rows:
+            share = row["total"] / wall if wall > 0 else 0
+            log.log(
+                f"{row['category']: <8} {row['name']: <32} {row['count']: >6}x "
+                f"total {row['total']: >9.2f}s ({share: >4.0%}) "
+                f"mean {row['mean']: >8.3f}s max {row['max']: >8.3f}s",
+                level=level,
+            )
+
+
+timeline = Timeline()
@@ -4,10 +4,8 @@ import re
 
 
 def _pandas_2_1_0_detect() -> bool:
-    major, minor, _ = [int(x) for x in pd.__version__.split(".")]
-    if major >= 2 and minor >= 1:
-        return True
-    return False
+    major, minor = [int(x) for x in pd.__version__.split(".")[:2]]
+    return (major, minor) >= (2, 1)
 
 
 def load_from_json(data) -> pd.DataFrame:
@@ -43,9 +41,10 @@ def load_from_json(data) -> pd.DataFrame:
         .rename(columns={"traceID": "traceId"})
     )
 
-    service_id_mapping = service_id_mapping.filter(regex=".*Pod")
+    # Replace tags of every process with its hostname, other columns are kept
+    pod_mapping = service_id_mapping.filter(regex=".*Pod")
     if _pandas_2_1_0_detect():
-        service_id_mapping = service_id_mapping.map(
+        service_id_mapping = pod_mapping.map(
             lambda x: (
                 [v["value"] for v in x if v["key"] == "hostname"][0]
                 if isinstance(x, list)
@@ -53,7 +52,7 @@ def load_from_json(data) -> pd.DataFrame:
             )
         ).combine_first(service_id_mapping)
     else:
-        service_id_mapping = service_id_mapping.applymap(
+        service_id_mapping = pod_mapping.applymap(
             lambda x: (
                 [v["value"] for v in x if v["key"] == "hostname"][0]
                 if isinstance(x, list)
@@ -1,12 +1,29 @@
 from . import WorkloadGeneratorInterface
+from .results import LoadResult, ThroughputTimeSeries, parse_wrk_output
+from .supervisor import ClientProcess, supervise
+from .health import assess_health
+from .load_planner import LoadPlan, LoadPlanner
+from .store import ResultsStore
 from ..utils.logger import log
-import re, subprocess, pathlib
-from typing import List
-from ..utils.files import delete_path, create_folder, write_to_file
+import json, re, pathlib
+from time import time
+from typing import Optional, Union
+from ..utils.files import create_folder, write_to_file
 
 SCRIPTS_FOLDER = (
     pathlib.Path(__file__).parent.resolve().joinpath("wrk_scripts")
 )
+TIMESERIES_SCRIPT = SCRIPTS_FOLDER.joinpath("timeseries.lua")
+
+
+def duration_seconds(duration: Union[int, float, str]) -> float:
+    """Convert wrk duration, e.g. 40, "40s", "2m" or "1h", into seconds."""
+    if isinstance(duration, (int, float)):
+        return float(duration)
+    match = re.fullmatch(r"\s*([\d.]+)\s*([smh]?)\s*", duration)
+    if match is None:
+        raise ValueError(f"Invalid wrk duration: {duration}")
+    return float(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
 
 
 class WrkConfig:
@@ -19,6 +36,8 @@ class WrkConfig:
         duration: str,
         script: str,
         rate: int,
+        latency: bool = True,
+        timeseries: bool = False,
     ) -> None:
         """Command line args of wrk programs, please check wrk manual for more
         details, please visit: https://github.com/giltene/wrk2
@@ -31,6 +50,11 @@ class WrkConfig:
             duration (str): Duration of test.
             script (str): Load Lua script file.
             rate (int): Work rate (throughput) in requests/sec (total).
+            latency (bool, optional): Print detailed latency statistics, which i
+            s parsed into latency histograms. Defaults to True.
+            timeseries (bool, optional): Streaming mode, ``script`` is wrapped b
+            y ``wrk_scripts/timeseries.lua`` that reports responses of every sec
+            ond. Defaults to False.
         """
         self.wrk_path = wrk_path
         self.threads = threads
@@ -38,21 +62,47 @@ class WrkConfig:
         self.duration = duration
         self.rate = rate
         self.script = script.replace("$MODULE_DEFAULT", SCRIPTS_FOLDER.as_posix())
+        if self.script.endswith((".yaml", ".yml")):
+            from .spec import compile_spec
+
+            self.script = compile_spec(self.script)
         self.url = url
+        self.latency = latency
+        self.timeseries = timeseries
+        self.timeseries_script = TIMESERIES_SCRIPT.as_posix()
 
-    def get_cmd(self) -> str:
+    def get_cmd(
+        self,
+        rate: Optional[int] = None,
+        threads: Optional[int] = None,
+        connections: Optional[int] = None,
+    ) -> str:
         """Parse configs into command.
 
+        Args:
+            rate (int, optional): Override ``rate``. Defaults to None.
+            threads (int, optional): Override ``threads``. Defaults to None.
+            connections (int, optional): Override ``connections``. Defaults to N
+            one.
+
         Returns:
             str: Command that used to run wrk program.
         """
+        rate = rate if rate is not None else self.rate
+        threads = threads if threads is not None else self.threads
+        connections = connections if connections is not None else self.connections
+        script = self.script
+        prefix = ""
+        if self.timeseries:
+            prefix = f"env AEFM_WRK_SCRIPT={self.script} "
+            script = self.timeseries_script
         return (
-            f"{self.wrk_path} {self.url} "
-            f"-t {self.threads} "
-            f"-c {self.connections} "
+            f"{prefix}{self.wrk_path} {self.url} "
+            f"-t {threads} "
+            f"-c {connections} "
             f"-d {self.duration} "
-            f"-s {self.script} "
-            f"-R {self.rate}"
+            f"-s {script} "
+            f"-R {rate}" + (" --latency" if self.latency else "")
         )
 
 
@@ -63,7 +113,15 @@ class BaseWorkloadGenerator(WorkloadGeneratorInterface):
     /github.com/giltene/wrk2
     """
 
-    def __init__(self, wrk_config: WrkConfig, output_path: str) -> None:
+    def __init__(
+        self,
+        wrk_config: WrkConfig,
+        output_path: str,
+        timeout_grace: float = 15,
+        max_retries: int = 0,
+        load_planner: Optional[LoadPlanner] = None,
+        legacy_files: bool = False,
+    ) -> None:
         """Create wrk workload generator, save information at ``output_path``.
 
         Args:
@@ -71,46 +129,162 @@ class BaseWorkloadGenerator(WorkloadGeneratorInterface):
             tions.
             output_path (str): Specify where the wrk output file should be store
             d.
+            timeout_grace (float, optional): wrk programs still running ``timeou
+            t_grace`` seconds after the test duration are killed. Defaults to 15
+            .
+            max_retries (int, optional): Rerun a test case at most ``max_retrie
+            s`` times if a load client is CPU saturated, times out or exits wit
+            h a non-zero code. Defaults to 0.
+            load_planner (LoadPlanner, optional): Split workload into wrk client
+            s. Defaults to None, i.e. clients with at most ``wrk_config.rate`` r
+            equests/second, ``wrk_config.threads`` and ``wrk_config.connections
+            ``.
+            legacy_files (bool, optional): Besides the results store, also write
+            throughput, result and wrk output files per test case. Defaults to
+            False.
         """
         self.wrk_config = wrk_config
+        self.timeout_grace = timeout_grace
+        self.max_retries = max_retries
+        if load_planner is None:
+            load_planner = LoadPlanner(
+                wrk_config.rate, wrk_config.threads, wrk_config.connections
+            )
+        self.load_planner = load_planner
         self.command = wrk_config.get_cmd()
+        self.legacy_files = legacy_files
+        # Results of all test cases are appended to one store
+        self.store = ResultsStore(output_path)
+        create_folder(output_path)
         self.throughput_path = f"{output_path}/throughput"
         self.wrk_output_path = f"{output_path}/wrk_output"
-        # Create output folder
-        create_folder(self.throughput_path)
-        create_folder(self.wrk_output_path)
+        self.result_path = f"{output_path}/result"
+        if legacy_files:
+            create_folder(self.throughput_path)
+            create_folder(self.wrk_output_path)
+            create_folder(self.result_path)
+
+    def client_commands(self, plan: LoadPlan) -> tuple[list[str], Optional[float]]:
+        """Shell commands of wrk clients, override it to run clients elsewhere.
+
+        Args:
+            plan (LoadPlan): Rate, threads and connections of every client.
 
-    def run(self, workload: int, test_case_name: str) -> int:
-        """Start wrk programs and generate workload.
+        Returns:
+            tuple[list[str], Optional[float]]: One command per client, and the
+            time (``time.time()``) when clients start generating load if they wa
+            it for it, None if they start at once.
+        """
+        commands = [
+            f"exec {self.wrk_config.get_cmd(x.rate, x.threads, x.connections)}"
+            for x in plan
+        ]
+        return commands, None
+
+    def client_cpu_measured(self, index: int) -> bool:
+        """Whether CPU time of a client is measured by the supervisor, i.e. the
+        client runs on this machine.
+
+        Args:
+            index (int): Index of the client.
+
+        Returns:
+            bool: True if the client is local.
+        """
+        return True
+
+    def run(self, workload: int, test_case_name: str) -> LoadResult:
+        """Start wrk programs and generate workload. Runs whose clients are unhe
+        althy (check ``health.assess_health``) are retried up to ``max_retries``
+        times, a shortfall of the application alone is only recorded.
 
         Args:
             workload (int): Throughput, units: requests/second.
             test_case_name (str): Used to identify different test cases.
 
         Returns:
-            int: Real throughput generated by wrk programs.
+            LoadResult: Merged result of all wrk programs, including real throug
+            hput, errors, latency histogram and health verdict.
         """
-        # Compute number of wrk clients based on required workload and wrk_config
-        clients = workload // self.wrk_config.rate
-        # Open multiple subprocesses to run multiple clients simultaneously
-        processes: List[subprocess.Popen] = []
-        log.debug(f"{__file__}: clients {clients}, command: {self.command}")
-        for _ in range(clients):
-            proc = subprocess.Popen(self.command, stdout=subprocess.PIPE, shell=True)
-            processes.append(proc)
-        # Read and analyze output data
-        cumulative_requests = 0
-        delete_path(f"{self.wrk_output_path}/{test_case_name}")
-        delete_path(f"{self.throughput_path}/{test_case_name}")
-        for proc in processes:
-            (out, _) = proc.communicate()
-            content = out.decode("utf-8")
-            match = re.search(r"(\d+)\srequests", content)
-            log.debug(f"{__file__}: wrk output\n {content}")
+        for attempt in range(1, self.max_retries + 2):
+            result, client_procs = self._run_clients(workload, test_case_name)
+            health = assess_health(result, workload)
+            health.attempts = attempt
+            result.health = health.to_dict()
+            if health.healthy:
+                if health.app_saturated:
+                    log.info(
+                        f"{test_case_name}: application saturated: "
+                        f"{'; '.join(health.notes)}"
+                    )
+                break
+            log.warn(
+                f"{test_case_name}: load clients unhealthy (attempt {attempt}): "
+                f"{'; '.join(health.reasons)}",
+                to_file=True,
+            )
+        self.store.append(
+            test_case_name,
+            result.to_dict(),
+            b"".join(bytes(client.output) for client in client_procs),
+        )
+        if self.legacy_files:
+            write_to_file(
+                f"{self.wrk_output_path}/{test_case_name}",
+                "".join(client.text() for client in client_procs),
+            )
+            write_to_file(
+                f"{self.throughput_path}/{test_case_name}", f"{result.throughput}\n"
+            )
             write_to_file(
-                f"{self.wrk_output_path}/{test_case_name}", content, append=True
+                f"{self.result_path}/{test_case_name}", json.dumps(result.to_dict())
             )
-            if match is not None:
-                cumulative_requests += int(match.group(1))
-        throughput = cumulative_requests / self.wrk_config.duration
-        write_to_file(f"{self.throughput_path}/{test_case_name}", f"{throughput}\n")
+        return result
+
+    def _run_clients(
+        self, workload: int, test_case_name: str
+    ) -> tuple[LoadResult, list[ClientProcess]]:
+        # Split required workload into wrk clients
+        plan = self.load_planner.plan(workload)
+        clients = len(plan)
+        log.debug(f"{__file__}: {plan}")
+        # Run multiple clients simultaneously, outputs are drained concurrently
+        duration = duration_seconds(self.wrk_config.duration)
+        # Per-second responses reported by clients are consumed while running
+        timeseries = [ThroughputTimeSeries() for _ in range(clients)]
+        on_line = None
+        if self.wrk_config.timeseries:
+            on_line = lambda idx, line: timeseries[idx].add_line(line)
+        commands, start_at = self.client_commands(plan)
+        start_time = time()
+        client_procs = supervise(commands, duration + self.timeout_grace, on_line)
+        end_time = time()
+        if start_at is not None:
+            # Load starts when clients stop waiting, unless they are late
+            start_time = max(start_time, start_at)
+        # Read and analyze output data
+        results: list[LoadResult] = []
+        for client in client_procs:
+            content = client.text()
+            log.debug(f"{__file__}: wrk output\n {content}")
+            if client.returncode != 0 or client.timed_out:
+                log.warn(
+                    f"{test_case_name}: wrk client {client.index} exited with "
+                    f"{client.returncode}{' (timeout)' if client.timed_out else ''}",
+                    to_file=True,
+                )
+            client_result = parse_wrk_output(content, duration)
+            status = client.status()
+            status["rate"] = plan.clients[client.index].rate
+            status["threads"] = plan.clients[client.index].threads
+            status["throughput"] = client_result.throughput
+            if not self.client_cpu_measured(client.index):
+                status["cpu_time"] = None
+            client_result.client_status = [status]
+            if self.wrk_config.timeseries:
+                client_result.timeseries = timeseries[client.index]
+            results.append(client_result)
+        result = LoadResult.merge(results)
+        result.duration = duration
+        result.start_time, result.end_time = start_time, end_time
+        return result, client_procs
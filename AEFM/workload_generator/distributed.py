@@ -0,0 +1,170 @@
+import copy, hashlib, pathlib, shlex, subprocess
+from time import time
+from typing import Optional
+from .base import BaseWorkloadGenerator, WrkConfig, duration_seconds
+from .load_planner import LoadPlan, LoadPlanner
+from ..models import Node
+from ..utils.logger import log
+
+LOCAL_NODES = ["localhost", "127.0.0.1"]
+# Where wrk scripts are copied to on load generator nodes
+REMOTE_SCRIPTS_FOLDER = "/tmp/aefm_wrk_scripts"
+
+
+class DistributedWorkloadGenerator(BaseWorkloadGenerator):
+    """Run wrk clients on multiple load generator nodes through SSH, so the offe
+    red load is not limited by a single machine. Clients are assigned to nodes
+    round-robin, start at the same time, and their latency histograms are merge
+    d, results are saved in the same layout as ``BaseWorkloadGenerator``.
+    """
+
+    def __init__(
+        self,
+        wrk_config: WrkConfig,
+        output_path: str,
+        nodes: list[Node],
+        ssh: str = "ssh -o BatchMode=yes -o StrictHostKeyChecking=accept-new",
+        start_delay: float = 3,
+        timeout_grace: float = 15,
+        max_retries: int = 0,
+        load_planner: Optional[LoadPlanner] = None,
+    ) -> None:
+        """Run wrk clients on multiple load generator nodes through SSH. wrk (``
+        wrk_config.wrk_path``) must be installed on every node, and the AEFM hos
+        t must be able to login to them without password. Nodes named localhost
+        run clients as local processes.
+
+        Args:
+            wrk_config (WrkConfig): Specify wrk configs, such as threads, connec
+            tions.
+            output_path (str): Specify where the wrk output file should be store
+            d.
+            nodes (list[Node]): Load generator nodes, e.g. nodes with ``loadgen``
+            role. ``Node.ip`` is used to connect if it is set, otherwise ``Node
+            .name``.
+            ssh (str, optional): SSH command used to reach nodes. Defaults to "s
+            sh -o BatchMode=yes -o StrictHostKeyChecking=accept-new".
+            start_delay (float, optional): Time given to all clients to get read
+            y, clients start generating workload together after it, unit: second
+            . Defaults to 3.
+            timeout_grace (float, optional): wrk programs still running ``timeou
+            t_grace`` seconds after the test duration are killed. Defaults to 15
+            .
+            max_retries (int, optional): Rerun a test case at most ``max_retrie
+            s`` times if a load client is CPU saturated, times out or exits wit
+            h a non-zero code. Defaults to 0.
+            load_planner (LoadPlanner, optional): Split workload into wrk client
+            s, ``cores`` is the number of cores of a node. Defaults to None, i.e
+            . the one of ``BaseWorkloadGenerator``.
+        """
+        assert len(nodes) > 0, "No load generator nodes"
+        super().__init__(
+            wrk_config,
+            output_path,
+            timeout_grace + start_delay,
+            max_retries,
+            load_planner,
+        )
+        self.nodes = nodes
+        self.ssh = ssh
+        self.start_delay = start_delay
+        self.remote_config = self._remote_config(wrk_config)
+        self._staged = False
+
+    @staticmethod
+    def _remote_path(local_path: str) -> str:
+        digest = hashlib.sha1(local_path.encode()).hexdigest()[:8]
+        return f"{REMOTE_SCRIPTS_FOLDER}/{digest}-{pathlib.Path(local_path).name}"
+
+    def _remote_config(self, wrk_config: WrkConfig) -> WrkConfig:
+        remote_config = copy.copy(wrk_config)
+        remote_config.script = self._remote_path(wrk_config.script)
+        remote_config.timeseries_script = self._remote_path(
+            wrk_config.timeseries_script
+        )
+        return remote_config
+
+    def _address(self, node: Node) -> str:
+        return node.ip if node.ip else node.name
+
+    def _is_local(self, node: Node) -> bool:
+        return self._address(node) in LOCAL_NODES
+
+    def _node_of(self, index: int) -> Node:
+        return self.nodes[index % len(self.nodes)]
+
+    def client_cpu_measured(self, index: int) -> bool:
+        # CPU time of remote clients is the one of local SSH processes
+        return self._is_local(self._node_of(index))
+
+    def stage_scripts(self) -> None:
+        """Copy wrk scripts to all remote nodes, it is invoked automatically bef
+        ore the first run."""
+        scripts = [self.wrk_config.script]
+        if self.wrk_config.timeseries:
+            scripts.append(self.wrk_config.timeseries_script)
+        for node in self.nodes:
+            if self._is_local(node):
+                continue
+            for script in scripts:
+                remote = self._remote_path(script)
+                command = (
+                    f"{self.ssh} {shlex.quote(self._address(node))} "
+                    + shlex.quote(f"mkdir -p {REMOTE_SCRIPTS_FOLDER} && cat > {remote}")
+                )
+                with open(script, "rb") as file:
+                    proc = subprocess.run(
+                        command, shell=True, stdin=file, capture_output=True
+                    )
+                if proc.returncode != 0:
+                    raise RuntimeError(
+                        f"Copy {script} to {node} failed: {proc.stderr.decode()}"
+                    )
+                log.debug(f"{__file__}: {script} is copied to {node}:{remote}")
+        self._staged = True
+
+    def client_commands(self, plan: LoadPlan) -> tuple[list[str], float]:
+        """Wrap wrk commands with SSH, clients are assigned to nodes round-robin
+        and wait until the same start time. Killing a local SSH process does not
+        stop its remote wrk, so remote clients are bounded by ``timeout`` on the
+        node, at the same deadline as local ones.
+
+        Args:
+            plan (LoadPlan): Rate, threads and connections of every client.
+
+        Returns:
+            tuple[list[str], float]: One command per client, and the time (``tim
+            e.time()``) when all of them start generating load.
+        """
+        if not self._staged:
+            self.stage_scripts()
+        start_at = time() + self.start_delay
+        # Clocks of nodes are assumed to be synchronized (e.g. NTP)
+        wait = (
+            f"sleep $(echo {start_at:.3f} $(date +%s.%N) | "
+            "awk '{d = $1 - $2; print (d > 0 ? d : 0)}')"
+        )
+        # Local clients are killed ``timeout_grace`` seconds after the duration,
+        # which includes ``start_delay``
+        limit = duration_seconds(self.wrk_config.duration) + self.timeout_grace
+        limit -= self.start_delay
+        commands = []
+        for idx, client in enumerate(plan):
+            node = self._node_of(idx)
+            args = (client.rate, client.threads, client.connections)
+            if self._is_local(node):
+                commands.append(f"{wait}; exec {self.wrk_config.get_cmd(*args)}")
+            else:
+                remote = (
+                    f"{wait}; exec timeout -k 5 {limit:.0f} "
+                    + self.remote_config.get_cmd(*args)
+                )
+                commands.append(
+                    f"exec {self.ssh} {shlex.quote(self._address(node))} "
+                    + shlex.quote(remote)
+                )
+        log.debug(
+            f"{__file__}: {len(plan)} clients on {len(self.nodes)} nodes: "
+            f"{[str(x) for x in self.nodes]}"
+        )
+        return commands, start_at
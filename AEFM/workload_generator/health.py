@@ -0,0 +1,166 @@
+from typing import Any, Optional
+from .results import LoadResult, SOCKET_ERRORS
+
+
+class ClientHealth:
+    """Health verdict of a workload generator run, tells whether the load client
+    s, instead of the application, are the bottleneck. A throughput shortfall w
+    ithout evidence against the clients is a result of the application (``app_s
+    aturated``), not a reason to rerun the test case."""
+
+    def __init__(
+        self,
+        requested: float,
+        offered: float,
+        achieved: float,
+        max_client_cpu: Optional[float] = None,
+        socket_errors: int = 0,
+        reasons: Optional[list[str]] = None,
+        attempts: int = 1,
+        app_saturated: bool = False,
+        notes: Optional[list[str]] = None,
+    ) -> None:
+        """Health verdict of a workload generator run.
+
+        Args:
+            requested (float): Required throughput of the test case, unit: requ
+            ests/second.
+            offered (float): Sum of rates of all clients, unit: requests/second.
+            achieved (float): Real throughput, unit: requests/second.
+            max_client_cpu (float, optional): Highest CPU usage of clients, rela
+            tive to their threads, range: 0 - 1. Defaults to None (not measured).
+            socket_errors (int, optional): Number of connect, read, write and ti
+            meout errors. Defaults to 0.
+            reasons (list[str], optional): Why the run is unhealthy, i.e. evidenc
+            e that clients are the bottleneck. Defaults to None.
+            attempts (int, optional): Number of runs of the test case, retries i
+            ncluded. Defaults to 1.
+            app_saturated (bool, optional): Throughput fell short of the offered
+            load while clients are healthy. Defaults to False.
+            notes (list[str], optional): Shortfalls and errors that don't make t
+            he run unhealthy. Defaults to None.
+        """
+        self.requested = requested
+        self.offered = offered
+        self.achieved = achieved
+        self.max_client_cpu = max_client_cpu
+        self.socket_errors = socket_errors
+        self.reasons = reasons if reasons is not None else []
+        self.attempts = attempts
+        self.app_saturated = app_saturated
+        self.notes = notes if notes is not None else []
+
+    @property
+    def healthy(self) -> bool:
+        return len(self.reasons) == 0
+
+    @property
+    def achieved_ratio(self) -> float:
+        """Real throughput divided by required throughput."""
+        return self.achieved / self.requested if self.requested else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "attempts": self.attempts,
+            "requested": self.requested,
+            "offered": self.offered,
+            "achieved": self.achieved,
+            "achieved_ratio": self.achieved_ratio,
+            "max_client_cpu": self.max_client_cpu,
+            "socket_errors": self.socket_errors,
+            "reasons": list(self.reasons),
+            "app_saturated": self.app_saturated,
+            "notes": list(self.notes),
+        }
+
+    @staticmethod
+    def load_from_dict(data: dict[str, Any]) -> "ClientHealth":
+        return ClientHealth(
+            data["requested"],
+            data["offered"],
+            data["achieved"],
+            data.get("max_client_cpu"),
+            data.get("socket_errors", 0),
+            data.get("reasons"),
+            data.get("attempts", 1),
+            data.get("app_saturated", False),
+            data.get("notes"),
+        )
+
+
+def assess_health(
+    result: LoadResult,
+    requested: float,
+    threads: int = 1,
+    rate_tolerance: float = 0.05,
+    cpu_threshold: float = 0.9,
+    error_tolerance: float = 0.01,
+) -> ClientHealth:
+    """Check whether the offered load of a run fell short because of the clien
+    ts. Only evidence against clients makes a run unhealthy: a saturated client
+    CPU, a timeout or a non-zero exit. Rates planned by ``LoadPlanner`` always
+    sum up to the required throughput, an offered rate below it only happens w
+    ith custom planners or ``client_commands`` and is reported as well. Through
+    put below the offered rate and socket errors alone are noted, and the run i
+    s marked ``app_saturated`` if throughput fell short. Each entry of ``re
+    sult.client_status`` is expected to contain ``rate`` (requested rate of the
+    client), ``throughput``, ``threads`` and ``cpu_time`` (None if it is not me
+    asured).
+
+    Args:
+        result (LoadResult): Merged result of all clients.
+        requested (float): Required throughput, unit: requests/second.
+        threads (int, optional): Threads of clients whose status has no ``thread
+        s``, a client with N threads can use N cores. Defaults to 1.
+        rate_tolerance (float, optional): Allowed relative shortfall of rates. D
+        efaults to 0.05.
+        cpu_threshold (float, optional): CPU usage (relative to threads) above w
+        hich a client is considered saturated. Defaults to 0.9.
+        error_tolerance (float, optional): Ratio of socket errors to requests a
+        bove which errors are noted. Defaults to 0.01.
+
+    Returns:
+        ClientHealth: Health verdict, unhealthy if ``reasons`` is not empty.
+    """
+    reasons, notes = [], []
+    offered = sum(x.get("rate", 0) for x in result.client_status)
+    achieved = result.throughput
+    # Guards custom planners, clients of LoadPlanner always offer the workload
+    if offered < requested * (1 - rate_tolerance):
+        reasons.append(f"offered {offered:g} < requested {requested:g} req/s")
+    shortfall = achieved < offered * (1 - rate_tolerance)
+    if shortfall:
+        notes.append(f"achieved {achieved:.1f} < offered {offered:g} req/s")
+
+    max_cpu = None
+    for idx, status in enumerate(result.client_status):
+        if status.get("timed_out"):
+            reasons.append(f"client {idx} timeout")
+        elif status.get("returncode") not in [0, None]:
+            reasons.append(f"client {idx} exited with {status['returncode']}")
+        rate, throughput = status.get("rate"), status.get("throughput")
+        if rate and throughput is not None and throughput < rate * (1 - rate_tolerance):
+            shortfall = True
+            notes.append(f"client {idx} achieved {throughput:.1f} < {rate:g} req/s")
+        cpu_time = status.get("cpu_time")
+        if cpu_time is not None and result.duration:
+            cpu = cpu_time / result.duration / max(status.get("threads", threads), 1)
+            max_cpu = cpu if max_cpu is None else max(max_cpu, cpu)
+            if cpu >= cpu_threshold:
+                reasons.append(f"client {idx} CPU saturated ({cpu:.0%})")
+
+    socket_errors = sum(result.errors.get(x, 0) for x in SOCKET_ERRORS)
+    if socket_errors > error_tolerance * max(result.requests, 1):
+        notes.append(f"{socket_errors} socket errors")
+    # A shortfall together with evidence against clients is blamed on clients
+    return ClientHealth(
+        requested,
+        offered,
+        achieved,
+        max_cpu,
+        socket_errors,
+        reasons,
+        app_saturated=shortfall and not reasons,
+        notes=notes,
+    )
@@ -0,0 +1,130 @@
+import math, os
+from typing import Optional
+
+
+def split_evenly(total: int, parts: int) -> list[int]:
+    """Split ``total`` into ``parts`` integers that sum up to ``total``, they di
+    ffer by at most 1."""
+    if parts <= 0:
+        return []
+    base, rest = divmod(total, parts)
+    return [base + (1 if i < rest else 0) for i in range(parts)]
+
+
+class ClientPlan:
+    """Rate, threads and connections of a single load client."""
+
+    def __init__(self, rate: int, threads: int, connections: int) -> None:
+        """Rate, threads and connections of a single load client.
+
+        Args:
+            rate (int): Requests per second of the client.
+            threads (int): Threads of the client.
+            connections (int): Open connections of the client.
+        """
+        self.rate = rate
+        self.threads = threads
+        self.connections = connections
+
+    def __repr__(self) -> str:
+        return f"ClientPlan(rate={self.rate}, threads={self.threads}, connections={self.connections})"
+
+
+class LoadPlan:
+    """Plans of all load clients of a test case."""
+
+    def __init__(self, clients: list[ClientPlan]) -> None:
+        self.clients = clients
+
+    @property
+    def rate(self) -> int:
+        """Total offered rate, unit: requests/second."""
+        return sum(x.rate for x in self.clients)
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    def __iter__(self):
+        return iter(self.clients)
+
+    def __repr__(self) -> str:
+        return f"LoadPlan({self.clients})"
+
+
+class LoadPlanner:
+    """Split a target throughput into load clients, so arbitrary throughputs are
+    offered exactly. Threads are sized by CPU cores, connections by Little's law
+    (concurrency = rate * latency)."""
+
+    def __init__(
+        self,
+        max_rate_per_client: int,
+        threads: Optional[int] = None,
+        connections: Optional[int] = None,
+        cores: Optional[int] = None,
+        max_rate_per_thread: int = 5000,
+        expected_latency: float = 0.1,
+        headroom: float = 2.0,
+        nodes: int = 1,
+    ) -> None:
+        """Split a target throughput into load clients.
+
+        Args:
+            max_rate_per_client (int): Maximum rate of a single client, unit: re
+            quests/second.
+            threads (int, optional): Fixed threads of every client. Defaults to
+            None, i.e. enough threads for ``max_rate_per_thread``, limited by CP
+            U cores shared by all clients.
+            connections (int, optional): Fixed connections of every client. Def
+            aults to None, i.e. ``rate * expected_latency * headroom``.
+            cores (int, optional): CPU cores of every node that runs clients. De
+            faults to the number of cores of this machine.
+            max_rate_per_thread (int, optional): Rate a single client thread can
+            sustain, unit: requests/second. Defaults to 5000.
+            expected_latency (float, optional): Expected response time of the ap
+            plication under load, unit: second. Defaults to 0.1.
+            headroom (float, optional): Multiplier of connections over the expec
+            ted concurrency, absorbs latency spikes. Defaults to 2.0.
+            nodes (int, optional): Nodes that clients are assigned to round-robin
+            , clients of a node share its ``cores``. Defaults to 1.
+        """
+        assert max_rate_per_client > 0, "max_rate_per_client must be positive"
+        self.max_rate_per_client = max_rate_per_client
+        self.threads = threads
+        self.connections = connections
+        self.cores = cores if cores is not None else (os.cpu_count() or 1)
+        self.max_rate_per_thread = max_rate_per_thread
+        self.expected_latency = expected_latency
+        self.headroom = headroom
+        self.nodes = max(1, nodes)
+
+    def plan(self, workload: int) -> LoadPlan:
+        """Plan load clients of ``workload``.
+
+        Args:
+            workload (int): Target throughput, unit: requests/second.
+
+        Returns:
+            LoadPlan: Client plans, their rates sum up to ``workload``.
+        """
+        if workload <= 0:
+            return LoadPlan([])
+        clients = math.ceil(workload / self.max_rate_per_client)
+        clients_per_node = math.ceil(clients / self.nodes)
+        plans = []
+        for rate in split_evenly(workload, clients):
+            threads = self.threads
+            if threads is None:
+                threads = min(
+                    math.ceil(rate / self.max_rate_per_thread),
+                    max(1, self.cores // clients_per_node),
+                )
+            connections = self.connections
+            if connections is None:
+                # Little's law: requests in flight = arrival rate * latency
+                connections = math.ceil(rate * self.expected_latency * self.headroom)
+            # wrk requires at least one connection per thread
+            threads = max(1, min(threads, rate))
+            connections = max(connections, threads)
+            plans.append(ClientPlan(rate, threads, connections))
+        return LoadPlan(plans)
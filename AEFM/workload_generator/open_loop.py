@@ -0,0 +1,328 @@
+import asyncio, bisect, math, multiprocessing, os, random
+from time import time
+from typing import Any, Callable, Optional, Union
+from .interfaces import WorkloadGeneratorInterface
+from .results import LoadResult, ThroughputTimeSeries
+from .base import duration_seconds
+from .load_planner import split_evenly
+from ..utils.logger import log
+from .store import ResultsStore
+
+# Time given to worker processes to start before the first scheduled request,
+# unit: second
+START_DELAY = 0.5
+
+# A value, or a function that builds the value from a random generator
+Dynamic = Union[Any, Callable[[random.Random], Any]]
+
+
+def _resolve(value: Dynamic, rng: random.Random) -> Any:
+    return value(rng) if callable(value) else value
+
+
+class Request:
+    """A kind of request in a request mix."""
+
+    def __init__(
+        self,
+        path: Dynamic = "/",
+        method: str = "GET",
+        weight: float = 1,
+        headers: Optional[dict[str, str]] = None,
+        data: Dynamic = None,
+        name: Optional[str] = None,
+    ) -> None:
+        """A kind of request in a request mix.
+
+        Args:
+            path (Dynamic, optional): Path appended to the url, or a function th
+            at builds it from a ``random.Random``. Defaults to "/".
+            method (str, optional): HTTP method. Defaults to "GET".
+            weight (float, optional): Relative frequency in the mix. Defaults to
+            1.
+            headers (dict[str, str], optional): HTTP headers. Defaults to None.
+            data (Dynamic, optional): Request body (str, bytes or form dict), or
+            a function that builds it from a ``random.Random``. Defaults to None
+            .
+            name (str, optional): Used in logs. Defaults to method and path.
+        """
+        self.path = path
+        self.method = method
+        self.weight = weight
+        self.headers = headers
+        self.data = data
+        self.name = name if name is not None else f"{method} {path}"
+
+    def render(self, rng: random.Random) -> tuple[str, Optional[dict], Any]:
+        """Build path, headers and body of a request to be sent.
+
+        Args:
+            rng (random.Random): Random generator of the worker.
+
+        Returns:
+            tuple[str, Optional[dict], Any]: Path, headers and body.
+        """
+        return _resolve(self.path, rng), self.headers, _resolve(self.data, rng)
+
+
+class RequestMix:
+    """Weighted mix of requests, e.g. 80% reads and 20% writes."""
+
+    def __init__(self, requests: list[Request]) -> None:
+        """Weighted mix of requests, e.g. 80% reads and 20% writes.
+
+        Args:
+            requests (list[Request]): Requests and their weights.
+        """
+        assert len(requests) > 0, "Request mix is empty"
+        self.requests = requests
+        self._cumulative: list[float] = []
+        total = 0
+        for request in requests:
+            total += request.weight
+            self._cumulative.append(total)
+        self._total = total
+
+    def choose(self, rng: random.Random) -> Request:
+        """Pick a request according to weights."""
+        if len(self.requests) == 1:
+            return self.requests[0]
+        idx = bisect.bisect_right(self._cumulative, rng.random() * self._total)
+        return self.requests[min(idx, len(self.requests) - 1)]
+
+
+class OpenLoopConfig:
+    """Configs of the Python-native open-loop load generator."""
+
+    def __init__(
+        self,
+        url: str,
+        mix: Union[RequestMix, list[Request], str],
+        duration: Union[int, str],
+        connections: int = 100,
+        processes: Optional[int] = None,
+        timeout: float = 10,
+        use_uvloop: bool = True,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Configs of the Python-native open-loop load generator.
+
+        Args:
+            url (str): Base url of the application, e.g. http://localhost:30628.
+            mix (RequestMix | list[Request] | str): Requests to be sent, or path
+            of a YAML workload spec, check ``spec.WorkloadSpec``.
+            duration (int | str): Duration of the run, e.g. 40 or "40s".
+            connections (int, optional): Maximum open connections of all process
+            es. Defaults to 100.
+            processes (int, optional): Number of worker processes. Defaults to t
+            he number of CPU cores.
+            timeout (float, optional): Timeout of every request, unit: second. D
+            efaults to 10.
+            use_uvloop (bool, optional): Use uvloop as event loop if it is insta
+            lled. Defaults to True.
+            seed (int, optional): Seed of request mix, used for reproducible wor
+            kloads. Defaults to None.
+        """
+        self.url = url.rstrip("/")
+        if isinstance(mix, str):
+            from .spec import WorkloadSpec
+
+            mix = WorkloadSpec.load_from_yaml(mix).to_request_mix(seed)
+        self.mix = mix if isinstance(mix, RequestMix) else RequestMix(mix)
+        self.duration = duration
+        self.connections = connections
+        self.processes = processes if processes is not None else os.cpu_count()
+        self.timeout = timeout
+        self.use_uvloop = use_uvloop
+        self.seed = seed
+
+
+def _error_type(error: BaseException) -> str:
+    import aiohttp
+
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    if isinstance(error, aiohttp.ClientConnectorError):
+        return "connect"
+    if isinstance(error, aiohttp.ClientOSError) and not isinstance(
+        error, aiohttp.ClientPayloadError
+    ):
+        return "write"
+    return "read"
+
+
+async def _generate(
+    config: OpenLoopConfig,
+    rate: int,
+    connections: int,
+    start_at: float,
+    seed: Optional[int],
+) -> LoadResult:
+    """Send ``rate`` requests per second following a constant schedule. Latency
+    is measured from the scheduled send time instead of the actual one, so queu
+    eing caused by a slow server is not hidden (coordinated omission)."""
+    import aiohttp
+
+    duration = duration_seconds(config.duration)
+    result = LoadResult(duration=duration, timeseries=ThroughputTimeSeries())
+    if rate <= 0:
+        return result
+    histogram, timeseries = result.histogram, result.timeseries
+    rng = random.Random(seed)
+    loop = asyncio.get_running_loop()
+    interval = 1 / rate
+    total = int(rate * duration)
+
+    async def send(session: aiohttp.ClientSession, scheduled: float):
+        request = config.mix.choose(rng)
+        path, headers, data = request.render(rng)
+        try:
+            async with session.request(
+                request.method, config.url + path, headers=headers, data=data
+            ) as response:
+                await response.read()
+                status = response.status
+        except Exception as e:
+            error = _error_type(e)
+            result.errors[error] += 1
+            log.debug(f"{__file__}: {request.name} failed: {error} {e}")
+            return
+        histogram.record((loop.time() - scheduled) * 1_000_000)
+        result.requests += 1
+        failed = status > 399
+        if failed:
+            result.errors["non_2xx_3xx"] += 1
+        timeseries.add(int(time()), 1, int(failed))
+
+    connector = aiohttp.TCPConnector(limit=connections)
+    timeout = aiohttp.ClientTimeout(total=config.timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        start = loop.time() + max(0.0, start_at - time())
+        result.start_time = time() + (start - loop.time())
+        in_flight: set[asyncio.Task] = set()
+        sent = 0
+        while sent < total:
+            # Send all requests that are due, then sleep until the next one
+            due = min(total, math.floor((loop.time() - start) / interval) + 1)
+            while sent < due:
+                task = asyncio.ensure_future(send(session, start + sent * interval))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                sent += 1
+            if sent < total:
+                await asyncio.sleep(max(0.0, start + sent * interval - loop.time()))
+        if in_flight:
+            await asyncio.gather(*in_flight)
+    result.end_time = time()
+    return result
+
+
+def _run_worker(
+    config: OpenLoopConfig,
+    rate: int,
+    connections: int,
+    start_at: float,
+    seed: Optional[int],
+) -> LoadResult:
+    if config.use_uvloop:
+        try:
+            import uvloop
+
+            with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+                return runner.run(
+                    _generate(config, rate, connections, start_at, seed)
+                )
+        except ImportError:
+            pass
+    return asyncio.run(_generate(config, rate, connections, start_at, seed))
+
+
+def _worker_main(queue, index: int, *args) -> None:
+    try:
+        queue.put((index, _run_worker(*args)))
+    except BaseException as e:
+        queue.put((index, e))
+
+
+class OpenLoopWorkloadGenerator(WorkloadGeneratorInterface):
+    """Python-native open-loop workload generator, an alternative of wrk2 that r
+    equires no external binary. Requests are sent by asyncio (uvloop if install
+    ed) with aiohttp connection pools in multiple processes.
+    """
+
+    def __init__(self, config: OpenLoopConfig, output_path: str) -> None:
+        """Python-native open-loop workload generator.
+
+        Args:
+            config (OpenLoopConfig): Target url, request mix, duration, etc.
+            output_path (str): Specify where the results store should be saved,
+            same as ``BaseWorkloadGenerator``, so ``WrkFetcher`` can read it.
+        """
+        self.config = config
+        self.store = ResultsStore(output_path)
+
+    def run(self, workload: int, test_case_name: str) -> LoadResult:
+        """Generate ``workload`` requests per second for the configured duratio
+        n.
+
+        Args:
+            workload (int): Throughput, units: requests/second.
+            test_case_name (str): Used to identify different test cases.
+
+        Returns:
+            LoadResult: Merged result of all worker processes.
+        """
+        duration = duration_seconds(self.config.duration)
+        if workload <= 0:
+            # Nothing to send, a rate of 0 has no interval between requests
+            result = LoadResult(duration=duration, clients=0)
+            self.store.append(test_case_name, result.to_dict())
+            return result
+        processes = max(1, min(self.config.processes, workload))
+        rates = split_evenly(workload, processes)
+        connections = split_evenly(
+            max(self.config.connections, processes), processes
+        )
+        start_at = time() + START_DELAY
+        log.debug(
+            f"{__file__}: {processes} processes, rates {rates}, "
+            f"connections {connections}"
+        )
+        # Fork, so request mixes may use lambdas and local functions
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        workers = []
+        for i in range(processes):
+            seed = self.config.seed + i if self.config.seed is not None else None
+            worker = context.Process(
+                target=_worker_main,
+                args=(queue, i, self.config, rates[i], connections[i], start_at, seed),
+                daemon=True,
+            )
+            worker.start()
+            workers.append(worker)
+
+        results: list[LoadResult] = []
+        deadline = start_at + duration + self.config.timeout + START_DELAY
+        for _ in workers:
+            try:
+                index, result = queue.get(timeout=max(deadline - time(), 1))
+            except Exception:
+                log.warn(f"{test_case_name}: open-loop workers timeout", to_file=True)
+                break
+            if isinstance(result, BaseException):
+                log.error(
+                    f"{test_case_name}: open-loop worker {index} failed: {result}",
+                    to_file=True,
+                )
+                continue
+            results.append(result)
+        for worker in workers:
+            worker.join(timeout=1)
+            if worker.is_alive():
+                worker.kill()
+
+        result = LoadResult.merge(results)
+        result.duration = duration
+        self.store.append(test_case_name, result.to_dict())
+        return result
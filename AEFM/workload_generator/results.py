@@ -0,0 +1,407 @@
+import re, math
+from typing import Any, Iterable, Optional
+
+DEFAULT_PERCENTILES = [50, 75, 90, 95, 99, 99.9, 99.99, 100]
+SOCKET_ERRORS = ["connect", "read", "write", "timeout"]
+
+_SPECTRUM_LINE = re.compile(r"^\s*(\d+\.\d+)\s+(\d\.\d+)\s+(\d+)\s+\S+\s*$")
+_REQUESTS = re.compile(r"(\d+)\srequests in")
+_SOCKET_ERRORS = re.compile(
+    r"Socket errors: connect (\d+), read (\d+), write (\d+), timeout (\d+)"
+)
+_NON_2XX_3XX = re.compile(r"Non-2xx or 3xx responses: (\d+)")
+_TIMESERIES_LINE = re.compile(r"^AEFM_TS (\d+) (\d+) (\d+) (\d+)$")
+
+
+class LatencyHistogram:
+    """HdrHistogram-like latency histogram. Values are recorded in microseconds
+    and bucketed with 3 significant digits, histograms of different clients can
+    be merged without losing the distribution.
+    """
+
+    def __init__(self) -> None:
+        """HdrHistogram-like latency histogram."""
+        self.counts: dict[int, int] = {}
+        self.total_count = 0
+
+    @staticmethod
+    def _bucket(value_us: float) -> int:
+        value_us = int(value_us)
+        if value_us < 1000:
+            return value_us
+        magnitude = 10 ** (len(str(value_us)) - 3)
+        return value_us // magnitude * magnitude
+
+    def record(self, value_us: float, count: int = 1) -> None:
+        """Record ``count`` requests with latency ``value_us``.
+
+        Args:
+            value_us (float): Latency, unit: microsecond.
+            count (int, optional): Number of requests. Defaults to 1.
+        """
+        bucket = self._bucket(value_us)
+        self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total_count += count
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Add all records of ``other`` into this histogram.
+
+        Args:
+            other (LatencyHistogram): Another histogram.
+
+        Returns:
+            LatencyHistogram: Return self for chaining.
+        """
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total_count += other.total_count
+        return self
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Get latency at ``percentile``.
+
+        Args:
+            percentile (float): Range: 0 - 100.
+
+        Returns:
+            Optional[float]: Latency, unit: millisecond. None if histogram is em
+            pty.
+        """
+        return self.percentiles([percentile])[percentile]
+
+    def percentiles(
+        self, percentiles: Iterable[float] = DEFAULT_PERCENTILES
+    ) -> dict[float, Optional[float]]:
+        """Get latency at multiple percentiles with a single pass.
+
+        Args:
+            percentiles (Iterable[float], optional): Range: 0 - 100. Defaults to
+            DEFAULT_PERCENTILES.
+
+        Returns:
+            dict[float, Optional[float]]: Percentile and latency (unit: millisec
+            ond) pairs.
+        """
+        percentiles = sorted(percentiles)
+        result: dict[float, Optional[float]] = {p: None for p in percentiles}
+        if self.total_count == 0:
+            return result
+        buckets = sorted(self.counts.items())
+        cumulative, idx = 0, 0
+        for percentile in percentiles:
+            target = max(1, math.ceil(percentile / 100 * self.total_count))
+            while cumulative < target and idx < len(buckets):
+                cumulative += buckets[idx][1]
+                idx += 1
+            result[percentile] = buckets[max(idx - 1, 0)][0] / 1000
+        return result
+
+    def mean(self) -> Optional[float]:
+        """Mean latency, unit: millisecond. None if histogram is empty."""
+        if self.total_count == 0:
+            return None
+        total = sum(bucket * count for bucket, count in self.counts.items())
+        return total / self.total_count / 1000
+
+    def to_dict(self) -> dict[str, int]:
+        return {str(bucket): count for bucket, count in sorted(self.counts.items())}
+
+    @staticmethod
+    def load_from_dict(data: dict[str, int]) -> "LatencyHistogram":
+        histogram = LatencyHistogram()
+        for bucket, count in data.items():
+            histogram.counts[int(bucket)] = count
+            histogram.total_count += count
+        return histogram
+
+
+class ThroughputTimeSeries:
+    """Number of responses and error responses of every second during a run."""
+
+    def __init__(self) -> None:
+        """Number of responses and error responses of every second during a run.
+        """
+        self.seconds: dict[int, list[int]] = {}
+
+    def add(self, second: int, responses: int, errors: int = 0) -> None:
+        """Add responses received in ``second``.
+
+        Args:
+            second (int): Unix timestamp, unit: second.
+            responses (int): Number of responses.
+            errors (int, optional): Number of error (non-2xx or 3xx) responses.
+            Defaults to 0.
+        """
+        record = self.seconds.setdefault(second, [0, 0])
+        record[0] += responses
+        record[1] += errors
+
+    def add_line(self, line: str) -> bool:
+        """Add a line printed by ``wrk_scripts/timeseries.lua``, other lines are
+        ignored.
+
+        Args:
+            line (str): A line of wrk output.
+
+        Returns:
+            bool: Whether the line is a time series line.
+        """
+        match = _TIMESERIES_LINE.match(line.strip())
+        if match is None:
+            return False
+        _, second, responses, errors = [int(x) for x in match.groups()]
+        self.add(second, responses, errors)
+        return True
+
+    def merge(self, other: "ThroughputTimeSeries") -> "ThroughputTimeSeries":
+        """Add all records of ``other`` into this time series.
+
+        Args:
+            other (ThroughputTimeSeries): Another time series.
+
+        Returns:
+            ThroughputTimeSeries: Return self for chaining.
+        """
+        for second, (responses, errors) in other.seconds.items():
+            self.add(second, responses, errors)
+        return self
+
+    def to_rows(self, start_time: Optional[float] = None) -> list[dict[str, int]]:
+        """Rows of every second, seconds without responses are filled with 0.
+
+        Args:
+            start_time (float, optional): Start time of the run, used to compute
+            ``second`` column. Defaults to the first recorded second.
+
+        Returns:
+            list[dict[str, int]]: Rows with keys: timestamp, second (since start
+            ), requests and errors.
+        """
+        if len(self.seconds) == 0:
+            return []
+        first, last = min(self.seconds), max(self.seconds)
+        start = int(start_time) if start_time is not None else first
+        return [
+            {
+                "timestamp": second,
+                "second": second - start,
+                "requests": self.seconds.get(second, [0, 0])[0],
+                "errors": self.seconds.get(second, [0, 0])[1],
+            }
+            for second in range(first, last + 1)
+        ]
+
+    def steady_window(self, tolerance: float = 0.1) -> Optional[tuple[int, int]]:
+        """Detect the steady state of a run, i.e. from the first to the last sec
+        ond whose responses reach ``1 - tolerance`` of the median. Seconds befor
+        e and after are warm-up (connection setup, cold caches) and cool-down.
+
+        Args:
+            tolerance (float, optional): Allowed relative deviation below the me
+            dian. Defaults to 0.1.
+
+        Returns:
+            Optional[tuple[int, int]]: Start and end timestamp of steady state,
+            unit: second. None if there are less than 3 seconds or no responses.
+        """
+        rows = self.to_rows()
+        if len(rows) < 3:
+            return None
+        counts = sorted(row["requests"] for row in rows)
+        median = counts[len(counts) // 2]
+        if median == 0:
+            return None
+        threshold = median * (1 - tolerance)
+        steady = [row["timestamp"] for row in rows if row["requests"] >= threshold]
+        return steady[0], steady[-1] + 1
+
+    def to_dict(self) -> dict[str, list[int]]:
+        return {str(k): v for k, v in sorted(self.seconds.items())}
+
+    @staticmethod
+    def load_from_dict(data: dict[str, list[int]]) -> "ThroughputTimeSeries":
+        timeseries = ThroughputTimeSeries()
+        for second, (responses, errors) in data.items():
+            timeseries.add(int(second), responses, errors)
+        return timeseries
+
+
+class LoadResult:
+    """Structured result of a workload generator run: requests, errors and the
+    latency histogram observed by clients."""
+
+    def __init__(
+        self,
+        requests: int = 0,
+        duration: float = 0,
+        errors: Optional[dict[str, int]] = None,
+        histogram: Optional[LatencyHistogram] = None,
+        clients: int = 1,
+        client_status: Optional[list[dict]] = None,
+        timeseries: Optional[ThroughputTimeSeries] = None,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        health: Optional[dict] = None,
+    ) -> None:
+        """Structured result of a workload generator run.
+
+        Args:
+            requests (int, optional): Completed requests. Defaults to 0.
+            duration (float, optional): Duration of the run, unit: second. Defau
+            lts to 0.
+            errors (dict[str, int], optional): Error counts, keys: connect, read
+            , write, timeout and non_2xx_3xx. Defaults to None.
+            histogram (LatencyHistogram, optional): Latency distribution. Defaul
+            ts to None.
+            clients (int, optional): Number of clients that produced the result.
+            Defaults to 1.
+            client_status (list[dict], optional): Exit status of each client, k
+            eys: returncode and timed_out. Defaults to None.
+            timeseries (ThroughputTimeSeries, optional): Per-second responses,
+            only available in streaming mode. Defaults to None.
+            start_time (float, optional): Start time timestamp of the run, unit
+            in second. Defaults to None.
+            end_time (float, optional): End time timestamp of the run, unit in s
+            econd. Defaults to None.
+            health (dict, optional): Health verdict of clients, check ``health.C
+            lientHealth.to_dict``. Defaults to None.
+        """
+        self.requests = requests
+        self.duration = duration
+        self.errors = {x: 0 for x in SOCKET_ERRORS + ["non_2xx_3xx"]}
+        if errors is not None:
+            self.errors.update(errors)
+        self.histogram = histogram if histogram is not None else LatencyHistogram()
+        self.clients = clients
+        self.client_status = client_status if client_status is not None else []
+        self.timeseries = timeseries
+        self.start_time = start_time
+        self.end_time = end_time
+        self.health = health
+
+    @property
+    def throughput(self) -> float:
+        """Real throughput, unit: requests/second."""
+        return self.requests / self.duration if self.duration else 0.0
+
+    @staticmethod
+    def merge(results: list["LoadResult"]) -> "LoadResult":
+        """Merge results of clients that run in parallel. Requests, errors and h
+        istograms are summed, so percentiles are computed on the merged distribu
+        tion instead of averaging percentiles of clients.
+
+        Args:
+            results (list[LoadResult]): Results of parallel clients.
+
+        Returns:
+            LoadResult: Merged result.
+        """
+        merged = LoadResult(clients=0)
+        for result in results:
+            merged.requests += result.requests
+            merged.duration = max(merged.duration, result.duration)
+            for key, count in result.errors.items():
+                merged.errors[key] = merged.errors.get(key, 0) + count
+            merged.histogram.merge(result.histogram)
+            merged.clients += result.clients
+            merged.client_status.extend(result.client_status)
+            if result.timeseries is not None:
+                if merged.timeseries is None:
+                    merged.timeseries = ThroughputTimeSeries()
+                merged.timeseries.merge(result.timeseries)
+            if result.start_time is not None:
+                merged.start_time = min(
+                    x for x in [merged.start_time, result.start_time] if x is not None
+                )
+            if result.end_time is not None:
+                merged.end_time = max(
+                    x for x in [merged.end_time, result.end_time] if x is not None
+                )
+        return merged
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serializable representation, latencies are in milliseconds."""
+        latency = {
+            f"p{p:g}": v for p, v in self.histogram.percentiles().items()
+        }
+        latency["mean"] = self.histogram.mean()
+        return {
+            "requests": self.requests,
+            "duration": self.duration,
+            "throughput": self.throughput,
+            "clients": self.clients,
+            "client_status": self.client_status,
+            "errors": dict(self.errors),
+            "latency": latency,
+            "histogram": self.histogram.to_dict(),
+            "timeseries": (
+                self.timeseries.to_dict() if self.timeseries is not None else None
+            ),
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "health": self.health,
+        }
+
+    @staticmethod
+    def load_from_dict(data: dict[str, Any]) -> "LoadResult":
+        return LoadResult(
+            data["requests"],
+            data["duration"],
+            data["errors"],
+            LatencyHistogram.load_from_dict(data["histogram"]),
+            data.get("clients", 1),
+            data.get("client_status"),
+            (
+                ThroughputTimeSeries.load_from_dict(data["timeseries"])
+                if data.get("timeseries") is not None
+                else None
+            ),
+            data.get("start_time"),
+            data.get("end_time"),
+            data.get("health"),
+        )
+
+
+def parse_wrk_output(content: str, duration: float) -> LoadResult:
+    """Parse stdout of a wrk2 client that runs with ``--latency``. The latency h
+    istogram is rebuilt from the "Detailed Percentile spectrum" section, other s
+    ections are ignored.
+
+    Args:
+        content (str): Output of wrk2.
+        duration (float): Duration of the run, unit: second.
+
+    Returns:
+        LoadResult: Parsed result, histogram is empty if wrk2 runs without ``--
+        latency``.
+    """
+    result = LoadResult(duration=duration)
+    match = _REQUESTS.search(content)
+    if match is not None:
+        result.requests = int(match.group(1))
+    match = _SOCKET_ERRORS.search(content)
+    if match is not None:
+        for key, count in zip(SOCKET_ERRORS, match.groups()):
+            result.errors[key] = int(count)
+    match = _NON_2XX_3XX.search(content)
+    if match is not None:
+        result.errors["non_2xx_3xx"] = int(match.group(1))
+
+    in_spectrum, previous_count = False, 0
+    for line in content.splitlines():
+        if not in_spectrum:
+            in_spectrum = "Detailed Percentile spectrum" in line
+            continue
+        if line.startswith("#["):
+            # Only the first (recorded latency) spectrum is used
+            break
+        match = _SPECTRUM_LINE.match(line)
+        if match is None:
+            continue
+        total_count = int(match.group(3))
+        if total_count > previous_count:
+            result.histogram.record(
+                float(match.group(1)) * 1000, total_count - previous_count
+            )
+            previous_count = total_count
+    return result
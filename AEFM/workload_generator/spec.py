@@ -0,0 +1,533 @@
+import hashlib, os, pathlib, random, re, string, tempfile
+from typing import Any, Optional, Union
+from .open_loop import Request, RequestMix
+
+ALNUM = string.ascii_letters + string.digits
+DIGITS = string.digits
+# Where compiled Lua scripts are saved if no output folder is given
+COMPILED_FOLDER = pathlib.Path(tempfile.gettempdir()).joinpath("aefm_wrk_scripts")
+
+_NAME = re.compile(r"^[A-Za-z_]\w*$")
+_PLACEHOLDER = re.compile(r"\{([A-Za-z_]\w*)\}")
+# Parameters evaluated only once when the script is loaded
+_GLOBAL_KINDS = ["const", "env"]
+_KINDS = _GLOBAL_KINDS + ["int", "uniform", "choice", "string", "digits", "add", "list"]
+
+
+def _placeholders(template: Optional[str]) -> list[str]:
+    if template is None:
+        return []
+    return _PLACEHOLDER.findall(template)
+
+
+def _lua_str(value: str) -> str:
+    """Quote a Python string as Lua string literal."""
+    escaped = (
+        value.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+    return f'"{escaped}"'
+
+
+def _lua_value(value: Union[int, float, str]) -> str:
+    if isinstance(value, bool):
+        raise ValueError(f"Unsupported value: {value}")
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if _NAME.match(value):
+        # Reference to another parameter
+        return f"p_{value}"
+    return _lua_str(value)
+
+
+class ParamSpec:
+    """A parameter of the workload spec and its distribution."""
+
+    def __init__(self, name: str, kind: str, args: Any, pool_size: int) -> None:
+        """A parameter of the workload spec and its distribution. Available dist
+        ributions (key: args):
+
+        - const: value, a constant.
+        - env: [name, default], environment variable read once.
+        - int: [min, max], uniform integer, both ends included. Ends can be othe
+          r parameters.
+        - uniform: [min, max], uniform float.
+        - choice: [a, b, ...], one of the values.
+        - string: length, random alphanumeric string from a precomputed pool.
+        - digits: length, random digit string from a precomputed pool.
+        - add: [param, value], value of another parameter plus ``value``.
+        - list: {item, count, sep}, ``count`` (int or parameter) items rendered
+          from template ``item`` and joined with ``sep`` (default ""), placehold
+          ers are sampled for every item.
+
+        Args:
+            name (str): Name of the parameter, used as ``{name}`` in templates.
+            kind (str): Kind of distribution.
+            args (Any): Arguments of distribution.
+            pool_size (int): Size of precomputed pools, used by ``string`` and
+            ``digits``.
+        """
+        if not _NAME.match(name):
+            raise ValueError(f"Invalid parameter name: {name}")
+        if kind not in _KINDS:
+            raise ValueError(f"Unknown distribution of {name}: {kind}")
+        self.name = name
+        self.kind = kind
+        self.args = args
+        self.pool_size = pool_size
+        if kind == "list":
+            self.args = {"sep": "", **args}
+
+    @staticmethod
+    def load_from_dict(name: str, data: Any, pool_size: int) -> "ParamSpec":
+        """Create ParamSpec object based on YAML data, e.g. ``{int: [1, 10]}``,
+        scalars are constants. ``string`` and ``digits`` accept an extra ``pool
+        `` key to override the pool size.
+        """
+        if not isinstance(data, dict):
+            return ParamSpec(name, "const", data, pool_size)
+        data = dict(data)
+        pool_size = data.pop("pool", pool_size)
+        if len(data) != 1:
+            raise ValueError(f"Parameter {name} needs exactly one distribution")
+        kind, args = next(iter(data.items()))
+        return ParamSpec(name, kind, args, pool_size)
+
+    @property
+    def is_global(self) -> bool:
+        return self.kind in _GLOBAL_KINDS
+
+    def dependencies(self) -> list[str]:
+        """Parameters that must be sampled before this one in the same request.
+        """
+        match self.kind:
+            case "int" | "uniform":
+                return [x for x in self.args if isinstance(x, str)]
+            case "add":
+                return [self.args[0]]
+            case "list":
+                count = self.args["count"]
+                return [count] if isinstance(count, str) else []
+        return []
+
+    def item_placeholders(self) -> list[str]:
+        """Parameters sampled for every item of a list."""
+        return _placeholders(self.args["item"]) if self.kind == "list" else []
+
+    def pool(self, rng: random.Random) -> list[str]:
+        """Build the pool of random strings in Python."""
+        charset = ALNUM if self.kind == "string" else DIGITS
+        return [
+            "".join(rng.choices(charset, k=self.args)) for _ in range(self.pool_size)
+        ]
+
+
+class RequestSpec:
+    """A kind of request of the workload spec."""
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        method: str = "GET",
+        weight: float = 1,
+        headers: Optional[dict[str, str]] = None,
+        body: Optional[str] = None,
+    ) -> None:
+        """A kind of request of the workload spec.
+
+        Args:
+            name (str): Name of the request.
+            path (str): Path template, e.g. ``/user?username={user}``.
+            method (str, optional): HTTP method. Defaults to "GET".
+            weight (float, optional): Relative frequency in the mix. Defaults to
+            1.
+            headers (dict[str, str], optional): Header templates. Defaults to No
+            ne.
+            body (str, optional): Body template. Defaults to None.
+        """
+        self.name = name
+        self.path = path
+        self.method = method
+        self.weight = weight
+        self.headers = headers if headers is not None else {}
+        self.body = body
+
+    @staticmethod
+    def load_from_dict(data: dict) -> "RequestSpec":
+        return RequestSpec(
+            data.get("name", data["path"]),
+            data["path"],
+            data.get("method", "GET"),
+            data.get("weight", 1),
+            data.get("headers"),
+            data.get("body"),
+        )
+
+    def placeholders(self) -> list[str]:
+        templates = [self.path, self.body, *self.headers.values()]
+        names = []
+        for template in templates:
+            for name in _placeholders(template):
+                if name not in names:
+                    names.append(name)
+        return names
+
+
+class _SpecRequest(Request):
+    """Request of the open-loop generator rendered from a ``RequestSpec``."""
+
+    def __init__(self, spec: "WorkloadSpec", request: RequestSpec, pools: dict):
+        super().__init__(
+            request.path, request.method, request.weight, request.headers, None,
+            request.name,
+        )
+        self.spec = spec
+        self.request = request
+        self.pools = pools
+
+    def render(self, rng: random.Random) -> tuple[str, Optional[dict], Any]:
+        # Parameters are sampled once and shared by path, headers and body
+        values = {}
+        request = self.request
+
+        def fill(template: str) -> str:
+            return self.spec._render(template, values, rng, self.pools)
+
+        path = fill(request.path)
+        headers = {k: fill(v) for k, v in request.headers.items()} or None
+        body = fill(request.body) if request.body is not None else None
+        return path, headers, body
+
+
+class WorkloadSpec:
+    """Declarative workload: parameters with distributions and weighted request
+    templates. It can be compiled into a wrk Lua script, or executed by ``OpenL
+    oopWorkloadGenerator``. Random strings are drawn from pools that are compute
+    d once, so generating payloads costs little CPU at high request rates.
+
+    Example (YAML)::
+
+        pool_size: 1000
+        params:
+          user: {int: [1, 962]}
+          text: {string: 256}
+        requests:
+        - name: compose
+          weight: 1
+          method: POST
+          path: /wrk2-api/post/compose
+          headers:
+            Content-Type: application/x-www-form-urlencoded
+          body: user_id={user}&text={text}
+    """
+
+    def __init__(
+        self,
+        params: dict[str, ParamSpec],
+        requests: list[RequestSpec],
+        pool_size: int = 1000,
+    ) -> None:
+        """Declarative workload, check class docstring for the YAML format.
+
+        Args:
+            params (dict[str, ParamSpec]): Parameters and their names.
+            requests (list[RequestSpec]): Requests of the mix.
+            pool_size (int, optional): Default size of random string pools. Defa
+            ults to 1000.
+        """
+        assert len(requests) > 0, "Workload spec has no requests"
+        self.params = params
+        self.requests = requests
+        self.pool_size = pool_size
+        self._validate()
+
+    @staticmethod
+    def load_from_dict(data: dict) -> "WorkloadSpec":
+        """Create WorkloadSpec object based on YAML data."""
+        pool_size = data.get("pool_size", 1000)
+        params = {
+            name: ParamSpec.load_from_dict(name, value, pool_size)
+            for name, value in (data.get("params") or {}).items()
+        }
+        requests = [RequestSpec.load_from_dict(x) for x in data["requests"]]
+        return WorkloadSpec(params, requests, pool_size)
+
+    @staticmethod
+    def load_from_yaml(path: str) -> "WorkloadSpec":
+        """Load workload spec from a YAML file."""
+        import yaml
+
+        with open(path, "r") as file:
+            return WorkloadSpec.load_from_dict(yaml.load(file, Loader=yaml.CLoader))
+
+    def _validate(self) -> None:
+        def check(name: str, visiting: list[str]):
+            if name not in self.params:
+                raise ValueError(f"Undefined parameter: {name}")
+            if name in visiting:
+                raise ValueError(f"Circular parameter: {' -> '.join(visiting)}")
+            param = self.params[name]
+            for dep in param.dependencies() + param.item_placeholders():
+                check(dep, visiting + [name])
+            for dep in param.item_placeholders():
+                if self.params[dep].kind == "list":
+                    raise ValueError(f"Nested list parameter: {name} -> {dep}")
+
+        for request in self.requests:
+            for name in request.placeholders():
+                check(name, [])
+
+    def _order(self, names: list[str]) -> list[str]:
+        """Request-scope parameters needed by ``names``, dependencies first."""
+        ordered = []
+
+        def visit(name: str):
+            param = self.params[name]
+            if name in ordered or param.is_global:
+                return
+            for dep in param.dependencies():
+                visit(dep)
+            ordered.append(name)
+
+        for name in names:
+            visit(name)
+        return ordered
+
+    # Python execution
+
+    def _sample(
+        self, name: str, values: dict, rng: random.Random, pools: dict
+    ) -> Any:
+        if name in values:
+            return values[name]
+        param = self.params[name]
+        args = param.args
+
+        def resolve(x):
+            return self._sample(x, values, rng, pools) if isinstance(x, str) else x
+
+        match param.kind:
+            case "const" | "env":
+                value = pools[name]
+            case "int":
+                value = rng.randint(int(resolve(args[0])), int(resolve(args[1])))
+            case "uniform":
+                value = rng.uniform(float(resolve(args[0])), float(resolve(args[1])))
+            case "choice" | "string" | "digits":
+                value = rng.choice(pools[name])
+            case "add":
+                value = resolve(args[0]) + args[1]
+            case "list":
+                count = int(resolve(args["count"]))
+                value = args["sep"].join(
+                    self._render(args["item"], {}, rng, pools) for _ in range(count)
+                )
+        values[name] = value
+        return value
+
+    def _render(
+        self, template: str, values: dict, rng: random.Random, pools: dict
+    ) -> str:
+        return _PLACEHOLDER.sub(
+            lambda m: str(self._sample(m.group(1), values, rng, pools)), template
+        )
+
+    def _python_pools(self, rng: random.Random) -> dict[str, Any]:
+        pools = {}
+        for name, param in self.params.items():
+            match param.kind:
+                case "const":
+                    pools[name] = param.args
+                case "env":
+                    env_name, default = param.args
+                    value = os.environ.get(env_name)
+                    pools[name] = type(default)(value) if value else default
+                case "choice":
+                    pools[name] = list(param.args)
+                case "string" | "digits":
+                    pools[name] = param.pool(rng)
+        return pools
+
+    def to_request_mix(self, seed: Optional[int] = None) -> RequestMix:
+        """Request mix that can be executed by ``OpenLoopWorkloadGenerator``.
+
+        Args:
+            seed (int, optional): Seed of random pools. Defaults to None.
+
+        Returns:
+            RequestMix: Requests rendered from templates.
+        """
+        pools = self._python_pools(random.Random(seed))
+        return RequestMix([_SpecRequest(self, x, pools) for x in self.requests])
+
+    # Lua compilation
+
+    def _lua_sample(self, name: str) -> str:
+        """Lua statement that samples request-scope parameter ``name``."""
+        param = self.params[name]
+        args = param.args
+        match param.kind:
+            case "int":
+                low, high = [_lua_value(x) for x in args]
+                return f"local p_{name} = math.random({low}, {high})"
+            case "uniform":
+                low, high = [_lua_value(x) for x in args]
+                return f"local p_{name} = {low} + ({high} - {low}) * math.random()"
+            case "choice" | "string" | "digits":
+                return f"local p_{name} = POOL_{name}[math.random(1, #POOL_{name})]"
+            case "add":
+                return f"local p_{name} = p_{args[0]} + {_lua_value(args[1])}"
+            case "list":
+                return f"local p_{name} = list_{name}({_lua_value(args['count'])})"
+
+    def _lua_template(self, template: str) -> str:
+        parts = []
+        last = 0
+        for match in _PLACEHOLDER.finditer(template):
+            if match.start() > last:
+                parts.append(_lua_str(template[last : match.start()]))
+            parts.append(f"p_{match.group(1)}")
+            last = match.end()
+        if last < len(template) or len(parts) == 0:
+            parts.append(_lua_str(template[last:]))
+        return " .. ".join(parts)
+
+    def _lua_locals(self, names: list[str], indent: str) -> list[str]:
+        return [indent + self._lua_sample(name) for name in self._order(names)]
+
+    def to_lua(self) -> str:
+        """Compile the spec into a wrk script."""
+        lines = [
+            "-- Generated by AEFM from a workload spec, do not edit.",
+            "math.randomseed(os.time() + "
+            '(tonumber(tostring({}):match("0x(%x+)") or "0", 16) % 100000))',
+            "",
+            "local function random_string(charset, length)",
+            "  local chars = {}",
+            "  for i = 1, length do",
+            "    local c = math.random(1, #charset)",
+            "    chars[i] = charset:sub(c, c)",
+            "  end",
+            "  return table.concat(chars)",
+            "end",
+            "",
+            "local function build_pool(charset, length, size)",
+            "  local pool = {}",
+            "  for i = 1, size do",
+            "    pool[i] = random_string(charset, length)",
+            "  end",
+            "  return pool",
+            "end",
+            "",
+        ]
+        # Global parameters and pools, computed once per thread
+        for name, param in self.params.items():
+            match param.kind:
+                case "const":
+                    value = param.args
+                    value = _lua_str(value) if isinstance(value, str) else value
+                    lines.append(f"local p_{name} = {value}")
+                case "env":
+                    env_name, default = param.args
+                    convert = "tonumber" if isinstance(default, (int, float)) else ""
+                    lines.append(
+                        f"local p_{name} = {convert}(os.getenv({_lua_str(env_name)}))"
+                        f" or {_lua_value(default) if convert else _lua_str(default)}"
+                    )
+                case "choice":
+                    values = ", ".join(
+                        _lua_str(x) if isinstance(x, str) else repr(x)
+                        for x in param.args
+                    )
+                    lines.append(f"local POOL_{name} = {{{values}}}")
+                case "string" | "digits":
+                    charset = ALNUM if param.kind == "string" else DIGITS
+                    lines.append(
+                        f"local POOL_{name} = build_pool({_lua_str(charset)}, "
+                        f"{int(param.args)}, {int(param.pool_size)})"
+                    )
+        lines.append("")
+        # Lists, items are sampled independently
+        for name, param in self.params.items():
+            if param.kind != "list":
+                continue
+            item = param.args["item"]
+            lines += [
+                f"local function list_{name}(count)",
+                "  local items = {}",
+                "  for i = 1, count do",
+                *self._lua_locals(_placeholders(item), "    "),
+                f"    items[i] = {self._lua_template(item)}",
+                "  end",
+                f"  return table.concat(items, {_lua_str(param.args['sep'])})",
+                "end",
+                "",
+            ]
+        # Requests
+        for idx, request in enumerate(self.requests):
+            headers = ", ".join(
+                f"[{_lua_str(k)}] = {self._lua_template(v)}"
+                for k, v in request.headers.items()
+            )
+            body = (
+                self._lua_template(request.body) if request.body is not None else "nil"
+            )
+            lines += [
+                f"-- {request.name}",
+                f"local function request_{idx}()",
+                *self._lua_locals(request.placeholders(), "  "),
+                f"  return wrk.format({_lua_str(request.method)}, "
+                f"{self._lua_template(request.path)}, {{{headers}}}, {body})",
+                "end",
+                "",
+            ]
+        # Weighted selection
+        if len(self.requests) == 1:
+            lines.append("request = request_0")
+        else:
+            total = sum(x.weight for x in self.requests)
+            lines += ["request = function()", f"  local coin = math.random() * {total!r}"]
+            cumulative = 0
+            for idx, request in enumerate(self.requests[:-1]):
+                cumulative += request.weight
+                keyword = "if" if idx == 0 else "elseif"
+                lines += [
+                    f"  {keyword} coin < {cumulative!r} then",
+                    f"    return request_{idx}()",
+                ]
+            lines += [
+                "  else",
+                f"    return request_{len(self.requests) - 1}()",
+                "  end",
+                "end",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def compile_spec(path: str, output_folder: Optional[str] = None) -> str:
+    """Compile a YAML workload spec into a wrk Lua script. Compiled scripts are
+    named by content hash, so unchanged specs are compiled only once.
+
+    Args:
+        path (str): Path of the YAML workload spec.
+        output_folder (str, optional): Where to save the Lua script. Defaults to
+        ``COMPILED_FOLDER``.
+
+    Returns:
+        str: Path of the compiled Lua script.
+    """
+    with open(path, "rb") as file:
+        content = file.read()
+    digest = hashlib.sha1(content).hexdigest()[:12]
+    folder = pathlib.Path(output_folder) if output_folder else COMPILED_FOLDER
+    target = folder.joinpath(f"{pathlib.Path(path).stem}-{digest}.lua")
+    if not target.exists():
+        lua = WorkloadSpec.load_from_yaml(path).to_lua()
+        folder.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(lua)
+        os.replace(tmp, target)
+    return target.as_posix()
@@ -0,0 +1,135 @@
+import json, os
+from time import time
+from typing import Any, Optional
+
+RESULTS_FILE = "results.jsonl"
+RAW_OUTPUT_FILE = "raw_output.bin"
+
+
+class ResultsStore:
+    """Append-only store of workload generator results, one JSON line per test
+    case in ``results.jsonl``. Raw outputs of clients are appended as bytes to
+    ``raw_output.bin`` and referenced by offset, so they are kept byte by byte.
+    If a test case is stored more than once, the last record wins.
+    """
+
+    def __init__(self, folder: str, fsync: bool = False) -> None:
+        """Append-only store of workload generator results.
+
+        Args:
+            folder (str): Where to save the store files.
+            fsync (bool, optional): Flush records to disk after every append. De
+            faults to False.
+        """
+        self.folder = folder
+        self.results_path = os.path.join(folder, RESULTS_FILE)
+        self.raw_path = os.path.join(folder, RAW_OUTPUT_FILE)
+        self.fsync = fsync
+        # Test case name -> offset of its latest record, built incrementally
+        self._index: dict[str, int] = {}
+        self._scanned = 0
+        self._scanned_inode: Optional[int] = None
+
+    def append(self, name: str, result: dict[str, Any], raw: bytes = b"") -> None:
+        """Append the result of a test case.
+
+        Args:
+            name (str): Test case name.
+            result (dict[str, Any]): Structured result, e.g. ``LoadResult.to_dic
+            t()``.
+            raw (bytes, optional): Raw output of clients. Defaults to b"".
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        raw_offset = 0
+        if raw:
+            with open(self.raw_path, "ab") as file:
+                raw_offset = file.seek(0, os.SEEK_END)
+                file.write(raw)
+                self._sync(file)
+        record = {
+            "name": name,
+            "time": time(),
+            "raw_offset": raw_offset,
+            "raw_length": len(raw),
+            "result": result,
+        }
+        line = (json.dumps(record) + "\n").encode()
+        with open(self.results_path, "ab") as file:
+            # A single write, so readers never see half of a record
+            file.write(line)
+            self._sync(file)
+
+    def _sync(self, file) -> None:
+        if self.fsync:
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _scan(self) -> None:
+        """Index records appended since the last scan."""
+        try:
+            stat = os.stat(self.results_path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self._scanned_inode or stat.st_size < self._scanned:
+            # File is replaced or truncated, start over
+            self._index, self._scanned = {}, 0
+            self._scanned_inode = stat.st_ino
+        if stat.st_size == self._scanned:
+            return
+        with open(self.results_path, "rb") as file:
+            file.seek(self._scanned)
+            offset = self._scanned
+            for line in file:
+                if not line.endswith(b"\n"):
+                    # Record is being written
+                    break
+                # Name is the first key, avoid parsing the whole record
+                name = json.loads(line[: line.index(b', "time"')] + b"}")["name"]
+                self._index[name] = offset
+                offset += len(line)
+            self._scanned = offset
+
+    def _record(self, name: str) -> Optional[dict[str, Any]]:
+        # Cheap if nothing is appended since the last scan
+        self._scan()
+        if name not in self._index:
+            return None
+        with open(self.results_path, "rb") as file:
+            file.seek(self._index[name])
+            return json.loads(file.readline())
+
+    def get(self, name: str) -> Optional[dict[str, Any]]:
+        """Get the latest result of a test case.
+
+        Args:
+            name (str): Test case name.
+
+        Returns:
+            Optional[dict[str, Any]]: Structured result, None if it is not found
+            .
+        """
+        record = self._record(name)
+        return record["result"] if record is not None else None
+
+    def raw(self, name: str) -> Optional[bytes]:
+        """Get raw output of clients of a test case.
+
+        Args:
+            name (str): Test case name.
+
+        Returns:
+            Optional[bytes]: Raw output, None if the test case is not found.
+        """
+        record = self._record(name)
+        if record is None:
+            return None
+        if record["raw_length"] == 0:
+            return b""
+        with open(self.raw_path, "rb") as file:
+            file.seek(record["raw_offset"])
+            return file.read(record["raw_length"])
+
+    def names(self) -> list[str]:
+        """Names of all stored test cases."""
+        self._scan()
+        return list(self._index)
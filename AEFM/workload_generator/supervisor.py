@@ -0,0 +1,158 @@
+import os, selectors, signal, subprocess
+from time import monotonic, sleep
+from typing import Callable, Optional
+
+# Time given to clients between SIGTERM and SIGKILL, unit: second
+KILL_GRACE = 3
+
+
+class ClientProcess:
+    """A client subprocess started by ``supervise`` and its final status."""
+
+    def __init__(self, index: int, command: str) -> None:
+        """A client subprocess started by ``supervise`` and its final status.
+
+        Args:
+            index (int): Position of the client in the command list.
+            command (str): Shell command of the client.
+        """
+        self.index = index
+        self.command = command
+        self.proc: Optional[subprocess.Popen] = None
+        self.output = bytearray()
+        self.returncode: Optional[int] = None
+        self.timed_out = False
+        # CPU time (user + system) of the client, unit: second
+        self.cpu_time: Optional[float] = None
+        self._line_buffer = b""
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.proc.pid if self.proc is not None else None
+
+    def text(self) -> str:
+        """Output of the client, invalid UTF-8 bytes are escaped."""
+        return self.output.decode("utf-8", errors="backslashreplace")
+
+    def status(self) -> dict:
+        return {
+            "returncode": self.returncode,
+            "timed_out": self.timed_out,
+            "cpu_time": self.cpu_time,
+        }
+
+    def _feed(self, chunk: bytes, on_line: Optional[Callable[[int, str], None]]):
+        self.output += chunk
+        if on_line is None:
+            return
+        lines = (self._line_buffer + chunk).split(b"\n")
+        self._line_buffer = lines.pop()
+        for line in lines:
+            on_line(self.index, line.decode("utf-8", errors="backslashreplace"))
+
+
+def _signal_group(client: ClientProcess, sig: int) -> None:
+    try:
+        os.killpg(client.proc.pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def _reap(client: ClientProcess, timeout: Optional[float]) -> bool:
+    """Wait for the client with ``wait4``, so CPU time of the client (and its wa
+    ited children) is recorded. Returns False if it is still running after ``ti
+    meout`` seconds, None timeout waits forever."""
+    deadline = monotonic() + timeout if timeout is not None else None
+    flags = os.WNOHANG if timeout is not None else 0
+    while True:
+        try:
+            pid, status, rusage = os.wait4(client.proc.pid, flags)
+        except ChildProcessError:
+            # Already reaped by someone else
+            client.returncode = client.proc.wait()
+            return True
+        if pid != 0:
+            client.returncode = os.waitstatus_to_exitcode(status)
+            client.proc.returncode = client.returncode
+            client.cpu_time = rusage.ru_utime + rusage.ru_stime
+            return True
+        if monotonic() >= deadline:
+            return False
+        sleep(0.01)
+
+
+def supervise(
+    commands: list[str],
+    timeout: float,
+    on_line: Optional[Callable[[int, str], None]] = None,
+) -> list[ClientProcess]:
+    """Run shell ``commands`` in parallel and drain their outputs (stdout and st
+    derr) concurrently, so a chatty client never blocks on a full pipe. Clients
+    still running after ``timeout`` seconds are terminated together with their
+    children.
+
+    Args:
+        commands (list[str]): Shell commands, one per client.
+        timeout (float): Maximum running time of all clients, unit: second.
+        on_line (Callable[[int, str], None], optional): Called with client index
+        and line whenever a client prints a complete line. Defaults to None.
+
+    Returns:
+        list[ClientProcess]: Clients in the same order as ``commands``, with out
+        put, return code, CPU time and whether they were killed by timeout. Pref
+        ix commands with ``exec`` so the client replaces the shell process.
+    """
+    clients = [ClientProcess(i, command) for i, command in enumerate(commands)]
+    selector = selectors.DefaultSelector()
+    for client in clients:
+        client.proc = subprocess.Popen(
+            client.command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            shell=True,
+            # Own process group, so the shell and its children can be killed
+            start_new_session=True,
+        )
+        os.set_blocking(client.proc.stdout.fileno(), False)
+        selector.register(client.proc.stdout, selectors.EVENT_READ, client)
+
+    deadline = monotonic() + timeout
+    killed_at = None
+    while selector.get_map():
+        now = monotonic()
+        if now >= deadline and killed_at is None:
+            for key in list(selector.get_map().values()):
+                key.data.timed_out = True
+                _signal_group(key.data, signal.SIGTERM)
+            killed_at = now
+        elif killed_at is not None and now - killed_at >= KILL_GRACE:
+            for key in list(selector.get_map().values()):
+                _signal_group(key.data, signal.SIGKILL)
+                selector.unregister(key.fileobj)
+            break
+        wait = deadline - now if killed_at is None else KILL_GRACE
+        for key, _ in selector.select(timeout=max(min(wait, 1), 0)):
+            client: ClientProcess = key.data
+            try:
+                chunk = os.read(key.fileobj.fileno(), 65536)
+            except BlockingIOError:
+                continue
+            if chunk:
+                client._feed(chunk, on_line)
+            else:
+                selector.unregister(key.fileobj)
+    selector.close()
+
+    for client in clients:
+        client.proc.stdout.close()
+        if not _reap(client, KILL_GRACE):
+            # Output is closed but process is alive, e.g. it closed its stdout
+            client.timed_out = True
+            _signal_group(client, signal.SIGKILL)
+            _reap(client, None)
+        if client._line_buffer and on_line is not None:
+            on_line(
+                client.index,
+                client._line_buffer.decode("utf-8", errors="backslashreplace"),
+            )
+    return clients
@@ -0,0 +1,43 @@
+-- Wraps the wrk script given by env var AEFM_WRK_SCRIPT and reports the number
+-- of responses of every thread per second, one line per thread and second:
+-- AEFM_TS <thread id> <unix second> <responses> <error responses>
+-- A second is reported when the first response of the next second arrives, so
+-- the last second of a run is not reported.
+dofile(os.getenv("AEFM_WRK_SCRIPT"))
+
+local user_setup = setup
+local user_response = response
+local thread_count = 0
+
+function setup(thread)
+  thread_count = thread_count + 1
+  thread:set("aefm_thread_id", thread_count)
+  if user_setup ~= nil then
+    user_setup(thread)
+  end
+end
+
+local current_second = nil
+local responses = 0
+local errors = 0
+
+function response(status, headers, body)
+  local now = os.time()
+  if now ~= current_second then
+    if current_second ~= nil then
+      io.write(string.format("AEFM_TS %d %d %d %d\n",
+        aefm_thread_id or 0, current_second, responses, errors))
+      io.flush()
+    end
+    current_second = now
+    responses = 0
+    errors = 0
+  end
+  responses = responses + 1
+  if status > 399 then
+    errors = errors + 1
+  end
+  if user_response ~= nil then
+    user_response(status, headers, body)
+  end
+end
@@ -0,0 +1,317 @@
+"""End-to-end benchmark of the experiment loop against local mock servers.
+
+``BaseManager.run`` runs a complete experiment: the deployer and interference
+generators are no-ops that only count calls, the workload generator sleeps for
+``--load-duration`` and stores a synthetic wrk result, and the real data
+collector fetches traces and hardware usage from ``mock_servers.py``. It
+reports the wall time of the loop, where it went (timeline of events and
+handlers), the duration of every collection and the load on the mock servers.
+
+Usage:
+    python benchmarks/bench_harness.py [--workloads 100,200,300] [--rounds 2]
+        [--interferences cpu:0,2,4] [--load-duration 0.2] [--traces 50]
+        [--latency 0.01] [--failure-rate 0.0] [--processes 4] [--pipelined]
+        [--json results.json]
+"""
+
+import argparse, json, os, shutil, sys, tempfile, time, warnings
+from typing import Any, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_servers import MockJaeger, MockPrometheus  # noqa: E402
+from AEFM.manager import manager, register  # noqa: E402
+from AEFM.models import Node, TestCase, TestCases  # noqa: E402
+from AEFM.deployer import DeployerInterface  # noqa: E402
+from AEFM.inf_generator import InfGeneratorInterface  # noqa: E402
+from AEFM.workload_generator.interfaces import WorkloadGeneratorInterface  # noqa: E402
+from AEFM.workload_generator.results import LatencyHistogram, LoadResult  # noqa: E402
+from AEFM.workload_generator.store import ResultsStore  # noqa: E402
+from AEFM.data_collector import TestCaseData  # noqa: E402
+from AEFM.data_collector.base import BaseDataCollector  # noqa: E402
+from AEFM.data_collector.jaeger_trace_collector import JaegerTraceCollector  # noqa: E402
+from AEFM.data_collector.prom_hardware_collector import PromHardwareCollector  # noqa: E402
+from AEFM.data_collector.wrk_throughput_collector import (  # noqa: E402
+    WrkFetcher,
+    WrkThroughputCollector,
+)
+from AEFM.utils.jaeger_fetcher import JaegerFetcher  # noqa: E402
+from AEFM.utils.prom_fetcher import PromFetcher  # noqa: E402
+from AEFM.utils.logger import log  # noqa: E402
+from AEFM.utils.metrics import metrics  # noqa: E402
+from AEFM.utils.timeline import timeline  # noqa: E402
+
+
+class NoopDeployer(DeployerInterface):
+    def __init__(self) -> None:
+        self.restarts = 0
+        self.reloads = 0
+
+    def restart(self, application: str, port: int) -> None:
+        self.restarts += 1
+
+    def reload(self, replicas: Optional[dict[str, int]] = None) -> None:
+        self.reloads += 1
+
+
+class NoopInfGenerator(InfGeneratorInterface):
+    def __init__(self) -> None:
+        self.generated = 0
+        self.cleared = 0
+
+    def generate(self, count: int, nodes: list[Node], wait: bool) -> None:
+        self.generated += 1
+
+    def clear(self, wait: bool) -> None:
+        self.cleared += 1
+
+
+class StubWorkloadGenerator(WorkloadGeneratorInterface):
+    """Sleeps instead of running wrk, and stores a result as ``BaseWorkloadGener
+    ator`` does, so the throughput collections read it."""
+
+    def __init__(self, output_path: str, duration: float) -> None:
+        self.store = ResultsStore(output_path)
+        self.duration = duration
+
+    def run(self, workload: int, test_case_name: str) -> LoadResult:
+        start_time = time.time()
+        time.sleep(self.duration)
+        requests = max(1, int(workload * self.duration))
+        histogram = LatencyHistogram()
+        for latency in [2000, 3000, 5000, 12000]:
+            histogram.record(latency, requests // 4 or 1)
+        result = LoadResult(
+            requests,
+            self.duration,
+            histogram=histogram,
+            start_time=start_time,
+            end_time=time.time(),
+        )
+        self.store.append(test_case_name, result.to_dict())
+        return result
+
+
+def build_test_cases(args) -> TestCases:
+    interferences = {}
+    for text in args.interferences:
+        inf_type, counts = text.split(":")
+        interferences[inf_type] = {
+            "configs": {},
+            "range": [int(x) for x in counts.split(",")],
+        }
+    return TestCases.load_from_dict(
+        {
+            "orders": ["round", *interferences, "workload"],
+            "round": list(range(args.rounds)),
+            "workload": {"configs": {}, "range": args.workloads},
+            "interferences": interferences,
+        }
+    )
+
+
+def register_handlers(args, jaeger: MockJaeger, prometheus: MockPrometheus, work_dir: str):
+    wrk_output_path = f"{work_dir}/wrk_output"
+
+    @register(event="start_experiment")
+    def start_experiment_handler():
+        manager.components.set("deployer", NoopDeployer())
+        manager.components.set(
+            "workload_generator",
+            StubWorkloadGenerator(wrk_output_path, args.load_duration),
+        )
+        manager.components.set(
+            "data_collector",
+            BaseDataCollector(
+                f"{work_dir}/data",
+                JaegerTraceCollector(JaegerFetcher(jaeger.url, "nginx-web-server")),
+                PromHardwareCollector(PromFetcher(prometheus.url, "social-network")),
+                WrkThroughputCollector(WrkFetcher(wrk_output_path)),
+                max_processes=args.processes,
+            ),
+        )
+        manager.components.set(
+            "inf_generators",
+            {x.split(":")[0]: NoopInfGenerator() for x in args.interferences},
+        )
+        manager.data.set("test_cases", build_test_cases(args))
+        log.set_log_file_path(f"{work_dir}/log.txt")
+        timeline.set_file_path(f"{work_dir}/timeline.jsonl")
+        manager.data.set("status_file_path", f"{work_dir}/status.json")
+
+    @register(event="init_environment")
+    def init_environment_handler():
+        deployer = manager.components.get("deployer")
+        deployer.restart("social-network", 8080)
+        deployer.reload()
+
+    @register(event="start_single_test_case")
+    def start_single_test_case_handler():
+        test_case = manager.data.get("current_test_case")
+        assert isinstance(test_case, TestCase)
+        result = manager.components.get("workload_generator").run(
+            test_case.workload.throughput, test_case.generate_name()
+        )
+        manager.data.set(
+            "test_case_data",
+            TestCaseData(
+                result.start_time,
+                result.end_time,
+                test_case.generate_name(),
+                additional_columns=test_case.to_dict(),
+            ),
+        )
+
+    @register(event="start_data_collection")
+    def start_data_collection_handler():
+        data_collector = manager.components.get("data_collector")
+        return data_collector.collect_async(manager.data.get("test_case_data"))
+
+    @register(event="end_experiment")
+    def end_experiment_handler():
+        for inf_generator in manager.components.get("inf_generators").values():
+            inf_generator.clear(wait=False)
+        manager.components.get("data_collector").wait()
+
+    @register(event="start_round")
+    def start_round_handler():
+        pass
+
+    @register(event="start_workload")
+    def start_workload_handler():
+        pass
+
+    def inf_handler(inf_type: str):
+        def start_inf_handler():
+            test_case = manager.data.get("current_test_case")
+            manager.components.get("inf_generators")[inf_type].generate(
+                test_case.interferences[inf_type], [], wait=True
+            )
+
+        return start_inf_handler
+
+    for text in args.interferences:
+        inf_type = text.split(":")[0]
+        register(event=f"start_{inf_type}")(inf_handler(inf_type))
+
+
+def collection_durations() -> list[dict[str, Any]]:
+    """Collection durations merged from pool workers into ``metrics``."""
+    failures = {
+        dict(labels)["collection"]: value
+        for (name, labels), value in metrics._values.items()
+        if name == "aefm_collection_failures_total"
+    }
+    rows = []
+    for (name, labels), value in metrics._values.items():
+        if name != "aefm_collection_duration_seconds":
+            continue
+        collection = dict(labels)["collection"]
+        count, total = value
+        rows.append(
+            {
+                "collection": collection,
+                "count": count,
+                "total": total,
+                "mean": total / count,
+                "failures": failures.get(collection, 0),
+            }
+        )
+    rows.sort(key=lambda x: x["total"], reverse=True)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ints = lambda x: [int(y) for y in x.split(",")]
+    parser.add_argument("--workloads", type=ints, default=[100, 200, 300])
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument(
+        "--interferences",
+        type=lambda x: x.split(";") if x else [],
+        default=["cpu:0,2,4"],
+        help='Semicolon separated "type:count,count", empty for none.',
+    )
+    parser.add_argument(
+        "--load-duration", type=float, default=0.2, help="Unit: second."
+    )
+    parser.add_argument("--traces", type=int, default=50, help="Traces per query.")
+    parser.add_argument("--latency", type=float, default=0.01, help="Unit: second.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Unit: second.")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--jaeger-fixture")
+    parser.add_argument("--prometheus-fixture")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--pipelined", action="store_true")
+    parser.add_argument("--work-dir", help="Keep outputs here, a temporary folder by default.")
+    parser.add_argument("--json", help="Save results to this file.")
+    args = parser.parse_args()
+
+    # Deprecation warnings of pandas are not interesting here
+    warnings.simplefilter("ignore")
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="aefm-harness-")
+    common = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "failure_rate": args.failure_rate,
+    }
+    with MockJaeger(args.traces, args.jaeger_fixture, **common) as jaeger, MockPrometheus(
+        args.prometheus_fixture, **common
+    ) as prometheus:
+        register_handlers(args, jaeger, prometheus, work_dir)
+        start = time.perf_counter()
+        manager.run(pipelined=args.pipelined)
+        wall = time.perf_counter() - start
+        servers = {"jaeger": jaeger.stats(), "prometheus": prometheus.stats()}
+    log.flush()
+
+    test_cases = len(manager.data.get("test_cases"))
+    load_total = test_cases * args.load_duration
+    collections = collection_durations()
+    deployer = manager.components.get("deployer")
+    inf_generators = manager.components.get("inf_generators")
+    print(
+        f"\n{test_cases} test cases in {wall:.2f}s, {test_cases / wall:.2f} cases/s, "
+        f"loop overhead {wall - load_total:.2f}s over {load_total:.2f}s of load"
+    )
+    print(
+        f"Restarts: {deployer.restarts}, reloads: {deployer.reloads}, "
+        "interference changes: "
+        + ", ".join(f"{x}={y.generated}" for x, y in inf_generators.items())
+    )
+    print(f"\n{'collection':<36} {'count':>6} {'total':>9} {'mean':>9} {'failed':>7}")
+    for row in collections:
+        print(
+            f"{row['collection']:<36} {row['count']:>6} {row['total']:>8.2f}s "
+            f"{row['mean']:>8.3f}s {row['failures']:>7g}"
+        )
+    print(f"\n{'server':<12} {'requests':>9} {'failures':>9} {'MiB sent':>9}")
+    for name, stats in servers.items():
+        print(
+            f"{name:<12} {stats['requests']:>9} {stats['failures']:>9} "
+            f"{stats['sent_bytes'] / 2**20:>9.1f}"
+        )
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(
+                {
+                    "args": vars(args),
+                    "test_cases": test_cases,
+                    "wall_time": wall,
+                    "timeline": timeline.summary(),
+                    "collections": collections,
+                    "servers": servers,
+                },
+                file,
+                indent=2,
+            )
+    if args.work_dir is None:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    else:
+        print(f"\nOutputs are kept in {work_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Import time benchmark of AEFM, guards against import time regressions.
+
+Every statement is executed in a fresh interpreter, the interpreter start up
+time (``python -c pass``) is subtracted. The script exits with a non-zero code
+if a statement exceeds its budget or imports a heavy dependency.
+
+Usage:
+    python benchmarks/bench_import_time.py [--repeat 7] [--budget-ms 150]
+"""
+
+import argparse, os, statistics, subprocess, sys, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["pandas", "kubernetes", "requests", "aiohttp", "numpy"]
+
+# Statement, heavy modules that are allowed to be imported by it
+CASES = [
+    ("import AEFM", []),
+    ("import AEFM.models", []),
+    ("import AEFM.manager", []),
+    ("from AEFM.data_collector import TestCaseData", []),
+    ("import AEFM.cli", []),
+]
+
+CHECK = (
+    "import sys; {stmt}; "
+    "print(','.join(m for m in {heavy!r} if m in sys.modules))"
+)
+
+
+def run(stmt: str) -> tuple[float, str]:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", stmt],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    used = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{stmt} failed:\n{proc.stderr}")
+    return used, proc.stdout.strip()
+
+
+def median_time(stmt: str, repeat: int) -> float:
+    return statistics.median(run(stmt)[0] for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=150,
+        help="Maximum import time of every statement, interpreter start up excluded.",
+    )
+    args = parser.parse_args()
+
+    baseline = median_time("pass", args.repeat)
+    print(f"{'statement':<50} {'ms':>8}  heavy modules")
+    failed = False
+    for stmt, allowed in CASES:
+        try:
+            _, loaded = run(CHECK.format(stmt=stmt, heavy=HEAVY_MODULES))
+        except RuntimeError as e:
+            # Optional dependencies (e.g. click for the CLI) may be missing
+            print(f"{stmt:<50} {'skipped':>8}  {str(e).splitlines()[-1]}")
+            continue
+        cost = (median_time(stmt, args.repeat) - baseline) * 1000
+        loaded = [x for x in loaded.split(",") if x and x not in allowed]
+        ok = cost <= args.budget_ms and not loaded
+        failed |= not ok
+        mark = "" if ok else "  <-- regression"
+        print(f"{stmt:<50} {cost:>8.1f}  {', '.join(loaded) or '-'}{mark}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
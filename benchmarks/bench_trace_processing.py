@@ -0,0 +1,214 @@
+"""Benchmark of trace processing stages with synthetic Jaeger traces.
+
+Every stage of ``JaegerTraceCollector`` (JSON decoding, ``load_from_json``,
+``exact_parent_duration``, ``decouple_parent_and_child`` at p50 and p95,
+``to_end_to_end_data``) is timed at several scales. It runs fully offline, the
+traces come from ``synthetic_jaeger.py``. A stage is skipped at larger scales
+once its projected time exceeds ``--budget``. Stages that depend on a skipped
+one get an approximate input when ``FALLBACKS`` has one, otherwise they are
+skipped as well. Timings are the best of ``--repeat`` runs, and a comparison
+with a baseline ignores stages whose difference is below ``--min-difference``,
+where noise outweighs the ratio.
+
+Usage:
+    python benchmarks/bench_trace_processing.py [--scales 100,1000,10000,100000]
+        [--budget 60] [--memory] [--json results.json]
+        [--repeat 3] [--baseline old.json --tolerance 0.25 --min-difference 0.01]
+"""
+
+import argparse, json, os, sys, time, tracemalloc, warnings
+from typing import Any, Callable, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_jaeger import generate_traces  # noqa: E402
+from AEFM.utils import trace_processor  # noqa: E402
+from AEFM.data_collector.jaeger_trace_collector import (  # noqa: E402
+    JaegerTraceCollector,
+)
+
+COLLECTOR = JaegerTraceCollector(None)
+
+
+def approximate_exact_parent_duration(data):
+    """Vectorized stand-in of ``exact_parent_duration`` (children are treated as
+    sequential), so later stages can still be measured at scales where the real
+    one is skipped."""
+    children = data.groupby(["trace_id", "parent_id"])["child_duration"].transform("sum")
+    data = data.assign(
+        exact_parent_duration=(data["parent_duration"] - children).astype(float),
+        child_duration=data["child_duration"].astype(float),
+    )
+    return data.loc[data["exact_parent_duration"] > 0]
+
+
+# Inputs used when the real input stage is skipped
+FALLBACKS = {"exact_parent_duration": approximate_exact_parent_duration}
+
+# Stage name, input stage, function
+STAGES: list[tuple[str, Optional[str], Callable[[Any], Any]]] = [
+    ("json_decode", None, lambda payload: json.loads(payload)["data"]),
+    ("load_from_json", "json_decode", trace_processor.load_from_json),
+    ("exact_parent_duration", "load_from_json", trace_processor.exact_parent_duration),
+    ("to_statistical_data", "exact_parent_duration", COLLECTOR.to_statistical_data),
+    ("to_end_to_end_data", "exact_parent_duration", COLLECTOR.to_end_to_end_data),
+]
+
+
+def measure(func: Callable, data: Any, repeat: int, memory: bool) -> dict[str, Any]:
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(data)
+        used = time.perf_counter() - start
+        best = used if best is None else min(best, used)
+    peak = None
+    if memory:
+        # A separate run, tracemalloc slows down allocations
+        tracemalloc.start()
+        func(data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {"seconds": best, "peak_memory": peak, "output": result}
+
+
+def run(args) -> list[dict[str, Any]]:
+    results = []
+    # Stage -> seconds per trace at the largest finished scale
+    cost_per_trace: dict[str, float] = {}
+    skipped: set[str] = set()
+    for scale in args.scales:
+        traces = generate_traces(
+            scale, args.fan_out, args.depth, args.parallel_ratio, seed=args.seed
+        )
+        spans = sum(len(x["spans"]) for x in traces)
+        outputs: dict[Optional[str], Any] = {None: json.dumps({"data": traces})}
+        del traces
+        for name, source, func in STAGES:
+            projected = cost_per_trace.get(name, 0) * scale
+            approximate = False
+            if source in skipped and source in FALLBACKS:
+                fallback_source = [x for x in STAGES if x[0] == source][0][1]
+                if fallback_source in outputs and source not in outputs:
+                    outputs[source] = FALLBACKS[source](outputs[fallback_source])
+                approximate = source in outputs
+            if (source in skipped and not approximate) or name in skipped or projected > args.budget:
+                skipped.add(name)
+                print(
+                    f"{name:<24} {scale:>8} {'skipped':>10}"
+                    f"  projected {projected:.0f}s > budget {args.budget:g}s"
+                    if projected > args.budget
+                    else f"{name:<24} {scale:>8} {'skipped':>10}"
+                )
+                continue
+            measured = measure(func, outputs[source], args.repeat, args.memory)
+            output = measured.pop("output")
+            outputs[name] = output
+            cost_per_trace[name] = measured["seconds"] / scale
+            row = {
+                "stage": name,
+                "approximate_input": approximate,
+                "traces": scale,
+                "spans": spans,
+                "rows": len(output) if output is not None else 0,
+                "traces_per_second": scale / measured["seconds"],
+                "spans_per_second": spans / measured["seconds"],
+                **measured,
+            }
+            results.append(row)
+            memory = (
+                f"{row['peak_memory'] / 2**20:>9.1f}"
+                if row["peak_memory"] is not None
+                else f"{'-':>9}"
+            )
+            print(
+                f"{name:<24} {scale:>8} {row['seconds']:>9.3f}s "
+                f"{row['traces_per_second']:>11.0f} {row['spans_per_second']:>11.0f} "
+                f"{memory} {row['rows']:>9}"
+                + ("  (approximate input)" if approximate else "")
+            )
+    return results
+
+
+def compare(
+    results: list[dict],
+    baseline_path: str,
+    tolerance: float,
+    min_difference: float = 0.01,
+) -> bool:
+    """Whether any stage is slower than the baseline by more than ``tolerance``
+    and by more than ``min_difference`` seconds.
+    """
+    with open(baseline_path) as file:
+        baseline = {(x["stage"], x["traces"]): x for x in json.load(file)["results"]}
+    regressed = False
+    for row in results:
+        old = baseline.get((row["stage"], row["traces"]))
+        if old is None:
+            continue
+        # Short stages are dominated by timer and scheduler noise
+        if row["seconds"] - old["seconds"] < min_difference:
+            continue
+        ratio = row["seconds"] / old["seconds"]
+        if ratio > 1 + tolerance:
+            regressed = True
+            print(
+                f"Regression: {row['stage']} with {row['traces']} traces "
+                f"{old['seconds']:.3f}s -> {row['seconds']:.3f}s ({ratio:.2f}x)"
+            )
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scales",
+        type=lambda x: [int(y) for y in x.split(",")],
+        default=[100, 1000, 10000, 100000],
+        help="Comma separated numbers of traces.",
+    )
+    parser.add_argument("--fan-out", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--parallel-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs.")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=60,
+        help="Skip a stage once its projected time exceeds this, unit: second.",
+    )
+    parser.add_argument(
+        "--memory", action="store_true", help="Measure peak memory by tracemalloc."
+    )
+    parser.add_argument("--json", help="Save results to this file.")
+    parser.add_argument("--baseline", help="Results file to compare with.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--min-difference",
+        type=float,
+        default=0.01,
+        help="Slowdowns below this are not regressions, unit: second.",
+    )
+    args = parser.parse_args()
+
+    # Deprecation warnings of pandas are not interesting here
+    warnings.simplefilter("ignore")
+    print(
+        f"{'stage':<24} {'traces':>8} {'time':>10} {'traces/s':>11} "
+        f"{'spans/s':>11} {'peak MiB':>9} {'rows':>9}"
+    )
+    results = run(args)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"args": vars(args), "results": results}, file, indent=2)
+    if args.baseline and compare(
+        results, args.baseline, args.tolerance, args.min_difference
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""Local stand-ins of Jaeger and Prometheus query APIs.
+
+``MockJaeger`` serves ``/api/traces`` and ``MockPrometheus`` serves
+``/api/v1/query_range`` and ``/api/v1/query``, from recorded fixtures or
+synthetic data, so ``JaegerFetcher``, ``PromFetcher`` and ``BaseDataCollector``
+can be exercised without a cluster. Every server can add latency and fail a
+share of requests with HTTP 503.
+
+Usage:
+    python benchmarks/mock_servers.py [--jaeger-port 16686]
+        [--prometheus-port 9090] [--latency 0.05] [--jitter 0.02]
+        [--failure-rate 0.01] [--traces 100] [--jaeger-fixture traces.json]
+        [--prometheus-fixture response.json]
+"""
+
+import argparse, json, os, random, re, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_jaeger import generate_traces, pod_name  # noqa: E402
+
+# Prometheus rejects range queries with more points than this
+MAX_POINTS = 11000
+
+
+class MockServer:
+    """HTTP server that runs in a daemon thread. Subclasses implement ``handle``
+    ."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """HTTP server that runs in a daemon thread.
+
+        Args:
+            latency (float, optional): Delay added to every response, unit: seco
+            nd. Defaults to 0.0.
+            jitter (float, optional): Uniform random delay added on top of ``lat
+            ency``, unit: second. Defaults to 0.0.
+            failure_rate (float, optional): Share of requests answered with HTTP
+            503. Defaults to 0.0.
+            seed (int, optional): Random seed of delays and failures. Defaults
+            to 0.
+            host (str, optional): Address to listen on. Defaults to "127.0.0.1".
+            port (int, optional): Port to listen on, 0 picks a free one. Default
+            s to 0.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.host = host
+        self.port = port
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.failures = 0
+        self.sent_bytes = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def handle(self, path: str, params: dict[str, str]) -> tuple[int, bytes]:
+        """Response of a GET request.
+
+        Args:
+            path (str): Request path, without query string.
+            params (dict[str, str]): Query parameters, the last value wins.
+
+        Returns:
+            tuple[int, bytes]: Status code and JSON body.
+        """
+        raise NotImplementedError
+
+    def _respond(self, path: str, params: dict[str, str]) -> tuple[int, bytes]:
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+            failed = self.rng.random() < self.failure_rate
+            if failed:
+                self.failures += 1
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            return 503, b'{"status":"error","error":"injected failure"}'
+        return self.handle(path, params)
+
+    def start(self) -> "MockServer":
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                params = {x: y[-1] for x, y in parse_qs(url.query).items()}
+                status, body = server._respond(url.path, params)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with server._lock:
+                    server.sent_bytes += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(
+            target=self._server.serve_forever,
+            name=type(self).__name__,
+            daemon=True,
+        ).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "url": self.url,
+            "requests": self.requests,
+            "failures": self.failures,
+            "sent_bytes": self.sent_bytes,
+        }
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *_) -> None:
+        self.stop()
+
+
+def _not_found(path: str) -> tuple[int, bytes]:
+    return 404, json.dumps({"error": f"{path} is not mocked"}).encode()
+
+
+class MockJaeger(MockServer):
+    """Jaeger query API, ``/api/traces`` returns at most ``limit`` traces of a f
+    ixture or of ``synthetic_jaeger.generate_traces``. Responses are encoded onc
+    e per limit, so the server is not the bottleneck of a benchmark. Timestamps
+    of traces do not follow the queried window.
+    """
+
+    def __init__(
+        self,
+        traces: int = 100,
+        fixture: Optional[str] = None,
+        fan_out: int = 4,
+        depth: int = 4,
+        parallel_ratio: float = 0.3,
+        **kwargs,
+    ) -> None:
+        """Jaeger query API.
+
+        Args:
+            traces (int, optional): Traces returned per query at most, unless th
+            e query limit is lower. Defaults to 100.
+            fixture (str, optional): A recorded ``/api/traces`` response, i.e. a
+            JSON file with a ``data`` list. Defaults to None, synthetic traces
+            are served.
+            fan_out (int, optional): Check ``generate_traces``. Defaults to 4.
+            depth (int, optional): Check ``generate_traces``. Defaults to 4.
+            parallel_ratio (float, optional): Check ``generate_traces``. Default
+            s to 0.3.
+            **kwargs: Passed to ``MockServer``.
+        """
+        super().__init__(**kwargs)
+        if fixture is not None:
+            with open(fixture) as file:
+                self.traces = json.load(file)["data"]
+        else:
+            self.traces = generate_traces(
+                traces, fan_out, depth, parallel_ratio, seed=kwargs.get("seed", 0)
+            )
+        self.traces = self.traces[:traces]
+        # Limit -> encoded response
+        self._bodies: dict[int, bytes] = {}
+
+    def handle(self, path: str, params: dict[str, str]) -> tuple[int, bytes]:
+        if path == "/api/services":
+            services = sorted(
+                {
+                    process["serviceName"]
+                    for trace in self.traces
+                    for process in trace["processes"].values()
+                }
+            )
+            return 200, json.dumps({"data": services, "total": len(services)}).encode()
+        if path != "/api/traces":
+            return _not_found(path)
+        limit = min(int(params.get("limit", len(self.traces))), len(self.traces))
+        with self._lock:
+            if limit not in self._bodies:
+                data = self.traces[:limit]
+                self._bodies[limit] = json.dumps(
+                    {"data": data, "total": len(data), "limit": 0, "offset": 0, "errors": None}
+                ).encode()
+            return 200, self._bodies[limit]
+
+
+class MockPrometheus(MockServer):
+    """Prometheus query API. Without a fixture, every pod matched by the ``pod=~
+    `` selector of a query gets a series of random percentages, one point per ``
+    step`` between ``start`` and ``end``. Pods are named like the hostnames of
+    synthetic traces, so trace and hardware data can be joined.
+    """
+
+    def __init__(
+        self, fixture: Optional[str] = None, pods_per_service: int = 2, **kwargs
+    ) -> None:
+        """Prometheus query API.
+
+        Args:
+            fixture (str, optional): A recorded query response, served for every
+            query. Defaults to None, synthetic series are served.
+            pods_per_service (int, optional): Series per selected Deployment. De
+            faults to 2.
+            **kwargs: Passed to ``MockServer``.
+        """
+        super().__init__(**kwargs)
+        self.fixture = None
+        if fixture is not None:
+            with open(fixture, "rb") as file:
+                self.fixture = file.read()
+        self.pods_per_service = pods_per_service
+        self.values = random.Random(kwargs.get("seed", 0))
+
+    def _selected(self, query: str) -> list[str]:
+        match = re.search(r'(?:pod|instance|node)=~"([^"]*)"', query)
+        if match is None:
+            return []
+        return [x.replace(".*", "") for x in match.group(1).split("|") if x.strip(".*")]
+
+    def _metric(self, query: str, name: str, index: int) -> dict[str, str]:
+        if 'pod=~"' not in query:
+            return {"instance": name}
+        pod = pod_name(name, index)
+        if "by (container, pod)" in query:
+            return {"container": name, "pod": pod}
+        return {"pod": pod}
+
+    def handle(self, path: str, params: dict[str, str]) -> tuple[int, bytes]:
+        if path not in ["/api/v1/query_range", "/api/v1/query"]:
+            return _not_found(path)
+        if self.fixture is not None:
+            return 200, self.fixture
+        query = params.get("query", "")
+        if path == "/api/v1/query":
+            timestamps = [float(params.get("time", time.time()))]
+            result_type, key = "vector", "value"
+        else:
+            start, end = float(params["start"]), float(params["end"])
+            step = float(params.get("step", 1))
+            points = int((end - start) / step) + 1
+            if points > MAX_POINTS:
+                error = (
+                    "exceeded maximum resolution of 11,000 points per timeseries"
+                )
+                return 400, json.dumps(
+                    {"status": "error", "errorType": "bad_data", "error": error}
+                ).encode()
+            timestamps = [start + x * step for x in range(points)]
+            result_type, key = "matrix", "values"
+        result = []
+        with self._lock:
+            for name in self._selected(query):
+                for index in range(self.pods_per_service):
+                    values = [
+                        [x, f"{self.values.uniform(0, 100):.3f}"] for x in timestamps
+                    ]
+                    result.append(
+                        {
+                            "metric": self._metric(query, name, index),
+                            key: values[0] if key == "value" else values,
+                        }
+                    )
+        body = {"status": "success", "data": {"resultType": result_type, "result": result}}
+        return 200, json.dumps(body).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--jaeger-port", type=int, default=16686)
+    parser.add_argument("--prometheus-port", type=int, default=9090)
+    parser.add_argument("--latency", type=float, default=0.0, help="Unit: second.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Unit: second.")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--traces", type=int, default=100)
+    parser.add_argument("--jaeger-fixture")
+    parser.add_argument("--prometheus-fixture")
+    args = parser.parse_args()
+    common = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "failure_rate": args.failure_rate,
+        "seed": args.seed,
+        "host": args.host,
+    }
+    jaeger = MockJaeger(
+        args.traces, args.jaeger_fixture, port=args.jaeger_port, **common
+    ).start()
+    prometheus = MockPrometheus(
+        args.prometheus_fixture, port=args.prometheus_port, **common
+    ).start()
+    print(f"Jaeger: {jaeger.url}\nPrometheus: {prometheus.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        jaeger.stop()
+        prometheus.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Synthetic Jaeger traces shaped like DeathStarBench applications.
+
+Traces follow the format of Jaeger query API (``/api/traces``): every trace has
+spans with CHILD_OF references and processes with service names and hostname
+tags, so they can be fed to ``AEFM.utils.trace_processor`` directly.
+
+Usage:
+    python benchmarks/synthetic_jaeger.py --traces 1000 [--fan-out 4]
+        [--depth 4] [--parallel-ratio 0.3] [--seed 0] > traces.json
+"""
+
+import argparse, json, random, sys
+from typing import Any, Optional
+
+# Services of the Social Network application, the first one is the entrance
+SOCIAL_NETWORK = [
+    "nginx-web-server",
+    "compose-post-service",
+    "home-timeline-service",
+    "user-timeline-service",
+    "post-storage-service",
+    "social-graph-service",
+    "text-service",
+    "user-service",
+    "unique-id-service",
+    "media-service",
+    "url-shorten-service",
+    "user-mention-service",
+    "post-storage-mongodb",
+    "post-storage-memcached",
+    "user-timeline-redis",
+    "home-timeline-redis",
+    "social-graph-mongodb",
+    "user-memcached",
+]
+
+
+def pod_name(service: str, index: int) -> str:
+    """Name of a pod of a Deployment, e.g. text-service-7d4f9c8b6-00001."""
+    return f"{service}-7d4f9c8b6-{index:05x}"
+
+
+class _Builder:
+    def __init__(
+        self,
+        rng: random.Random,
+        services: list[str],
+        pods_per_service: int,
+        fan_out: int,
+        depth: int,
+        parallel_ratio: float,
+    ) -> None:
+        self.rng = rng
+        self.services = services
+        self.pods_per_service = pods_per_service
+        self.fan_out = fan_out
+        self.depth = depth
+        self.parallel_ratio = parallel_ratio
+
+    def _span_id(self) -> str:
+        return f"{self.rng.getrandbits(64):016x}"
+
+    def build(self, trace_id: str, start_time: int) -> dict[str, Any]:
+        spans: list[dict] = []
+        processes: dict[str, dict] = {}
+        process_ids: dict[tuple[str, str], str] = {}
+
+        def process_of(service: str) -> str:
+            pod = pod_name(service, self.rng.randrange(self.pods_per_service))
+            key = (service, pod)
+            if key not in process_ids:
+                process_id = f"p{len(process_ids) + 1}"
+                process_ids[key] = process_id
+                processes[process_id] = {
+                    "serviceName": service,
+                    "tags": [
+                        {"key": "hostname", "type": "string", "value": pod},
+                        {"key": "jaeger.version", "type": "string", "value": "C++-0.4.2"},
+                    ],
+                }
+            return process_ids[key]
+
+        def span(service: str, parent: Optional[str], start: int, level: int) -> int:
+            """Add a span and its children, returns its duration."""
+            span_id = self._span_id()
+            own_before = self.rng.randint(20, 200)
+            own_after = self.rng.randint(10, 100)
+            cursor = start + own_before
+            if level < self.depth:
+                children = self.rng.randint(0 if level > 1 else 1, self.fan_out)
+                parallel = self.rng.random() < self.parallel_ratio
+                step_end = cursor
+                for _ in range(children):
+                    child_service = self.rng.choice(self.services[1:])
+                    child_start = cursor if parallel else step_end
+                    child_start += self.rng.randint(1, 10)
+                    duration = span(child_service, span_id, child_start, level + 1)
+                    step_end = max(step_end, child_start + duration)
+                cursor = step_end
+            duration = cursor - start + own_after
+            spans.append(
+                {
+                    "traceID": trace_id,
+                    "spanID": span_id,
+                    "flags": 1,
+                    "operationName": f"{service}:op{level}",
+                    "references": (
+                        []
+                        if parent is None
+                        else [
+                            {
+                                "refType": "CHILD_OF",
+                                "traceID": trace_id,
+                                "spanID": parent,
+                            }
+                        ]
+                    ),
+                    "startTime": start,
+                    "duration": duration,
+                    "tags": [],
+                    "logs": [],
+                    "processID": process_of(service),
+                    "warnings": None,
+                }
+            )
+            return duration
+
+        span(self.services[0], None, start_time, 1)
+        return {
+            "traceID": trace_id,
+            "spans": spans,
+            "processes": processes,
+            "warnings": None,
+        }
+
+
+def generate_traces(
+    count: int,
+    fan_out: int = 4,
+    depth: int = 4,
+    parallel_ratio: float = 0.3,
+    services: Optional[list[str]] = None,
+    pods_per_service: int = 2,
+    seed: int = 0,
+) -> list[dict[str, Any]]:
+    """Generate Jaeger traces.
+
+    Args:
+        count (int): Number of traces.
+        fan_out (int, optional): Maximum calls of a span. Defaults to 4.
+        depth (int, optional): Maximum depth of the call tree, the entrance span
+        is level 1. Defaults to 4.
+        parallel_ratio (float, optional): Probability that calls of a span are
+        parallel instead of sequential. Defaults to 0.3.
+        services (list[str], optional): Service names, the first one is the entr
+        ance. Defaults to Social Network services.
+        pods_per_service (int, optional): Replicas of every service. Defaults to
+        2.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        list[dict[str, Any]]: ``data`` of a Jaeger API response.
+    """
+    rng = random.Random(seed)
+    builder = _Builder(
+        rng,
+        services if services is not None else SOCIAL_NETWORK,
+        pods_per_service,
+        fan_out,
+        depth,
+        parallel_ratio,
+    )
+    start_time = 1_700_000_000_000_000
+    traces = []
+    for _ in range(count):
+        trace_id = f"{rng.getrandbits(64):016x}"
+        start_time += rng.randint(100, 2000)
+        traces.append(builder.build(trace_id, start_time))
+    return traces
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--traces", type=int, default=1000)
+    parser.add_argument("--fan-out", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--parallel-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    traces = generate_traces(
+        args.traces, args.fan_out, args.depth, args.parallel_ratio, seed=args.seed
+    )
+    json.dump({"data": traces}, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
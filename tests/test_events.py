@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from AEFM.manager import manager
+
+
+@pytest.fixture
+def event():
+    name = "test_ordered_event"
+    yield name
+    if hasattr(manager.events, name):
+        delattr(manager.events, name)
+    manager.events._after.pop(name, None)
+
+
+def test_after_is_followed_by_both_triggers(event):
+    calls = []
+
+    def a():
+        calls.append("a")
+
+    def b():
+        calls.append("b")
+
+    manager.events.register(event, a)
+    manager.events.register(event, b, method="insert", after=["a"])
+    manager.events.trigger(event)
+    assert calls == ["a", "b"]
+    calls.clear()
+    asyncio.run(manager.events.trigger_async(event))
+    assert calls == ["a", "b"]
+
+
+def test_unknown_and_circular_after(event):
+    def a():
+        pass
+
+    def b():
+        pass
+
+    manager.events.register(event, a, after=["missing"])
+    with pytest.raises(ValueError):
+        manager.events.trigger(event)
+    manager.events.register(event, a, after=["b"])
+    manager.events.register(event, b, method="append", after=["a"])
+    with pytest.raises(ValueError):
+        manager.events.trigger(event)
+    with pytest.raises(ValueError):
+        asyncio.run(manager.events.trigger_async(event))
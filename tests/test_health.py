@@ -0,0 +1,30 @@
+from AEFM.workload_generator.health import assess_health
+from AEFM.workload_generator.results import LoadResult
+
+
+def run(throughput: float, rate: float = 100, cpu_time=None, **status) -> LoadResult:
+    client = {"rate": rate, "throughput": throughput, "threads": 1, "cpu_time": cpu_time}
+    client.update({"returncode": 0, "timed_out": False, **status})
+    return LoadResult(int(throughput * 10), 10, client_status=[client])
+
+
+def test_app_shortfall_is_not_retried():
+    health = assess_health(run(60, cpu_time=2), 100)
+    assert health.healthy
+    assert health.app_saturated
+    assert len(health.notes) == 2
+
+
+def test_client_cpu_is_unhealthy():
+    health = assess_health(run(60, cpu_time=9.5), 100)
+    assert not health.healthy
+    assert not health.app_saturated
+    assert "CPU saturated" in health.reasons[0]
+
+
+def test_client_evidence():
+    assert not assess_health(run(100, rate=50), 100).healthy
+    assert not assess_health(run(100, timed_out=True), 100).healthy
+    assert not assess_health(run(100, returncode=1), 100).healthy
+    health = assess_health(run(100), 100)
+    assert health.healthy and not health.app_saturated
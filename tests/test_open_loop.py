@@ -0,0 +1,71 @@
+import asyncio, threading, time
+
+import pytest
+from aiohttp import web
+
+from AEFM.workload_generator.open_loop import (
+    OpenLoopConfig,
+    OpenLoopWorkloadGenerator,
+    Request,
+)
+
+
+@pytest.fixture
+def stub_server():
+    """aiohttp server in a background thread, records arrival time of requests.
+    """
+    arrivals: list[float] = []
+    started = threading.Event()
+    state = {}
+
+    async def handle(request: web.Request) -> web.Response:
+        arrivals.append(time.time())
+        return web.Response(text="ok")
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", handle)
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        loop.run_until_complete(site.start())
+        state["port"] = runner.addresses[0][1]
+        state["loop"] = loop
+        started.set()
+        loop.run_forever()
+        loop.run_until_complete(runner.cleanup())
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    started.wait(5)
+    yield f"http://127.0.0.1:{state['port']}", arrivals
+    state["loop"].call_soon_threadsafe(state["loop"].stop)
+    thread.join(5)
+
+
+def _generator(url: str, tmp_path, duration: int = 1) -> OpenLoopWorkloadGenerator:
+    config = OpenLoopConfig(
+        url, [Request("/ping")], duration, processes=1, use_uvloop=False
+    )
+    return OpenLoopWorkloadGenerator(config, str(tmp_path))
+
+
+def test_sends_scheduled_requests(stub_server, tmp_path):
+    url, arrivals = stub_server
+    result = _generator(url, tmp_path).run(20, "rate=20")
+    assert result.requests == 20
+    assert len(arrivals) == 20
+    assert sum(result.errors.values()) == 0
+    # A constant schedule of 50 ms, spread over the whole second
+    gaps = [y - x for x, y in zip(arrivals, arrivals[1:])]
+    assert 0.8 < arrivals[-1] - arrivals[0] < 1.2
+    assert max(gaps) < 0.2
+    assert result.start_time <= arrivals[0] + 0.05
+
+
+def test_zero_workload(stub_server, tmp_path):
+    url, arrivals = stub_server
+    result = _generator(url, tmp_path).run(0, "rate=0")
+    assert result.requests == 0
+    assert arrivals == []